@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..db.memory import get_memory_store
+from ..repositories.backend import uses_memory_backend
+from ..repositories.performance_repository import (
+    PerformanceRepository,
+    PerformanceRepositoryMemory,
+    PerformanceRepositorySQLAlchemy,
+)
+
+# NumPy-backed modules are imported on demand so the default SQL backend
+# never pays for them at startup.
+
+
+async def init_performance_backend() -> None:
+    if settings.performance_backend == "sql":
+        return
+
+    from .snapshot import load_snapshot_if_current
+
+    snapshot = None
+    if settings.snapshot_dir:
+        snapshot = await load_snapshot_if_current(Path(settings.snapshot_dir))
+
+    if settings.performance_backend == "daily_index":
+        from .daily_index import init_daily_index
+
+        await init_daily_index(snapshot.index if snapshot else None)
+    elif settings.performance_backend == "columnar":
+        from .columnar import init_columnar_store
+
+        await init_columnar_store(snapshot.store if snapshot else None)
+
+
+def dispose_performance_backend() -> None:
+    if settings.performance_backend == "daily_index":
+        from .daily_index import dispose_daily_index
+
+        dispose_daily_index()
+    elif settings.performance_backend == "columnar":
+        from .columnar import dispose_columnar_store
+
+        dispose_columnar_store()
+
+
+def build_performance_repository(session: AsyncSession) -> PerformanceRepository:
+    if uses_memory_backend():
+        return PerformanceRepositoryMemory(get_memory_store())
+    if settings.performance_backend == "daily_index":
+        from ..repositories.performance_index_repository import (
+            PerformanceRepositoryDailyIndex,
+        )
+        from .daily_index import get_daily_index
+
+        return PerformanceRepositoryDailyIndex(session, get_daily_index())
+    if settings.performance_backend == "columnar":
+        from ..repositories.performance_columnar_repository import (
+            PerformanceRepositoryColumnar,
+        )
+        from .columnar import get_columnar_store
+
+        return PerformanceRepositoryColumnar(session, get_columnar_store())
+    return PerformanceRepositorySQLAlchemy(session)
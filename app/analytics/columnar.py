@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import date
+from decimal import Decimal
+from typing import Any, Optional
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..db.session import get_session
+from ..models.credit import Credit
+from ..models.payment import Payment
+from .units import day_number, from_day_number, from_minor, to_minor
+from .watermark import IdWatermark, read_unseen
+
+logger = logging.getLogger(__name__)
+
+CREDIT_SCHEMA: dict[str, Any] = {
+    "id": np.int64,
+    "user_id": np.int64,
+    "issuance_day": np.int32,
+    "return_day": np.int32,
+    "body": np.int64,
+    "percent": np.int64,
+}
+
+PAYMENT_SCHEMA: dict[str, Any] = {
+    "id": np.int64,
+    "credit_id": np.int64,
+    "payment_day": np.int32,
+    "type_id": np.int8,
+    "sum": np.int64,
+}
+
+
+Parts = list[tuple[np.ndarray, np.ndarray]]
+
+
+def _empty_columns(schema: dict[str, Any]) -> dict[str, np.ndarray]:
+    return {name: np.zeros(0, dtype=dtype) for name, dtype in schema.items()}
+
+
+# `base` may be a read-only memory map shared with other workers; rows loaded
+# later go to a per-process `delta` and queries read both, so catching up
+# never copies the mapped columns. Appended chunks are staged and joined onto
+# `delta` in one concatenation per column by flush(), at the end of a load.
+class ColumnTable:
+    def __init__(
+        self, schema: dict[str, Any], columns: dict[str, np.ndarray] | None = None
+    ) -> None:
+        self.schema = schema
+        self.base: dict[str, np.ndarray] = columns or _empty_columns(schema)
+        self.delta: dict[str, np.ndarray] = _empty_columns(schema)
+        self._staged: list[dict[str, np.ndarray]] = []
+
+    def __len__(self) -> int:
+        return int(self.base["id"].size + self.delta["id"].size)
+
+    @property
+    def nbytes(self) -> int:
+        return int(
+            sum(col.nbytes for cols in (self.base, self.delta) for col in cols.values())
+        )
+
+    @property
+    def bytes_per_row(self) -> int:
+        return int(sum(np.dtype(dtype).itemsize for dtype in self.schema.values()))
+
+    def parts(self, days: str, amounts: str) -> Parts:
+        return [
+            (cols[days], cols[amounts])
+            for cols in (self.base, self.delta)
+            if cols["id"].size
+        ]
+
+    def column(self, name: str) -> np.ndarray:
+        # A fresh copy of base and delta together, for export.
+        return np.concatenate((self.base[name], self.delta[name]))
+
+    def append(self, rows: list[tuple]) -> None:
+        if not rows:
+            return
+        self._staged.append(
+            {
+                name: np.fromiter((r[i] for r in rows), dtype=dtype, count=len(rows))
+                for i, (name, dtype) in enumerate(self.schema.items())
+            }
+        )
+
+    def flush(self) -> None:
+        if not self._staged:
+            return
+        self.delta = {
+            name: np.concatenate(
+                [self.delta[name], *(chunk[name] for chunk in self._staged)]
+            )
+            for name in self.schema
+        }
+        self._staged = []
+
+
+def _year_bounds(year: int) -> np.ndarray:
+    return np.array(
+        [day_number(date(year, m, 1)) for m in range(1, 13)]
+        + [day_number(date(year + 1, 1, 1))],
+        dtype=np.int32,
+    )
+
+
+def month_aggregates(
+    parts: Parts, year: int
+) -> dict[tuple[int, int], tuple[int, Decimal]]:
+    bounds = _year_bounds(year)
+    counts = np.zeros(12, dtype=np.int64)
+    sums = np.zeros(12, dtype=np.int64)
+    for days, amounts in parts:
+        mask = (days >= bounds[0]) & (days < bounds[-1])
+        months = np.searchsorted(bounds, days[mask], side="right") - 1
+        counts += np.bincount(months, minlength=12)
+        np.add.at(sums, months, amounts[mask])
+    return {
+        (year, int(m) + 1): (int(counts[m]), from_minor(sums[m]))
+        for m in np.flatnonzero(counts)
+    }
+
+
+def _range_mask(days: np.ndarray, start_date: date, end_date: date) -> np.ndarray:
+    return (days >= day_number(start_date)) & (days <= day_number(end_date))
+
+
+def range_sum(parts: Parts, start_date: date, end_date: date) -> Decimal:
+    return from_minor(
+        sum(
+            int(amounts[_range_mask(days, start_date, end_date)].sum(dtype=np.int64))
+            for days, amounts in parts
+        )
+    )
+
+
+def daily_sums(parts: Parts, start_date: date, end_date: date) -> dict[date, Decimal]:
+    days = np.zeros(0, dtype=np.int32)
+    amounts = np.zeros(0, dtype=np.int64)
+    for part_days, part_amounts in parts:
+        mask = _range_mask(part_days, start_date, end_date)
+        days = np.concatenate((days, part_days[mask]))
+        amounts = np.concatenate((amounts, part_amounts[mask]))
+    unique_days, inverse = np.unique(days, return_inverse=True)
+    sums = np.zeros(unique_days.size, dtype=np.int64)
+    np.add.at(sums, inverse, amounts)
+    return {from_day_number(d): from_minor(s) for d, s in zip(unique_days, sums)}
+
+
+class ColumnarStore:
+    def __init__(
+        self,
+        credits: ColumnTable | None = None,
+        payments: ColumnTable | None = None,
+    ) -> None:
+        self.credits = credits or ColumnTable(CREDIT_SCHEMA)
+        self.payments = payments or ColumnTable(PAYMENT_SCHEMA)
+        self.credits_watermark = IdWatermark(settings.watermark_settle_seconds)
+        self.payments_watermark = IdWatermark(settings.watermark_settle_seconds)
+        self.refreshed_at: float = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        return self.credits.nbytes + self.payments.nbytes
+
+    def is_stale(self) -> bool:
+        age = time.monotonic() - self.refreshed_at
+        return age >= settings.columnar_refresh_seconds
+
+    async def refresh(self) -> None:
+        async with self._lock:
+            await self._refresh()
+
+    async def _refresh(self) -> None:
+        # Own session, as in DailyTotalsIndex.refresh: the caller's request
+        # transaction is left alone.
+        async for session in get_session():
+            await self._load_credits(session)
+            await self._load_payments(session)
+        self.refreshed_at = time.monotonic()
+
+    async def refresh_if_stale(self) -> None:
+        if not self.is_stale():
+            return
+        async with self._lock:
+            # Requests queued behind a refresh find it done.
+            if self.is_stale():
+                await self._refresh()
+
+    async def _load_credits(self, session: AsyncSession) -> None:
+        ids: list[int] = []
+        async for rows in read_unseen(
+            session,
+            self.credits_watermark,
+            Credit.id,
+            (
+                Credit.user_id,
+                Credit.issuance_date,
+                Credit.return_date,
+                Credit.body,
+                Credit.percent,
+            ),
+            settings.columnar_load_chunk_size,
+        ):
+            self.credits.append(
+                [
+                    (
+                        cid,
+                        uid,
+                        day_number(issued),
+                        day_number(due),
+                        to_minor(body),
+                        to_minor(percent),
+                    )
+                    for cid, uid, issued, due, body, percent in rows
+                ]
+            )
+            ids += [row[0] for row in rows]
+        self.credits.flush()
+        self.credits_watermark.advance(ids)
+
+    async def _load_payments(self, session: AsyncSession) -> None:
+        ids: list[int] = []
+        async for rows in read_unseen(
+            session,
+            self.payments_watermark,
+            Payment.id,
+            (Payment.credit_id, Payment.payment_date, Payment.type_id, Payment.sum),
+            settings.columnar_load_chunk_size,
+        ):
+            self.payments.append(
+                [
+                    (pid, cid, day_number(paid), type_id, to_minor(summ))
+                    for pid, cid, paid, type_id, summ in rows
+                ]
+            )
+            ids += [row[0] for row in rows]
+        self.payments.flush()
+        self.payments_watermark.advance(ids)
+
+    def issuances_aggregates(
+        self, year: int
+    ) -> dict[tuple[int, int], tuple[int, Decimal]]:
+        return month_aggregates(self.credits.parts("issuance_day", "body"), year)
+
+    def payments_aggregates(
+        self, year: int
+    ) -> dict[tuple[int, int], tuple[int, Decimal]]:
+        return month_aggregates(self.payments.parts("payment_day", "sum"), year)
+
+    def sum_issuances(self, start_date: date, end_date: date) -> Decimal:
+        return range_sum(
+            self.credits.parts("issuance_day", "body"), start_date, end_date
+        )
+
+    def sum_payments(self, start_date: date, end_date: date) -> Decimal:
+        return range_sum(
+            self.payments.parts("payment_day", "sum"), start_date, end_date
+        )
+
+    def daily_issuances(self, start_date: date, end_date: date) -> dict[date, Decimal]:
+        return daily_sums(
+            self.credits.parts("issuance_day", "body"), start_date, end_date
+        )
+
+    def daily_payments(self, start_date: date, end_date: date) -> dict[date, Decimal]:
+        return daily_sums(
+            self.payments.parts("payment_day", "sum"), start_date, end_date
+        )
+
+
+_store: Optional[ColumnarStore] = None
+
+
+async def init_columnar_store(store: ColumnarStore | None = None) -> None:
+    global _store
+    if _store is None:
+        store = store or ColumnarStore()
+        await store.refresh()
+        _store = store
+        logger.info(
+            "Columnar store loaded: %d credit(s), %d payment(s), %d byte(s)",
+            len(store.credits),
+            len(store.payments),
+            store.nbytes,
+        )
+
+
+def get_columnar_store() -> ColumnarStore:
+    if _store is None:
+        raise RuntimeError("Columnar store not initialized yet")
+    return _store
+
+
+def dispose_columnar_store() -> None:
+    global _store
+    _store = None
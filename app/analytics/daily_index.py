@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import date
+from decimal import Decimal
+from typing import Any, Optional
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..db.session import get_session
+from ..models.credit import Credit
+from ..models.payment import Payment
+from .units import day_number, from_day_number, from_minor, to_minor
+from .watermark import IdWatermark, read_unseen
+
+logger = logging.getLogger(__name__)
+
+
+class DailySeries:
+    def __init__(
+        self,
+        origin: int = 0,
+        daily: np.ndarray | None = None,
+        prefix: np.ndarray | None = None,
+    ) -> None:
+        self.origin = origin
+        self.daily: np.ndarray = (
+            daily if daily is not None else np.zeros(0, dtype=np.int64)
+        )
+        self.prefix: np.ndarray = (
+            prefix if prefix is not None else np.zeros(1, dtype=np.int64)
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.daily.nbytes + self.prefix.nbytes)
+
+    def add(self, rows: list[tuple[date, object]]) -> None:
+        if not rows:
+            return
+        days = np.fromiter((day_number(d) for d, _ in rows), dtype=np.int64)
+        sums = np.fromiter((to_minor(s or 0) for _, s in rows), dtype=np.int64)
+
+        daily = self.daily
+        origin = self.origin if daily.size else int(days.min())
+        lo = min(origin, int(days.min()))
+        hi = max(origin + daily.size - 1, int(days.max()))
+        if lo != origin or hi - lo + 1 != daily.size:
+            grown = np.zeros(hi - lo + 1, dtype=np.int64)
+            grown[origin - lo : origin - lo + daily.size] = daily
+            daily, origin = grown, lo
+        else:
+            daily = daily.copy()
+        np.add.at(daily, days - origin, sums)
+
+        prefix = np.zeros(daily.size + 1, dtype=np.int64)
+        np.cumsum(daily, out=prefix[1:])
+        self.origin, self.daily, self.prefix = origin, daily, prefix
+
+    def range_sum(self, start_date: date, end_date: date) -> int:
+        lo = max(day_number(start_date) - self.origin, 0)
+        hi = min(day_number(end_date) - self.origin, self.daily.size - 1)
+        if hi < lo:
+            return 0
+        return int(self.prefix[hi + 1] - self.prefix[lo])
+
+    def by_day(self, start_date: date, end_date: date) -> dict[date, int]:
+        lo = max(day_number(start_date) - self.origin, 0)
+        hi = min(day_number(end_date) - self.origin, self.daily.size - 1)
+        if hi < lo:
+            return {}
+        window = self.daily[lo : hi + 1]
+        return {
+            from_day_number(self.origin + lo + int(i)): int(window[i])
+            for i in np.flatnonzero(window)
+        }
+
+
+class DailyTotalsIndex:
+    def __init__(self) -> None:
+        self.issuances = DailySeries()
+        self.payments = DailySeries()
+        self.credits_watermark = IdWatermark(settings.watermark_settle_seconds)
+        self.payments_watermark = IdWatermark(settings.watermark_settle_seconds)
+        self.refreshed_at: float = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        return self.issuances.nbytes + self.payments.nbytes
+
+    def is_stale(self) -> bool:
+        age = time.monotonic() - self.refreshed_at
+        return age >= settings.daily_index_refresh_seconds
+
+    async def refresh(self) -> None:
+        async with self._lock:
+            await self._refresh()
+
+    async def _refresh(self) -> None:
+        # Runs on a session of its own: the refresh is shared by whichever
+        # requests find the index stale and must not end their transactions.
+        async for session in get_session():
+            await self._load(
+                session,
+                self.issuances,
+                self.credits_watermark,
+                Credit.id,
+                Credit.issuance_date,
+                Credit.body,
+            )
+            await self._load(
+                session,
+                self.payments,
+                self.payments_watermark,
+                Payment.id,
+                Payment.payment_date,
+                Payment.sum,
+            )
+        self.refreshed_at = time.monotonic()
+
+    @staticmethod
+    async def _load(
+        session: AsyncSession,
+        series: DailySeries,
+        watermark: IdWatermark,
+        id_column: Any,
+        day_column: Any,
+        amount_column: Any,
+    ) -> None:
+        ids: list[int] = []
+        async for rows in read_unseen(
+            session,
+            watermark,
+            id_column,
+            (day_column, amount_column),
+            settings.columnar_load_chunk_size,
+        ):
+            series.add([(day, amount) for _id, day, amount in rows])
+            ids += [row[0] for row in rows]
+        watermark.advance(ids)
+
+    async def refresh_if_stale(self) -> None:
+        if not self.is_stale():
+            return
+        async with self._lock:
+            # Requests queued behind a refresh find it done.
+            if self.is_stale():
+                await self._refresh()
+
+    def sum_issuances(self, start_date: date, end_date: date) -> Decimal:
+        return from_minor(self.issuances.range_sum(start_date, end_date))
+
+    def sum_payments(self, start_date: date, end_date: date) -> Decimal:
+        return from_minor(self.payments.range_sum(start_date, end_date))
+
+    def daily_issuances(self, start_date: date, end_date: date) -> dict[date, Decimal]:
+        return {
+            d: from_minor(v)
+            for d, v in self.issuances.by_day(start_date, end_date).items()
+        }
+
+    def daily_payments(self, start_date: date, end_date: date) -> dict[date, Decimal]:
+        return {
+            d: from_minor(v)
+            for d, v in self.payments.by_day(start_date, end_date).items()
+        }
+
+
+_index: Optional[DailyTotalsIndex] = None
+
+
+async def init_daily_index(index: DailyTotalsIndex | None = None) -> None:
+    global _index
+    if _index is None:
+        index = index or DailyTotalsIndex()
+        await index.refresh()
+        _index = index
+        logger.info(
+            "Daily totals index loaded: %d issuance day(s), %d payment day(s), "
+            "%d byte(s)",
+            index.issuances.daily.size,
+            index.payments.daily.size,
+            index.nbytes,
+        )
+
+
+def get_daily_index() -> DailyTotalsIndex:
+    if _index is None:
+        raise RuntimeError("Daily totals index not initialized yet")
+    return _index
+
+
+def dispose_daily_index() -> None:
+    global _index
+    _index = None
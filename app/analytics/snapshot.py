@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import json
+import logging
+import shutil
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..core.config import settings
+from ..db.session import get_session
+from ..repositories.backend import build_data_version_repository
+from ..schemas.data_version import ContentFingerprint, DataVersion
+from .columnar import CREDIT_SCHEMA, PAYMENT_SCHEMA, ColumnarStore, ColumnTable
+from .daily_index import DailySeries, DailyTotalsIndex
+from .units import from_minor
+from .watermark import IdWatermark
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION: int = 4
+MANIFEST_NAME: str = "manifest.json"
+
+
+class Snapshot:
+    def __init__(
+        self,
+        store: ColumnarStore,
+        index: DailyTotalsIndex,
+        data_version: DataVersion,
+        manifest: dict[str, Any],
+    ) -> None:
+        self.store = store
+        self.index = index
+        self.data_version = data_version
+        self.manifest = manifest
+
+
+# Open gaps are saved with the watermark and count as freshly noticed when
+# the snapshot is mapped, so ids still in flight at export time are re-read.
+def _watermark_manifest(watermark: IdWatermark) -> dict[str, Any]:
+    return {"top": watermark.top, "gaps": watermark.gap_ranges()}
+
+
+def _watermark(meta: dict[str, Any]) -> IdWatermark:
+    return IdWatermark(
+        settings.watermark_settle_seconds,
+        int(meta["top"]),
+        [(int(lo), int(hi)) for lo, hi in meta["gaps"]],
+    )
+
+
+# Covers the rows up to the columnar watermark; the database must still
+# hold exactly those rows for the snapshot to be used.
+def _fingerprint_manifest(
+    table: ColumnTable, amount_column: str, upto_id: int
+) -> dict[str, Any]:
+    ids = table.column("id")
+    mask = ids <= upto_id
+    fingerprint = ContentFingerprint(
+        rows=int(mask.sum()),
+        id_sum=int(ids[mask].sum(dtype=np.int64)),
+        amount=from_minor(table.column(amount_column)[mask].sum(dtype=np.int64)),
+    )
+    return {"upto": upto_id, **fingerprint.model_dump(mode="json")}
+
+
+def export_snapshot(
+    path: Path,
+    store: ColumnarStore,
+    index: DailyTotalsIndex,
+    data_version: DataVersion,
+) -> dict[str, Any]:
+    staging = path.with_name(f"{path.name}.tmp-{time.time_ns()}")
+    staging.mkdir(parents=True)
+
+    tables: dict[str, Any] = {}
+    for table_name, table in (("credits", store.credits), ("payments", store.payments)):
+        columns: dict[str, Any] = {}
+        for column in table.schema:
+            values = table.column(column)
+            file_name = f"{table_name}.{column}.npy"
+            np.save(staging / file_name, np.ascontiguousarray(values))
+            columns[column] = {"file": file_name, "dtype": values.dtype.str}
+        tables[table_name] = {"rows": len(table), "columns": columns}
+
+    aggregates: dict[str, Any] = {}
+    for series_name, series in (
+        ("daily_issuances", index.issuances),
+        ("daily_payments", index.payments),
+    ):
+        np.save(staging / f"{series_name}.daily.npy", series.daily)
+        np.save(staging / f"{series_name}.prefix.npy", series.prefix)
+        aggregates[series_name] = {
+            "origin": series.origin,
+            "daily": f"{series_name}.daily.npy",
+            "prefix": f"{series_name}.prefix.npy",
+        }
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "data_version": data_version.model_dump(),
+        "stamp": data_version.stamp,
+        "watermarks": {
+            "columnar": {
+                "credits": _watermark_manifest(store.credits_watermark),
+                "payments": _watermark_manifest(store.payments_watermark),
+            },
+            "index": {
+                "credits": _watermark_manifest(index.credits_watermark),
+                "payments": _watermark_manifest(index.payments_watermark),
+            },
+        },
+        "fingerprints": {
+            "credits": _fingerprint_manifest(
+                store.credits, "body", store.credits_watermark.value
+            ),
+            "payments": _fingerprint_manifest(
+                store.payments, "sum", store.payments_watermark.value
+            ),
+        },
+        "tables": tables,
+        "aggregates": aggregates,
+    }
+    (staging / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2))
+
+    if path.exists():
+        shutil.rmtree(path)
+    staging.rename(path)
+    return manifest
+
+
+def load_snapshot(path: Path, mmap: bool = True) -> Snapshot:
+    manifest = json.loads((path / MANIFEST_NAME).read_text())
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported snapshot format {manifest.get('format_version')!r}"
+        )
+    mmap_mode = "r" if mmap else None
+
+    def _table(name: str, schema: dict[str, Any]) -> ColumnTable:
+        columns = manifest["tables"][name]["columns"]
+        return ColumnTable(
+            schema,
+            {
+                column: np.load(path / columns[column]["file"], mmap_mode=mmap_mode)
+                for column in schema
+            },
+        )
+
+    def _series(name: str) -> DailySeries:
+        meta = manifest["aggregates"][name]
+        return DailySeries(
+            int(meta["origin"]),
+            np.load(path / meta["daily"], mmap_mode=mmap_mode),
+            np.load(path / meta["prefix"], mmap_mode=mmap_mode),
+        )
+
+    store = ColumnarStore(
+        _table("credits", CREDIT_SCHEMA), _table("payments", PAYMENT_SCHEMA)
+    )
+    watermarks = manifest["watermarks"]
+    store.credits_watermark = _watermark(watermarks["columnar"]["credits"])
+    store.payments_watermark = _watermark(watermarks["columnar"]["payments"])
+    index = DailyTotalsIndex()
+    index.issuances = _series("daily_issuances")
+    index.payments = _series("daily_payments")
+    index.credits_watermark = _watermark(watermarks["index"]["credits"])
+    index.payments_watermark = _watermark(watermarks["index"]["payments"])
+
+    return Snapshot(store, index, DataVersion(**manifest["data_version"]), manifest)
+
+
+async def current_data_version() -> DataVersion:
+    async for session in get_session():
+        version = await build_data_version_repository(session).current()
+    return version
+
+
+async def changed_tables(manifest: dict[str, Any]) -> list[str]:
+    changed: list[str] = []
+    async for session in get_session():
+        repo = build_data_version_repository(session)
+        for table, meta in manifest["fingerprints"].items():
+            expected = ContentFingerprint(**meta)
+            if await repo.fingerprint(table, int(meta["upto"])) != expected:
+                changed.append(table)
+    return changed
+
+
+async def load_snapshot_if_current(path: Path) -> Optional[Snapshot]:
+    if not (path / MANIFEST_NAME).exists():
+        return None
+    # Any failure leaves the caller to load from the database; only the
+    # unexpected ones get a traceback.
+    try:
+        snapshot = load_snapshot(path)
+    except (OSError, ValueError, KeyError) as exc:
+        logger.warning("Ignoring snapshot %s: cannot map it: %r", path, exc)
+        return None
+    except Exception:
+        logger.exception("Failed to map snapshot at %s", path)
+        return None
+
+    try:
+        db_version = await current_data_version()
+        if not db_version.covers(snapshot.data_version):
+            logger.warning(
+                "Ignoring snapshot %s: it is ahead of the database (%s > %s)",
+                path,
+                snapshot.data_version.stamp,
+                db_version.stamp,
+            )
+            return None
+        changed = await changed_tables(snapshot.manifest)
+    except SQLAlchemyError as exc:
+        logger.warning("Ignoring snapshot %s: cannot check it: %r", path, exc)
+        return None
+    if changed:
+        logger.warning(
+            "Ignoring snapshot %s: %s changed below its watermark",
+            path,
+            ", ".join(changed),
+        )
+        return None
+    return snapshot
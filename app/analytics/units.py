@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+MINOR_UNITS: int = 10_000  # DECIMAL(16, 4)
+QUANTUM: Decimal = Decimal("0.0001")
+
+
+def to_minor(value) -> int:
+    return int((Decimal(str(value)) * MINOR_UNITS).to_integral_value())
+
+
+def from_minor(value: int) -> Decimal:
+    # Same scale as the DECIMAL(16, 4) values the SQL path returns.
+    return (Decimal(int(value)) / MINOR_UNITS).quantize(QUANTUM)
+
+
+def day_number(value: date) -> int:
+    return value.toordinal()
+
+
+def from_day_number(value: int) -> date:
+    return date.fromordinal(int(value))
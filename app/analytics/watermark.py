@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import time
+from bisect import bisect_left, bisect_right
+from typing import Any, AsyncIterator, Iterable, Optional, Sequence
+
+from sqlalchemy import ColumnElement, Row, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# With more open gaps than this the reload query becomes a single range scan
+# from the watermark and rows loaded before are skipped in Python.
+MAX_GAP_RANGES: int = 200
+
+Gap = tuple[int, int, float]  # first id, last id, monotonic time first noticed
+
+
+def _missing(lo: int, hi: int, ids: Sequence[int]) -> list[tuple[int, int]]:
+    # Ranges of [lo, hi] not covered by the sorted `ids`.
+    ranges: list[tuple[int, int]] = []
+    for i in ids:
+        if i > lo:
+            ranges.append((lo, i - 1))
+        lo = i + 1
+    if lo <= hi:
+        ranges.append((lo, hi))
+    return ranges
+
+
+# Auto-increment ids are handed out at insert time but only become visible at
+# commit, so concurrent writers can commit a lower id after a higher one has
+# already been read. Every id up to `value` is loaded; the missing ids above it
+# are kept as gaps and read again on each refresh until their rows show up or
+# the gap has stayed empty for `settle_seconds` (a rolled-back insert). A
+# writer holding its transaction open longer than that can still be missed.
+class IdWatermark:
+    def __init__(
+        self,
+        settle_seconds: float,
+        top: int = 0,
+        gaps: Iterable[tuple[int, int]] = (),
+    ) -> None:
+        now = time.monotonic()
+        self.settle_seconds = settle_seconds
+        self.top = top
+        self.gaps: list[Gap] = [(lo, hi, now) for lo, hi in gaps]
+        self._starts = [lo for lo, _hi, _noticed in self.gaps]
+
+    @property
+    def value(self) -> int:
+        return self.gaps[0][0] - 1 if self.gaps else self.top
+
+    def gap_ranges(self) -> list[tuple[int, int]]:
+        return [(lo, hi) for lo, hi, _noticed in self.gaps]
+
+    def unseen(self, column: Any) -> ColumnElement[bool]:
+        if len(self.gaps) > MAX_GAP_RANGES:
+            return column > self.value
+        return or_(
+            column > self.top, *(column.between(lo, hi) for lo, hi, _ in self.gaps)
+        )
+
+    def is_unseen(self, id_: int) -> bool:
+        if id_ > self.top:
+            return True
+        i = bisect_right(self._starts, id_) - 1
+        return i >= 0 and id_ <= self.gaps[i][1]
+
+    def advance(self, ids: Iterable[int], now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        ids = sorted(ids)
+        gaps: list[Gap] = []
+        for lo, hi, noticed in self.gaps:
+            inside = ids[bisect_left(ids, lo) : bisect_right(ids, hi)]
+            gaps += [(a, b, noticed) for a, b in _missing(lo, hi, inside)]
+        fresh = ids[bisect_right(ids, self.top) :]
+        if fresh:
+            gaps += [(a, b, now) for a, b in _missing(self.top + 1, fresh[-1], fresh)]
+            self.top = fresh[-1]
+        self.gaps = [g for g in gaps if now - g[2] < self.settle_seconds]
+        self._starts = [lo for lo, _hi, _noticed in self.gaps]
+
+
+async def read_unseen(
+    session: AsyncSession,
+    watermark: IdWatermark,
+    id_column: Any,
+    columns: Sequence[Any],
+    chunk_size: int,
+) -> AsyncIterator[list[Row]]:
+    # Yields the rows the watermark has not seen yet, in id order and in
+    # chunks; the caller advances the watermark once it has taken them all.
+    cursor: Optional[int] = None
+    while True:
+        stmt = select(id_column, *columns).where(watermark.unseen(id_column))
+        if cursor is not None:
+            stmt = stmt.where(id_column > cursor)
+        rows = (await session.execute(stmt.order_by(id_column).limit(chunk_size))).all()
+        if rows:
+            cursor = rows[-1][0]
+            yield [r for r in rows if watermark.is_unseen(r[0])]
+        if len(rows) < chunk_size:
+            return
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+from typing import AsyncGenerator, AsyncIterator, Callable, Optional
+
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+from ..core.config import settings
+
+INTERACTIVE: str = "interactive"
+REPORTS: str = "reports"
+IMPORTS: str = "imports"
+
+
+class AdmissionClass:
+    def __init__(self, name: str, priority: int, limit: int, queue_size: int) -> None:
+        self.name = name
+        self.priority = priority
+        self.limit = limit
+        self.queue_size = queue_size
+        self.running = 0
+        self.waiting = 0
+        self.admitted_total = 0
+        self.rejected_total = 0
+        self.timed_out_total = 0
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, admission_class: str, reason: str) -> None:
+        super().__init__(f"{admission_class}: {reason}")
+        self.admission_class = admission_class
+        self.reason = reason
+
+
+# Shares `capacity` request slots between priority classes. A class runs at
+# most `limit` requests at once and parks at most `queue_size` more; a freed
+# slot goes to the highest-priority waiter whose class still has room.
+class AdmissionController:
+    def __init__(
+        self, capacity: int, classes: list[AdmissionClass], wait_timeout: float
+    ) -> None:
+        self.capacity = capacity
+        self.wait_timeout = wait_timeout
+        self.classes = {c.name: c for c in classes}
+        self.in_use = 0
+        self._waiters: list[tuple[int, int, AdmissionClass, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    def _can_start(self, cls: AdmissionClass) -> bool:
+        return self.in_use < self.capacity and cls.running < cls.limit
+
+    def _start(self, cls: AdmissionClass) -> None:
+        self.in_use += 1
+        cls.running += 1
+        cls.admitted_total += 1
+
+    async def acquire(self, name: str) -> None:
+        cls = self.classes[name]
+        # Every release hands slots to runnable waiters before returning, so
+        # when a slot is free here nobody eligible is queued for it.
+        if self._can_start(cls):
+            self._start(cls)
+            return
+        if cls.waiting >= cls.queue_size:
+            cls.rejected_total += 1
+            raise AdmissionRejected(name, "queue_full")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (cls.priority, next(self._seq), cls, future))
+        cls.waiting += 1
+        try:
+            await asyncio.wait_for(future, self.wait_timeout)
+        except asyncio.TimeoutError:
+            cls.timed_out_total += 1
+            raise AdmissionRejected(name, "timeout")
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(name)
+            raise
+        finally:
+            cls.waiting -= 1
+
+    def release(self, name: str) -> None:
+        cls = self.classes[name]
+        self.in_use -= 1
+        cls.running -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        blocked = []
+        while self._waiters and self.in_use < self.capacity:
+            entry = heapq.heappop(self._waiters)
+            _priority, _seq, cls, future = entry
+            if future.done():
+                continue
+            if cls.running >= cls.limit:
+                blocked.append(entry)
+                continue
+            self._start(cls)
+            future.set_result(None)
+        for entry in blocked:
+            heapq.heappush(self._waiters, entry)
+
+    def metrics(self) -> list[str]:
+        lines = [
+            "# TYPE admission_capacity gauge",
+            f"admission_capacity {self.capacity}",
+            "# TYPE admission_in_use gauge",
+            f"admission_in_use {self.in_use}",
+        ]
+        for metric, kind, attr in (
+            ("admission_running", "gauge", "running"),
+            ("admission_queue_depth", "gauge", "waiting"),
+            ("admission_admitted_total", "counter", "admitted_total"),
+            ("admission_rejected_total", "counter", "rejected_total"),
+            ("admission_timed_out_total", "counter", "timed_out_total"),
+        ):
+            lines.append(f"# TYPE {metric} {kind}")
+            lines += [
+                f'{metric}{{class="{c.name}"}} {getattr(c, attr)}'
+                for c in self.classes.values()
+            ]
+        return lines
+
+
+def parse_admission_classes(spec: str) -> list[AdmissionClass]:
+    classes: list[AdmissionClass] = []
+    for priority, item in enumerate(p for p in spec.split(",") if p.strip()):
+        name, limit, queue_size = item.strip().split(":")
+        classes.append(AdmissionClass(name, priority, int(limit), int(queue_size)))
+    return classes
+
+
+_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> Optional[AdmissionController]:
+    global _controller
+    if _controller is None and settings.admission_enabled:
+        _controller = AdmissionController(
+            settings.admission_capacity,
+            parse_admission_classes(settings.admission_classes),
+            settings.admission_wait_timeout_seconds,
+        )
+    return _controller
+
+
+async def _acquire(controller: AdmissionController, name: str) -> None:
+    try:
+        await controller.acquire(name)
+    except AdmissionRejected as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Server busy ({exc.reason}), retry later",
+            headers={"Retry-After": str(settings.admission_retry_after_seconds)},
+        )
+
+
+def admission(name: str) -> Callable[[], AsyncGenerator[None, None]]:
+    async def dependency() -> AsyncGenerator[None, None]:
+        controller = get_admission_controller()
+        if controller is None:
+            yield
+            return
+        await _acquire(controller, name)
+        try:
+            yield
+        finally:
+            controller.release(name)
+
+    return dependency
+
+
+class AdmissionSlot:
+    def __init__(self, controller: Optional[AdmissionController], name: str) -> None:
+        self.controller = controller
+        self.name = name
+        self.attached = False
+        self._released = controller is None
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self.controller.release(self.name)
+
+    async def _hold(self, body: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        try:
+            async with contextlib.aclosing(body):
+                async for chunk in body:
+                    yield chunk
+        finally:
+            self.release()
+
+    def attach(self, response: StreamingResponse) -> StreamingResponse:
+        # Released when the body is done or fails. A client leaving mid-body
+        # (or before it started) leaves the body suspended; the background
+        # task, which runs either way, closes it so its session goes back
+        # right away instead of whenever the generator is collected.
+        body = response.body_iterator = self._hold(response.body_iterator)
+
+        async def finish() -> None:
+            await body.aclose()
+            self.release()
+
+        response.background = BackgroundTask(finish)
+        self.attached = True
+        return response
+
+
+# For streaming endpoints. Dependency teardown runs before a streaming body
+# is sent, so `admission` would free the slot before the body's queries
+# run; this one hands the slot to the response via AdmissionSlot.attach.
+def admission_slot(name: str) -> Callable[[], AsyncGenerator[AdmissionSlot, None]]:
+    async def dependency() -> AsyncGenerator[AdmissionSlot, None]:
+        controller = get_admission_controller()
+        if controller is not None:
+            await _acquire(controller, name)
+        slot = AdmissionSlot(controller, name)
+        try:
+            yield slot
+        finally:
+            if not slot.attached:
+                slot.release()
+
+    return dependency
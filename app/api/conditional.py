@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response, status
+
+from ..cache.version import get_data_version_tracker
+from ..core.config import settings
+
+YEAR_PERFORMANCE_TABLES: tuple[str, ...] = ("credits", "payments", "plans")
+PLANS_PERFORMANCE_TABLES: tuple[str, ...] = (
+    "credits",
+    "payments",
+    "plans",
+    "dictionary",
+)
+
+
+class ConditionalRequest:
+    def __init__(
+        self, request: Request, etag: str, last_modified: datetime, max_age: int
+    ) -> None:
+        self.request = request
+        self.etag = etag
+        self.last_modified = last_modified
+        self.max_age = max_age
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {
+            "ETag": self.etag,
+            "Last-Modified": format_datetime(self.last_modified, usegmt=True),
+            "Cache-Control": f"public, max-age={self.max_age}",
+            "Vary": "X-API-Key, Accept",
+        }
+
+    @property
+    def not_modified(self) -> bool:
+        if_none_match = self.request.headers.get("if-none-match")
+        if if_none_match is not None:
+            candidates = {tag.strip() for tag in if_none_match.split(",")}
+            if "*" in candidates:
+                return True
+            return _weak(self.etag) in {_weak(tag) for tag in candidates}
+
+        if_modified_since = self.request.headers.get("if-modified-since")
+        if if_modified_since is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            return since.tzinfo is not None and self.last_modified <= since
+        return False
+
+    def not_modified_response(self) -> Response:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=self.headers)
+
+    def apply(self, response: Response) -> None:
+        response.headers.update(self.headers)
+
+
+def _weak(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+async def evaluate_conditional(
+    request: Request, resource: str, tables: tuple[str, ...], closed: bool
+) -> ConditionalRequest:
+    tracker = get_data_version_tracker()
+    version = await tracker.current(settings.data_version_max_age_seconds)
+    raw = (
+        resource
+        + "|"
+        + ",".join("{}={}.{}".format(t, *version.table_version(t)) for t in tables)
+    )
+    etag = 'W/"' + hashlib.sha1(raw.encode()).hexdigest()[:20] + '"'
+    max_age = (
+        settings.closed_period_max_age_seconds
+        if closed
+        else settings.open_period_max_age_seconds
+    )
+    return ConditionalRequest(request, etag, tracker.last_modified(tables), max_age)
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from typing import AsyncGenerator, Optional
+
+from fastapi import Depends, Request
+
+from ..core.config import settings
+from ..db.session import LazySession, set_statement_deadline, watch_client
+from .deps import get_db_session
+
+logger = logging.getLogger(__name__)
+
+
+def parse_statement_deadlines(spec: str) -> dict[str, int]:
+    deadlines: dict[str, int] = {}
+    for item in (p for p in spec.split(",") if p.strip()):
+        route, ms = item.strip().split(":")
+        deadlines[route] = int(ms)
+    return deadlines
+
+
+_deadlines: Optional[dict[str, int]] = None
+
+
+def get_statement_deadlines() -> dict[str, int]:
+    global _deadlines
+    if _deadlines is None:
+        _deadlines = parse_statement_deadlines(settings.statement_deadlines)
+    return _deadlines
+
+
+# Deadlines are keyed by route name; MySQL turns them into a
+# MAX_EXECUTION_TIME hint on every SELECT the request runs.
+async def statement_deadline(request: Request) -> None:
+    route = request.scope.get("route")
+    set_statement_deadline(
+        get_statement_deadlines().get(
+            getattr(route, "name", ""), settings.statement_deadline_default_ms
+        )
+    )
+
+
+async def _watch_disconnect(
+    request: Request, session: LazySession, gone: asyncio.Event
+) -> None:
+    # Only for bodiless GETs: the first message is the empty request body,
+    # the next one arrives when the client goes away.
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+    gone.set()
+    if session.is_bound and await session.kill_query():
+        logger.info("Client left %s, killed its running query", request.url.path)
+
+
+# A client giving up on a long report should not keep its aggregate running;
+# the kill surfaces as an interrupted query, the transaction is rolled back
+# and the connection goes back to the pool as usual. Cached reports run on a
+# session of their own (see cached_method); the request stops waiting on them
+# and the last one to leave kills that query.
+async def cancel_on_disconnect(
+    request: Request, session: LazySession = Depends(get_db_session)
+) -> AsyncGenerator[None, None]:
+    if not settings.cancel_on_disconnect or not isinstance(session, LazySession):
+        yield
+        return
+    watcher = asyncio.create_task(_watch_disconnect(request, session, watch_client()))
+    try:
+        yield
+    finally:
+        watcher.cancel()
+        with contextlib.suppress(asyncio.CancelledError, Exception):
+            await watcher
@@ -1,34 +1,51 @@
 from __future__ import annotations
 
-from typing import Any, AsyncGenerator
+from typing import Any, AsyncGenerator, cast
 
-from fastapi import Depends, Header, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Path, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..analytics.backend import build_performance_repository
+from ..cache.calls import register_service_factory
 from ..core.config import settings
-from ..db.session import get_session
-from ..repositories.credit_repository import (
-    CreditRepository,
-    CreditRepositorySQLAlchemy,
+from ..db.session import get_lazy_session
+from ..repositories.backend import (
+    build_change_feed_repository,
+    build_credit_repository,
+    build_data_version_repository,
+    build_dictionary_repository,
+    build_payment_repository,
+    build_plans_repository,
+    build_user_repository,
+    require_database,
 )
-from ..repositories.dictionary_repository import (
-    DictionaryRepository,
-    DictionaryRepositorySQLAlchemy,
+from ..repositories.change_feed_repository import (
+    CHANGE_FEED_TABLES,
+    ChangeFeedRepository,
 )
-from ..repositories.performance_repository import (
-    PerformanceRepository,
-    PerformanceRepositorySQLAlchemy,
-)
-from ..repositories.plans_repository import PlansRepository, PlansRepositorySQLAlchemy
+from ..repositories.credit_repository import CreditRepository
+from ..repositories.data_version_repository import DataVersionRepository
+from ..repositories.dictionary_repository import DictionaryRepository
+from ..repositories.loader import RequestLoaders
+from ..repositories.payment_repository import PaymentRepository
+from ..repositories.performance_repository import PerformanceRepository
+from ..repositories.plans_repository import PlansRepository
+from ..repositories.user_repository import UserRepository
+from ..services.change_feed_service import ChangeFeedService, get_feed_horizon
+from ..services.export_service import CreditExportService
+from ..services.ingest_service import IngestService
+from ..services.payment_history_service import PaymentHistoryService
 from ..services.plan_import_service import PlansInsertService
 from ..services.plan_performance_service import PlansService
+from ..services.portfolio_aging_service import PortfolioAgingService
 from ..services.user_credits_service import UserCreditService
 from ..services.year_performance_service import PerformanceService
+from .rate_limit import get_rate_limiter
 
 
 async def get_db_session() -> AsyncGenerator[AsyncSession, Any]:
-    async for s in get_session():
-        yield s
+    async for s in get_lazy_session():
+        yield cast(AsyncSession, s)
 
 
 async def require_api_key(x_api_key: str | None = Header(None)) -> None:
@@ -36,34 +53,110 @@ async def require_api_key(x_api_key: str | None = Header(None)) -> None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key"
         )
+    limiter = get_rate_limiter()
+    if limiter is not None:
+        retry_after = limiter.check(x_api_key or "")
+        if retry_after:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Rate limit exceeded",
+                headers={"Retry-After": str(retry_after)},
+            )
+
+
+async def get_request_loaders(
+    session: AsyncSession = Depends(get_db_session),
+) -> RequestLoaders:
+    user_repo: UserRepository = build_user_repository(session)
+    credit_repo: CreditRepository = build_credit_repository(session)
+    dict_repo: DictionaryRepository = build_dictionary_repository(session)
+    return RequestLoaders(user_repo, credit_repo, dict_repo)
 
 
 async def get_user_credit_service(
     session: AsyncSession = Depends(get_db_session),
 ) -> UserCreditService:
-    repo: CreditRepository = CreditRepositorySQLAlchemy(session)
+    repo: CreditRepository = build_credit_repository(session)
     return UserCreditService(repo)
 
 
+async def get_payment_history_service(
+    session: AsyncSession = Depends(get_db_session),
+) -> PaymentHistoryService:
+    payment_repo: PaymentRepository = build_payment_repository(session)
+    credit_repo: CreditRepository = build_credit_repository(session)
+    return PaymentHistoryService(payment_repo, credit_repo)
+
+
 async def get_performance_service(
     session: AsyncSession = Depends(get_db_session),
 ) -> PerformanceService:
-    repo: PerformanceRepository = PerformanceRepositorySQLAlchemy(session)
+    repo: PerformanceRepository = build_performance_repository(session)
     return PerformanceService(repo)
 
 
 async def get_plans_service(
     session: AsyncSession = Depends(get_db_session),
 ) -> PlansService:
-    plans_repo: PlansRepository = PlansRepositorySQLAlchemy(session)
-    dict_repo: DictionaryRepository = DictionaryRepositorySQLAlchemy(session)
-    performance_repo: PerformanceRepository = PerformanceRepositorySQLAlchemy(session)
+    plans_repo: PlansRepository = build_plans_repository(session)
+    dict_repo: DictionaryRepository = build_dictionary_repository(session)
+    performance_repo: PerformanceRepository = build_performance_repository(session)
     return PlansService(plans_repo, dict_repo, performance_repo)
 
 
 async def get_plans_insert_service(
     session: AsyncSession = Depends(get_db_session),
+    loaders: RequestLoaders = Depends(get_request_loaders),
 ) -> PlansInsertService:
-    repo: PlansRepository = PlansRepositorySQLAlchemy(session)
-    dict_repo: DictionaryRepository = DictionaryRepositorySQLAlchemy(session)
-    return PlansInsertService(repo, dict_repo)
+    repo: PlansRepository = build_plans_repository(session)
+    version_repo: DataVersionRepository = build_data_version_repository(session)
+    return PlansInsertService(repo, loaders, version_repo)
+
+
+async def get_portfolio_aging_service(
+    session: AsyncSession = Depends(get_db_session),
+) -> PortfolioAgingService:
+    repo: CreditRepository = build_credit_repository(session)
+    return PortfolioAgingService(repo)
+
+
+async def get_credit_export_service(
+    session: AsyncSession = Depends(get_db_session),
+) -> CreditExportService:
+    repo: CreditRepository = build_credit_repository(session)
+    return CreditExportService(repo)
+
+
+async def get_change_feed_service(
+    table: str = Path(..., pattern="^(" + "|".join(CHANGE_FEED_TABLES) + ")$"),
+    session: AsyncSession = Depends(get_db_session),
+) -> ChangeFeedService:
+    repo: ChangeFeedRepository = build_change_feed_repository(
+        session, CHANGE_FEED_TABLES[table]
+    )
+    return ChangeFeedService(repo, get_feed_horizon(table))
+
+
+async def get_ingest_service(
+    session: AsyncSession = Depends(get_db_session),
+) -> IngestService:
+    # Ingestion writes payments and keeps credit totals in SQL.
+    require_database("Ingestion")
+    credit_repo: CreditRepository = build_credit_repository(session)
+    payment_repo: PaymentRepository = build_payment_repository(session)
+    user_repo: UserRepository = build_user_repository(session)
+    version_repo: DataVersionRepository = build_data_version_repository(session)
+    return IngestService(
+        credit_repo,
+        payment_repo,
+        user_repo,
+        version_repo,
+        settings.ingest_batch_size,
+        settings.ingest_max_line_bytes,
+        settings.ingest_max_reported_errors,
+    )
+
+
+register_service_factory(PerformanceService, get_performance_service)
+register_service_factory(PlansService, get_plans_service)
+register_service_factory(PortfolioAgingService, get_portfolio_aging_service)
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import datetime
+import decimal
+import types
+import typing
+from typing import Any
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+JSON: str = "application/json"
+MSGPACK: str = "application/msgpack"
+ARROW_STREAM: str = "application/vnd.apache.arrow.stream"
+
+MEDIA_ALIASES: dict[str, str] = {"application/x-msgpack": MSGPACK}
+
+# DECIMAL(16, 4) columns and their sums fit comfortably; values with more
+# than four fractional digits make pyarrow raise instead of rounding.
+ARROW_DECIMAL_PRECISION: int = 38
+ARROW_DECIMAL_SCALE: int = 4
+
+
+def _parse_accept(header: str) -> list[tuple[float, int, str]]:
+    ranges: list[tuple[float, int, str]] = []
+    for position, item in enumerate(header.split(",")):
+        media, *params = (part.strip() for part in item.split(";"))
+        if not media:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        ranges.append((q, -position, MEDIA_ALIASES.get(media.lower(), media.lower())))
+    return sorted(ranges, reverse=True)
+
+
+# Browsers and generic clients send Accept headers like text/html; those get
+# the default (JSON, listed first) rather than a 406.
+def negotiate(accept: str | None, offered: tuple[str, ...]) -> str:
+    if not accept:
+        return offered[0]
+    for q, _position, media in _parse_accept(accept):
+        if q <= 0:
+            continue
+        if media in offered:
+            return media
+        if media in ("*/*", "application/*"):
+            return offered[0]
+    return offered[0]
+
+
+def encode_msgpack(payload: BaseModel) -> bytes:
+    import msgpack
+
+    # mode="json" keeps Decimals as exact strings and dates as ISO strings,
+    # matching the JSON representation field for field.
+    return msgpack.packb(payload.model_dump(mode="json"), use_bin_type=True)
+
+
+def _arrow_type(annotation: Any):
+    import pyarrow as pa
+
+    if isinstance(annotation, types.UnionType) or typing.get_origin(annotation) is (
+        typing.Union
+    ):
+        (annotation,) = [a for a in typing.get_args(annotation) if a is not type(None)]
+    return {
+        bool: pa.bool_(),
+        int: pa.int64(),
+        float: pa.float64(),
+        str: pa.string(),
+        datetime.date: pa.date32(),
+        decimal.Decimal: pa.decimal128(ARROW_DECIMAL_PRECISION, ARROW_DECIMAL_SCALE),
+    }[annotation]
+
+
+def encode_arrow(rows: list[BaseModel], row_type: type[BaseModel]) -> bytes:
+    import pyarrow as pa
+
+    fields = row_type.model_fields
+    schema = pa.schema(
+        [
+            pa.field(name, _arrow_type(field.annotation))
+            for name, field in fields.items()
+        ]
+    )
+    table = pa.table(
+        {name: [getattr(row, name) for row in rows] for name in fields},
+        schema=schema,
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def negotiate_request(request: Request, offered: tuple[str, ...]) -> str:
+    return negotiate(request.headers.get("accept"), offered)
+
+
+# Arrow is only offered for responses shaped as ``{"items": [row, ...]}``;
+# the stream carries the rows, typed from ``row_type``'s fields.
+def encoded_response(
+    media: str,
+    payload: BaseModel,
+    row_type: type[BaseModel] | None = None,
+    headers: dict[str, str] | None = None,
+) -> Response:
+    if media == ARROW_STREAM and row_type is not None:
+        body = encode_arrow(getattr(payload, "items"), row_type)
+    else:
+        body = encode_msgpack(payload)
+    return Response(
+        body, media_type=media, headers={"Vary": "Accept", **(headers or {})}
+    )
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import csv
+import io
+import tempfile
+from typing import Any, AsyncIterator
+
+from fastapi.responses import StreamingResponse
+
+EXPORT_FORMATS: tuple[str, ...] = ("csv", "xlsx")
+EXPORT_FORMAT_PATTERN: str = "^(" + "|".join(EXPORT_FORMATS) + ")$"
+MEDIA_TYPES: dict[str, str] = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+XLSX_READ_SIZE: int = 64 * 1024
+
+RowChunks = AsyncIterator[list[list[Any]]]
+
+
+async def iter_csv(header: list[str], chunks: RowChunks) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # The BOM makes Excel open the file as UTF-8 rather than the local codepage.
+    buffer.write("\ufeff")
+    writer.writerow(header)
+    yield buffer.getvalue().encode()
+    async with contextlib.aclosing(chunks):
+        async for rows in chunks:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(rows)
+            yield buffer.getvalue().encode()
+
+
+def _append_rows(sheet, rows: list[list[Any]]) -> None:
+    for row in rows:
+        sheet.append(row)
+
+
+async def iter_xlsx(
+    title: str, header: list[str], chunks: RowChunks
+) -> AsyncIterator[bytes]:
+    from openpyxl import Workbook
+
+    # A write-only workbook spools rows to a temporary file as they are appended,
+    # so memory stays flat; the zip container can only be sent once complete.
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title)
+    sheet.append(header)
+    async with contextlib.aclosing(chunks):
+        async for rows in chunks:
+            await asyncio.to_thread(_append_rows, sheet, rows)
+
+    with tempfile.TemporaryFile() as tmp:
+        await asyncio.to_thread(workbook.save, tmp)
+        tmp.seek(0)
+        while chunk := await asyncio.to_thread(tmp.read, XLSX_READ_SIZE):
+            yield chunk
+
+
+def export_response(
+    name: str, export_format: str, header: list[str], chunks: RowChunks
+) -> StreamingResponse:
+    body = (
+        iter_xlsx(name, header, chunks)
+        if export_format == "xlsx"
+        else iter_csv(header, chunks)
+    )
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{name}.{export_format}"'
+        },
+    )
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from ..db.session import pool_metrics
+from .admission import get_admission_controller
+from .rate_limit import get_rate_limiter
+from .readiness import get_readiness
+
+
+def render_metrics() -> str:
+    lines: list[str] = []
+    for source in (
+        get_admission_controller(),
+        get_rate_limiter(),
+        pool_metrics,
+        get_readiness(),
+    ):
+        if source is not None:
+            lines += source.metrics()
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import hmac
+import json
+import os
+import random
+import time
+import uuid
+from pathlib import Path
+from typing import Any
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..core.config import settings
+from ..db.session import count_queries
+
+PROFILE_HEADER: bytes = b"x-profile"
+PROFILE_ID_HEADER: bytes = b"x-profile-id"
+PROFILE_SUFFIX: str = ".prof"
+META_SUFFIX: str = ".json"
+
+
+def _wants_profile(scope: Scope) -> bool:
+    if settings.profile_token:
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                return hmac.compare_digest(
+                    value, settings.profile_token.encode("latin-1")
+                )
+    return settings.profile_sample_rate > 0 and (
+        random.random() < settings.profile_sample_rate
+    )
+
+
+def _store(profiler: cProfile.Profile, profile_id: str, meta: dict[str, Any]) -> None:
+    directory = Path(settings.profile_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(directory / (profile_id + PROFILE_SUFFIX))
+    (directory / (profile_id + META_SUFFIX)).write_text(
+        json.dumps(meta, indent=2, default=str)
+    )
+
+    profiles = sorted(directory.glob("*" + PROFILE_SUFFIX), key=os.path.getmtime)
+    for path in profiles[: max(len(profiles) - settings.profile_max_files, 0)]:
+        path.unlink(missing_ok=True)
+        path.with_suffix(META_SUFFIX).unlink(missing_ok=True)
+
+
+# Runs selected /api requests under cProfile and keeps the pstats dump next to
+# a JSON sidecar with route, parameters, status, timing and query count. The
+# profiler sees the whole event-loop thread, so other requests interleaved on
+# the same worker show up too; only one request is profiled at a time.
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._active = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or self._active
+            or not scope["path"].startswith("/api/")
+            or not _wants_profile(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = "{}-{}".format(
+            time.strftime("%Y%m%dT%H%M%S"), uuid.uuid4().hex[:8]
+        )
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (PROFILE_ID_HEADER, profile_id.encode()),
+                ]
+            await send(message)
+
+        self._active = True
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        try:
+            with count_queries() as queries:
+                profiler.enable()
+                try:
+                    await self.app(scope, receive, send_wrapper)
+                finally:
+                    profiler.disable()
+        finally:
+            self._active = False
+            route = scope.get("route")
+            meta = {
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": getattr(route, "path", None),
+                "path_params": scope.get("path_params", {}),
+                "query_string": scope["query_string"].decode("latin-1"),
+                "status": status_code,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                "query_count": queries[0],
+            }
+            await asyncio.to_thread(_store, profiler, profile_id, meta)
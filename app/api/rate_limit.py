@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import math
+import time
+from typing import Optional
+
+from ..core.config import settings
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.limited_total = 0
+        self._buckets: dict[str, TokenBucket] = {}
+
+    def check(self, key: str) -> int:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.burst)
+        wait = bucket.take()
+        if wait:
+            self.limited_total += 1
+            return max(1, math.ceil(wait))
+        return 0
+
+    def metrics(self) -> list[str]:
+        return [
+            "# TYPE rate_limited_total counter",
+            f"rate_limited_total {self.limited_total}",
+            "# TYPE rate_limit_keys gauge",
+            f"rate_limit_keys {len(self._buckets)}",
+        ]
+
+
+_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    global _limiter
+    if _limiter is None and settings.rate_limit_per_second > 0:
+        _limiter = RateLimiter(
+            settings.rate_limit_per_second, settings.rate_limit_burst
+        )
+    return _limiter
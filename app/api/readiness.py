@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..cache.warmup import prime_hot_statements
+from ..core.config import settings
+from ..db.session import prewarm_pool
+
+logger = logging.getLogger(__name__)
+
+WarmupStep = Callable[[], Awaitable[object]]
+
+
+# Startup warm-up runs in the background so liveness answers immediately;
+# readiness flips only after every step has succeeded once. A step failing on
+# the database or network (still starting, say) is retried until it passes or
+# shutdown; anything else is a bug and leaves the instance unready. Once
+# stopping, readiness stays off while the rest of shutdown drains.
+class Readiness:
+    def __init__(self, steps: dict[str, WarmupStep], retry_delay: float) -> None:
+        self.steps = steps
+        self.retry_delay = retry_delay
+        self.done: dict[str, float] = {}
+        self.errors: dict[str, str] = {}
+        self.draining = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return not self.draining and len(self.done) == len(self.steps)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="startup-warmup")
+
+    async def stop(self) -> None:
+        self.draining = True
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        for name, step in self.steps.items():
+            while True:
+                started = time.perf_counter()
+                try:
+                    await step()
+                except (SQLAlchemyError, OSError) as exc:
+                    self.errors[name] = repr(exc)
+                    logger.warning("Warm-up step %s failed: %r", name, exc)
+                    await asyncio.sleep(self.retry_delay)
+                    continue
+                except Exception as exc:
+                    self.errors[name] = repr(exc)
+                    logger.exception("Warm-up step %s failed", name)
+                    return
+                self.done[name] = time.perf_counter() - started
+                self.errors.pop(name, None)
+                logger.info("Warm-up step %s done in %.3fs", name, self.done[name])
+                break
+
+    def status(self) -> dict[str, object]:
+        return {
+            "status": (
+                "draining" if self.draining else "ready" if self.ready else "warming_up"
+            ),
+            "steps": {
+                name: (
+                    {"state": "done", "seconds": round(self.done[name], 3)}
+                    if name in self.done
+                    else {"state": "pending", "error": self.errors.get(name)}
+                )
+                for name in self.steps
+            },
+        }
+
+    def metrics(self) -> list[str]:
+        return ["# TYPE ready gauge", f"ready {int(self.ready)}"]
+
+
+def _startup_steps() -> dict[str, WarmupStep]:
+    steps: dict[str, WarmupStep] = {}
+    # Only MySQL keeps a sized pool worth pre-filling.
+    if settings.prewarm_connections > 0 and settings.repository_backend == "mysql":
+        steps["pool"] = lambda: prewarm_pool(settings.prewarm_connections)
+    if settings.prewarm_statements:
+        steps["statements"] = lambda: prime_hot_statements(settings.warmup_concurrency)
+    return steps
+
+
+_readiness: Optional[Readiness] = None
+
+
+def get_readiness() -> Optional[Readiness]:
+    return _readiness
+
+
+def start_readiness_warmup() -> None:
+    global _readiness
+    if _readiness is None or _readiness.draining:
+        _readiness = Readiness(_startup_steps(), settings.readiness_retry_seconds)
+        _readiness.start()
+
+
+# Keeps the stopped instance so /ready reports draining for the rest of
+# shutdown.
+async def stop_readiness_warmup() -> None:
+    if _readiness is not None:
+        await _readiness.stop()
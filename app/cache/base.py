@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Any
+
+
+class ResultCache(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> Any | None:
+        raise NotImplementedError()
+
+    # `generation` is the one read before the value was computed; a write from
+    # a computation that overlapped an invalidate is dropped.
+    @abstractmethod
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: float | None = None,
+        generation: int | None = None,
+    ) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def invalidate(self) -> int:
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def generation(self) -> int:
+        raise NotImplementedError()
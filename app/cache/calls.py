@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import functools
+from typing import Any, Awaitable, Callable, Optional, TypeVar, cast
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..db.session import client_gone_event, get_lazy_session
+from ..exceptions.query_timeout import QueryTimeoutException
+from .base import ResultCache
+from .single_flight import SingleFlight
+
+R = TypeVar("R")
+ServiceFactory = Callable[[AsyncSession], Awaitable[Any]]
+
+_cache: Optional[ResultCache] = None
+_flights = SingleFlight()
+_service_factories: dict[type, ServiceFactory] = {}
+
+
+def init_result_cache() -> None:
+    global _cache
+    if _cache is None and settings.result_cache_backend == "memory":
+        from .memory import InMemoryResultCache
+
+        _cache = InMemoryResultCache(
+            settings.result_cache_max_entries, settings.result_cache_ttl_seconds
+        )
+    elif _cache is None and settings.result_cache_backend == "shared":
+        from .shared import SharedFileResultCache
+
+        _cache = SharedFileResultCache(
+            settings.result_cache_dir,
+            settings.result_cache_max_bytes,
+            settings.result_cache_ttl_seconds,
+        )
+
+
+def get_result_cache() -> ResultCache | None:
+    return _cache
+
+
+def dispose_result_cache() -> None:
+    global _cache
+    close = getattr(_cache, "close", None)
+    if close is not None:
+        close()
+    _cache = None
+
+
+# Lets a shared computation build its own copy of the service, see
+# cached_method.
+def register_service_factory(cls: type, factory: ServiceFactory) -> None:
+    _service_factories[cls] = factory
+
+
+def call_key(service: str, method: str, *args: Any, **kwargs: Any) -> str:
+    params = [str(arg) for arg in args]
+    params += [f"{name}={value}" for name, value in sorted(kwargs.items())]
+    return f"{service}.{method}:" + ",".join(params)
+
+
+def cached_method(
+    fn: Callable[..., Awaitable[R]],
+) -> Callable[..., Awaitable[R]]:
+    @functools.wraps(fn)
+    async def wrapper(self, *args: Any, **kwargs: Any) -> R:
+        key = call_key(type(self).__name__, fn.__name__, *args, **kwargs)
+        cache = get_result_cache()
+        if cache is not None:
+            value = await cache.get(key)
+            if value is not None:
+                return value
+
+        async def compute() -> R:
+            # Read before computing: an invalidate landing while fn runs
+            # means the result may predate the change and must not be kept.
+            generation = await cache.generation() if cache is not None else None
+            factory = _service_factories.get(type(self))
+            if factory is None:
+                result = await fn(self, *args, **kwargs)
+            else:
+                # The result is shared by every waiter, so it must not run on
+                # the first caller's request session: that caller leaving
+                # (or its query being killed) would fail them all. It is
+                # cancelled once the last waiter has left, and then stops its
+                # query on the server too.
+                async with contextlib.aclosing(get_lazy_session()) as sessions:
+                    async for session in sessions:
+                        service = await factory(cast(AsyncSession, session))
+                        try:
+                            result = await fn(service, *args, **kwargs)
+                        except asyncio.CancelledError:
+                            await session.kill_query()
+                            raise
+            if cache is not None:
+                await cache.set(key, result, generation=generation)
+            return result
+
+        gone = client_gone_event()
+        if gone is None:
+            return await _flights.do(key, compute)
+        return await _unless_client_gone(_flights.do(key, compute), gone)
+
+    return wrapper
+
+
+async def _unless_client_gone(call: Awaitable[R], gone: asyncio.Event) -> R:
+    # A caller whose client disconnected leaves the flight instead of waiting
+    # for a result nobody will read.
+    waiter = asyncio.ensure_future(call)
+    watcher = asyncio.ensure_future(gone.wait())
+    try:
+        await asyncio.wait((waiter, watcher), return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        watcher.cancel()
+        if not waiter.done():
+            waiter.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await waiter
+    if waiter.cancelled():
+        raise QueryTimeoutException("Client disconnected before the result was ready")
+    return waiter.result()
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import fcntl
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+from .base import ResultCache
+
+# Entries live as one file each in a tmpfs directory (``/dev/shm`` by default),
+# so every worker on the host reads the same memory-backed pages. Writers
+# publish with an atomic rename, which keeps reads lock-free: a reader sees
+# either the old file or the new one, never a partial write.
+ENTRY_SUFFIX: str = ".entry"
+ENTRY_HEADER = struct.Struct("<QdI")  # generation, expires_at, payload size
+META = struct.Struct("<Qq")  # generation, approximate total bytes
+EVICT_TO_RATIO: float = 0.9
+
+
+class SharedFileResultCache(ResultCache):
+    def __init__(self, directory: str, max_bytes: int, default_ttl: float) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+
+        self._lock_fd = os.open(self.directory / "lock", os.O_RDWR | os.O_CREAT)
+        meta_fd = os.open(self.directory / "meta", os.O_RDWR | os.O_CREAT)
+        try:
+            with self._locked():
+                if os.fstat(meta_fd).st_size < META.size:
+                    os.ftruncate(meta_fd, META.size)
+            self._meta = mmap.mmap(meta_fd, META.size)
+        finally:
+            os.close(meta_fd)
+
+    def close(self) -> None:
+        self._meta.close()
+        os.close(self._lock_fd)
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _read_meta(self) -> tuple[int, int]:
+        return META.unpack_from(self._meta)
+
+    def _write_meta(self, generation: int, total_bytes: int) -> None:
+        META.pack_into(self._meta, 0, generation, max(total_bytes, 0))
+
+    def _path(self, key: str) -> Path:
+        return self.directory / (hashlib.sha1(key.encode()).hexdigest() + ENTRY_SUFFIX)
+
+    async def get(self, key: str) -> Any | None:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+
+        generation, expires_at, size = ENTRY_HEADER.unpack_from(data)
+        current, _total = self._read_meta()
+        if generation != current or expires_at < time.time():
+            return None
+        with contextlib.suppress(FileNotFoundError):
+            os.utime(path)  # mtime doubles as the LRU clock
+        return pickle.loads(data[ENTRY_HEADER.size : ENTRY_HEADER.size + size])
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: float | None = None,
+        generation: int | None = None,
+    ) -> None:
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if ENTRY_HEADER.size + len(payload) > self.max_bytes:
+            return
+        expires_at = time.time() + (ttl if ttl is not None else self.default_ttl)
+        if generation is None:
+            generation, _total = self._read_meta()
+        # flock can wait on another worker and eviction walks the directory,
+        # so the file work runs off the event loop.
+        await asyncio.to_thread(self._store, key, payload, expires_at, generation)
+
+    def _store(
+        self, key: str, payload: bytes, expires_at: float, generation: int
+    ) -> None:
+        path = self._path(key)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(ENTRY_HEADER.pack(generation, expires_at, len(payload)))
+            f.write(payload)
+
+        with self._locked():
+            current, total = self._read_meta()
+            if current != generation:
+                tmp.unlink(missing_ok=True)
+                return
+            try:
+                total -= path.stat().st_size
+            except FileNotFoundError:
+                pass
+            os.replace(tmp, path)
+            total += ENTRY_HEADER.size + len(payload)
+            if total > self.max_bytes:
+                total = self._evict()
+            self._write_meta(current, total)
+
+    def _evict(self) -> int:
+        entries = []
+        for path in self.directory.glob("*" + ENTRY_SUFFIX):
+            with contextlib.suppress(FileNotFoundError):
+                st = path.stat()
+                entries.append((st.st_mtime, st.st_size, path))
+        entries.sort()
+
+        total = sum(size for _mtime, size, _path in entries)
+        target = int(self.max_bytes * EVICT_TO_RATIO)
+        for _mtime, size, path in entries:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        return total
+
+    async def invalidate(self) -> int:
+        return await asyncio.to_thread(self._invalidate)
+
+    def _invalidate(self) -> int:
+        with self._locked():
+            generation, _total = self._read_meta()
+            generation += 1
+            self._write_meta(generation, 0)
+            for path in self.directory.glob("*" + ENTRY_SUFFIX):
+                path.unlink(missing_ok=True)
+        return generation
+
+    async def generation(self) -> int:
+        return self._read_meta()[0]
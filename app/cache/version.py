@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from ..db.session import get_session
+from ..repositories.backend import build_data_version_repository
+from ..schemas.data_version import TABLES, DataVersion
+from .calls import get_result_cache
+
+
+class DataVersionTracker:
+    def __init__(self) -> None:
+        self.version: Optional[DataVersion] = None
+        self.changed_at: dict[str, datetime] = {}
+        self.polled_at: float = 0.0
+        self._lock = asyncio.Lock()
+
+    async def poll(self) -> bool:
+        async with self._lock:
+            async for session in get_session():
+                repo = build_data_version_repository(session)
+                version = await repo.current()
+                recorded = await repo.changed_at() if version != self.version else {}
+            self.polled_at = time.monotonic()
+            previous = self.version
+            if version == previous:
+                return False
+
+            # A moved counter carries the time of its write; a max id that
+            # moved without one only tells us it changed since the last poll.
+            now = datetime.now(timezone.utc).replace(microsecond=0)
+            for table in TABLES:
+                before = previous.table_version(table) if previous else None
+                after = version.table_version(table)
+                if before == after:
+                    continue
+                if before is None or before[1] != after[1]:
+                    self.changed_at[table] = recorded.get(table, now)
+                else:
+                    self.changed_at[table] = now
+            self.version = version
+
+        cache = get_result_cache()
+        if previous is not None and cache is not None:
+            await cache.invalidate()
+        return True
+
+    async def current(self, max_age: float) -> DataVersion:
+        if self.version is None or time.monotonic() - self.polled_at >= max_age:
+            await self.poll()
+        return self.version
+
+    def last_modified(self, tables: Iterable[str]) -> datetime:
+        return max(self.changed_at[table] for table in tables)
+
+
+_tracker = DataVersionTracker()
+
+
+def get_data_version_tracker() -> DataVersionTracker:
+    return _tracker
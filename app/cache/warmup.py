@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from datetime import date
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..api.deps import (
+    get_performance_service,
+    get_plans_service,
+    get_user_credit_service,
+)
+from ..core.config import settings
+from ..db.session import get_session
+from .calls import get_result_cache
+from .version import get_data_version_tracker
+
+logger = logging.getLogger(__name__)
+
+WarmupJob = Callable[[AsyncSession], Awaitable[object]]
+
+
+def _year_performance_job(year: int) -> WarmupJob:
+    async def job(session: AsyncSession) -> object:
+        service = await get_performance_service(session)
+        return await service.get_year_performance(year)
+
+    return job
+
+
+def _plans_performance_job(as_of: date) -> WarmupJob:
+    async def job(session: AsyncSession) -> object:
+        service = await get_plans_service(session)
+        return await service.get_plans_performance(as_of)
+
+    return job
+
+
+def _user_credits_job(user_id: int) -> WarmupJob:
+    async def job(session: AsyncSession) -> object:
+        service = await get_user_credit_service(session)
+        return await service.get_user_credits(user_id)
+
+    return job
+
+
+def _report_jobs(today: date) -> list[WarmupJob]:
+    return [
+        _year_performance_job(today.year),
+        _year_performance_job(today.year - 1),
+        _plans_performance_job(today),
+    ]
+
+
+async def _run_job(job: WarmupJob, semaphore: asyncio.Semaphore) -> None:
+    async with semaphore:
+        async for session in get_session():
+            await job(session)
+
+
+async def _run_jobs(jobs: list[WarmupJob], concurrency: int) -> list[Exception]:
+    semaphore = asyncio.Semaphore(concurrency)
+    results = await asyncio.gather(
+        *(_run_job(job, semaphore) for job in jobs), return_exceptions=True
+    )
+    return [r for r in results if isinstance(r, Exception)]
+
+
+async def prime_hot_statements(concurrency: int) -> None:
+    # Runs every hot route's statements once so the first real requests find
+    # SQLAlchemy's compiled-statement cache, the database buffer pool and any
+    # enabled result cache already warm. user_id 0 matches no rows but still
+    # compiles and executes the interactive lookup.
+    await get_data_version_tracker().poll()
+    errors = await _run_jobs(
+        [*_report_jobs(date.today()), _user_credits_job(0)], concurrency
+    )
+    if errors:
+        raise errors[0]
+
+
+class WarmupScheduler:
+    def __init__(self, interval: float, jitter: float, concurrency: int) -> None:
+        self.interval = interval
+        self.jitter = jitter
+        self.concurrency = concurrency
+        self._wakeup = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="warmup-scheduler")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    def notify_data_changed(self) -> None:
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.clear()
+            # A database hiccup is retried on the next tick; anything else
+            # is a bug and gets a traceback, but the loop keeps going.
+            try:
+                await self.tick()
+            except (SQLAlchemyError, OSError) as exc:
+                logger.warning("Cache warm-up failed: %r", exc)
+            except Exception:
+                logger.exception("Cache warm-up failed")
+            delay = self.interval + random.uniform(0, self.jitter)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def tick(self) -> None:
+        await get_data_version_tracker().poll()
+        if get_result_cache() is None:
+            return
+
+        for error in await _run_jobs(_report_jobs(date.today()), self.concurrency):
+            logger.warning("Warm-up job failed: %r", error)
+
+
+_scheduler: Optional[WarmupScheduler] = None
+
+
+def start_warmup_scheduler() -> None:
+    global _scheduler
+    if _scheduler is None and settings.warmup_enabled:
+        _scheduler = WarmupScheduler(
+            settings.warmup_interval_seconds,
+            settings.warmup_jitter_seconds,
+            settings.warmup_concurrency,
+        )
+        _scheduler.start()
+
+
+def get_warmup_scheduler() -> WarmupScheduler | None:
+    return _scheduler
+
+
+async def stop_warmup_scheduler() -> None:
+    global _scheduler
+    if _scheduler is not None:
+        await _scheduler.stop()
+        _scheduler = None
+
+
+async def notify_data_changed() -> None:
+    cache = get_result_cache()
+    if cache is not None:
+        await cache.invalidate()
+    if _scheduler is not None:
+        _scheduler.notify_data_changed()
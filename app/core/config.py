@@ -12,10 +12,96 @@ class Settings(BaseModel):
     db_user: str = os.getenv("DB_USER", "app")
     db_password: str = os.getenv("DB_PASSWORD", "app")
     api_key: str = os.getenv("API_KEY", "dev-secret-key")
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    repository_backend: str = os.getenv("REPOSITORY_BACKEND", "mysql")
+    sqlite_path: str = os.getenv("SQLITE_PATH", "datafactory.sqlite3")
     seed_on_startup: bool = os.getenv("SEED_ON_STARTUP", "false").lower() == "true"
+    seed_lock_timeout_seconds: int = int(os.getenv("SEED_LOCK_TIMEOUT_SECONDS", "600"))
+    performance_backend: str = os.getenv("PERFORMANCE_BACKEND", "sql")
+    daily_index_refresh_seconds: float = float(
+        os.getenv("DAILY_INDEX_REFRESH_SECONDS", "30")
+    )
+    columnar_refresh_seconds: float = float(os.getenv("COLUMNAR_REFRESH_SECONDS", "30"))
+    watermark_settle_seconds: float = float(os.getenv("WATERMARK_SETTLE_SECONDS", "30"))
+    columnar_load_chunk_size: int = int(os.getenv("COLUMNAR_LOAD_CHUNK_SIZE", "50000"))
+    snapshot_dir: str = os.getenv("SNAPSHOT_DIR", "")
+    result_cache_backend: str = os.getenv("RESULT_CACHE_BACKEND", "none")
+    result_cache_ttl_seconds: float = float(
+        os.getenv("RESULT_CACHE_TTL_SECONDS", "300")
+    )
+    result_cache_max_entries: int = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "1024"))
+    result_cache_dir: str = os.getenv("RESULT_CACHE_DIR", "/dev/shm/datafactory-cache")
+    result_cache_max_bytes: int = int(
+        os.getenv("RESULT_CACHE_MAX_BYTES", str(32 * 1024 * 1024))
+    )
+    data_version_max_age_seconds: float = float(
+        os.getenv("DATA_VERSION_MAX_AGE_SECONDS", "5")
+    )
+    open_period_max_age_seconds: int = int(
+        os.getenv("OPEN_PERIOD_MAX_AGE_SECONDS", "60")
+    )
+    closed_period_max_age_seconds: int = int(
+        os.getenv("CLOSED_PERIOD_MAX_AGE_SECONDS", "600")
+    )
+    warmup_enabled: bool = os.getenv("WARMUP_ENABLED", "false").lower() == "true"
+    warmup_interval_seconds: float = float(os.getenv("WARMUP_INTERVAL_SECONDS", "60"))
+    warmup_jitter_seconds: float = float(os.getenv("WARMUP_JITTER_SECONDS", "10"))
+    warmup_concurrency: int = int(os.getenv("WARMUP_CONCURRENCY", "2"))
+    db_partitioning: bool = os.getenv("DB_PARTITIONING", "false").lower() == "true"
+    partition_first_year: int = int(os.getenv("PARTITION_FIRST_YEAR", "0"))
+    partition_years_ahead: int = int(os.getenv("PARTITION_YEARS_AHEAD", "2"))
+    export_chunk_size: int = int(os.getenv("EXPORT_CHUNK_SIZE", "5000"))
+    change_feed_page_size: int = int(os.getenv("CHANGE_FEED_PAGE_SIZE", "10000"))
+    change_feed_max_page_size: int = int(
+        os.getenv("CHANGE_FEED_MAX_PAGE_SIZE", "100000")
+    )
+    change_feed_chunk_size: int = int(os.getenv("CHANGE_FEED_CHUNK_SIZE", "2000"))
+    admission_enabled: bool = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+    admission_capacity: int = int(os.getenv("ADMISSION_CAPACITY", "15"))
+    admission_classes: str = os.getenv(
+        "ADMISSION_CLASSES", "interactive:15:200,reports:8:50,imports:2:10"
+    )
+    admission_wait_timeout_seconds: float = float(
+        os.getenv("ADMISSION_WAIT_TIMEOUT_SECONDS", "10")
+    )
+    admission_retry_after_seconds: int = int(
+        os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "2")
+    )
+    rate_limit_per_second: float = float(os.getenv("RATE_LIMIT_PER_SECOND", "50"))
+    rate_limit_burst: float = float(os.getenv("RATE_LIMIT_BURST", "100"))
+    ingest_batch_size: int = int(os.getenv("INGEST_BATCH_SIZE", "5000"))
+    ingest_max_line_bytes: int = int(os.getenv("INGEST_MAX_LINE_BYTES", "65536"))
+    ingest_max_reported_errors: int = int(
+        os.getenv("INGEST_MAX_REPORTED_ERRORS", "100")
+    )
+    prewarm_connections: int = int(os.getenv("PREWARM_CONNECTIONS", "5"))
+    prewarm_statements: bool = os.getenv("PREWARM_STATEMENTS", "true").lower() == "true"
+    readiness_retry_seconds: float = float(os.getenv("READINESS_RETRY_SECONDS", "2"))
+    profile_sample_rate: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    profile_token: str = os.getenv("PROFILE_TOKEN", "")
+    profile_dir: str = os.getenv("PROFILE_DIR", "/tmp/datafactory-profiles")
+    profile_max_files: int = int(os.getenv("PROFILE_MAX_FILES", "50"))
+    statement_deadlines: str = os.getenv(
+        "STATEMENT_DEADLINES",
+        "user_credits:2000,credit_payments:2000,year_performance:15000,"
+        "plans_performance:15000,plans_performance_series:30000,"
+        "portfolio_aging:15000",
+    )
+    statement_deadline_default_ms: int = int(
+        os.getenv("STATEMENT_DEADLINE_DEFAULT_MS", "0")
+    )
+    cancel_on_disconnect: bool = (
+        os.getenv("CANCEL_ON_DISCONNECT", "true").lower() == "true"
+    )
+    kill_connect_timeout_seconds: int = int(
+        os.getenv("KILL_CONNECT_TIMEOUT_SECONDS", "2")
+    )
 
     @property
     def sqlalchemy_url(self) -> str:
+        if self.repository_backend == "sqlite":
+            return f"sqlite+aiosqlite:///{self.sqlite_path}"
         return (
             f"mysql+aiomysql://{self.db_user}:{self.db_password}"
             f"@{self.db_host}:{self.db_port}/{self.db_name}"
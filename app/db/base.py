@@ -1,5 +1,9 @@
+from sqlalchemy import BigInteger, Integer
 from sqlalchemy.orm import DeclarativeBase
 
+# SQLite only autoincrements INTEGER PRIMARY KEY columns.
+BigIntegerPK = BigInteger().with_variant(Integer, "sqlite")
+
 
 class Base(DeclarativeBase):
     pass
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Serializes a startup step across the workers of a deployment: MySQL uses a
+# named GET_LOCK, SQLite a flock on a file next to the database.
+@asynccontextmanager
+async def startup_lock(engine: AsyncEngine, name: str) -> AsyncIterator[None]:
+    started = time.perf_counter()
+    if engine.dialect.name != "mysql":
+        fd = os.open(f"{settings.sqlite_path}.{name}.lock", os.O_RDWR | os.O_CREAT)
+        try:
+            await asyncio.to_thread(fcntl.flock, fd, fcntl.LOCK_EX)
+            logger.info(
+                "%s lock acquired in %.3fs", name, time.perf_counter() - started
+            )
+            yield
+        finally:
+            os.close(fd)
+        return
+
+    # GET_LOCK belongs to the session that took it, so the lock connection
+    # stays checked out until the step is done and is released explicitly.
+    lock_name = f"datafactory_{name}"
+    async with engine.connect() as conn:
+        acquired = await conn.scalar(
+            text("SELECT GET_LOCK(:name, :timeout)"),
+            {"name": lock_name, "timeout": settings.seed_lock_timeout_seconds},
+        )
+        if acquired != 1:
+            raise RuntimeError(f"Timed out waiting for lock {lock_name}")
+        logger.info("%s lock acquired in %.3fs", name, time.perf_counter() - started)
+        try:
+            yield
+        finally:
+            await conn.scalar(text("SELECT RELEASE_LOCK(:name)"), {"name": lock_name})
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import asyncio
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import TYPE_CHECKING, Any, Generic, Iterable, Iterator, Optional, TypeVar
+
+from sqlalchemy import DECIMAL
+
+from ..models.credit import Credit
+from ..models.dictionary import Dictionary
+from ..models.payment import Payment
+from ..models.plan import Plan
+from ..models.user import User
+
+if TYPE_CHECKING:
+    from ..seed.loader import SeedData
+
+V = TypeVar("V")
+
+
+class DateIndex(Generic[V]):
+    def __init__(self, items: Iterable[tuple[date, V]]) -> None:
+        self._by_date: dict[date, list[V]] = defaultdict(list)
+        for day, value in items:
+            self._by_date[day].append(value)
+        self._dates = sorted(self._by_date)
+
+    def get(self, day: date) -> list[V]:
+        return self._by_date.get(day, [])
+
+    def between(self, start: date, end: date) -> Iterator[tuple[date, list[V]]]:
+        lo = bisect_left(self._dates, start)
+        hi = bisect_right(self._dates, end)
+        for day in self._dates[lo:hi]:
+            yield day, self._by_date[day]
+
+
+class MemoryIndexes:
+    def __init__(self, store: MemoryStore) -> None:
+        credits = sorted(store.credits.values(), key=lambda c: c.id)
+        self.credits_by_user: dict[int, list[Credit]] = defaultdict(list)
+        for credit in credits:
+            self.credits_by_user[credit.user_id].append(credit)
+        self.open_credits: list[Credit] = [
+            c for c in credits if c.actual_return_date is None
+        ]
+        self.credits_by_issuance: DateIndex[Credit] = DateIndex(
+            (c.issuance_date, c) for c in credits
+        )
+
+        payments = sorted(store.payments.values(), key=lambda p: p.id)
+        self.payments_by_credit: dict[int, list[Payment]] = defaultdict(list)
+        for payment in payments:
+            self.payments_by_credit[payment.credit_id].append(payment)
+        self.payments_by_date: DateIndex[Payment] = DateIndex(
+            (p.payment_date, p) for p in payments
+        )
+
+        self.plans_by_period: DateIndex[Plan] = DateIndex(
+            (p.period, p) for p in store.plans.values()
+        )
+        self.dictionary_by_name: dict[str, Dictionary] = {
+            d.name: d for d in store.dictionary.values()
+        }
+
+
+def normalize_decimals(entity: Any) -> Any:
+    # Mirror a database round trip: DECIMAL(p, s) columns come back as
+    # Decimals with exactly `s` fractional digits.
+    for column in entity.__table__.columns:
+        if isinstance(column.type, DECIMAL):
+            value = getattr(entity, column.key)
+            if value is not None:
+                exponent = Decimal(1).scaleb(-(column.type.scale or 0))
+                setattr(entity, column.key, Decimal(str(value)).quantize(exponent))
+    return entity
+
+
+# Tables held as dicts keyed by primary key. Secondary indexes are rebuilt
+# lazily on the first read after a write, which suits the read-mostly
+# workloads this backend is meant for (tests and service-layer benchmarks).
+class MemoryStore:
+    def __init__(self) -> None:
+        self.users: dict[int, User] = {}
+        self.dictionary: dict[int, Dictionary] = {}
+        self.credits: dict[int, Credit] = {}
+        self.plans: dict[int, Plan] = {}
+        self.payments: dict[int, Payment] = {}
+        self.changes: dict[str, int] = {}  # data_changes counters
+        self.changed_at: dict[str, datetime] = {}  # and when they last moved
+        self._indexes: Optional[MemoryIndexes] = None
+        self._top_ids: dict[str, int] = {}
+
+    @classmethod
+    def from_seed(cls, data: SeedData) -> MemoryStore:
+        store = cls()
+        for name, entities in data._asdict().items():
+            table = getattr(store, name)
+            for entity in entities:
+                table[entity.id] = normalize_decimals(entity)
+        return store
+
+    def table(self, entity_class: type) -> dict[int, Any]:
+        return getattr(self, entity_class.__tablename__)
+
+    @property
+    def indexes(self) -> MemoryIndexes:
+        if self._indexes is None:
+            self._indexes = MemoryIndexes(self)
+        return self._indexes
+
+    def changed(self) -> None:
+        self._indexes = None
+
+    def assign_id(self, table: str, id_: Optional[int]) -> int:
+        # Like AUTO_INCREMENT: a running counter per table, pushed forward by
+        # explicit ids; removed ids are not handed out again.
+        top = self._top_ids.get(table)
+        if top is None:
+            top = max(getattr(self, table), default=0)
+        if id_ is None:
+            id_ = top + 1
+        self._top_ids[table] = max(top, id_)
+        return id_
+
+
+_store: Optional[MemoryStore] = None
+
+
+async def init_memory_store() -> None:
+    global _store
+    if _store is None:
+        from ..seed.loader import read_seed_data
+
+        _store = MemoryStore.from_seed(await asyncio.to_thread(read_seed_data))
+
+
+def get_memory_store() -> MemoryStore:
+    if _store is None:
+        raise RuntimeError("Memory store not initialized yet")
+    return _store
+
+
+def dispose_memory_store() -> None:
+    global _store
+    _store = None
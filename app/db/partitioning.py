@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import logging
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.sql import Select
+
+from ..core.config import settings
+from .locks import startup_lock
+from .session import get_engine
+
+logger = logging.getLogger(__name__)
+
+# MySQL partitions by the date column the yearly reports filter on. Every
+# unique key must contain that column and partitioned InnoDB tables cannot
+# take part in foreign keys, so partitioning a table widens its primary key
+# to (id, <column>) and drops every foreign key on or referencing it:
+# credits.user_id, payments.credit_id and payments.type_id stop being
+# enforced, and deleting a credit no longer cascades to its payments.
+# Ingest keeps checking user, credit and payment type ids itself, nothing in
+# the app deletes credits, and `python -m app.tools.credit_totals check`
+# reports credits whose payments no longer add up. The change is one-way;
+# see README.md.
+PARTITIONED_TABLES: dict[str, str] = {
+    "credits": "issuance_date",
+    "payments": "payment_date",
+}
+CATCH_ALL_PARTITION: str = "pmax"
+
+
+def partition_name(year: int) -> str:
+    return f"p{year}"
+
+
+def _partition_definitions(years: list[int]) -> str:
+    parts = [
+        f"PARTITION {partition_name(y)} VALUES LESS THAN ('{y + 1}-01-01')"
+        for y in years
+    ]
+    parts.append(f"PARTITION {CATCH_ALL_PARTITION} VALUES LESS THAN (MAXVALUE)")
+    return "(" + ", ".join(parts) + ")"
+
+
+def partition_by_ddl(table: str, column: str, years: list[int]) -> str:
+    return (
+        f"ALTER TABLE `{table}` PARTITION BY RANGE COLUMNS(`{column}`) "
+        + _partition_definitions(years)
+    )
+
+
+def add_partitions_ddl(table: str, years: list[int]) -> str:
+    return (
+        f"ALTER TABLE `{table}` REORGANIZE PARTITION {CATCH_ALL_PARTITION} INTO "
+        + _partition_definitions(years)
+    )
+
+
+async def partition_years(conn: AsyncConnection, table: str) -> list[int]:
+    res = await conn.execute(
+        text(
+            "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table "
+            "AND PARTITION_NAME IS NOT NULL"
+        ),
+        {"table": table},
+    )
+    return sorted(
+        int(name[1:]) for name in res.scalars() if name != CATCH_ALL_PARTITION
+    )
+
+
+async def _foreign_keys(conn: AsyncConnection, table: str) -> list[tuple[str, str]]:
+    res = await conn.execute(
+        text(
+            "SELECT TABLE_NAME, CONSTRAINT_NAME "
+            "FROM information_schema.REFERENTIAL_CONSTRAINTS "
+            "WHERE CONSTRAINT_SCHEMA = DATABASE() "
+            "AND (TABLE_NAME = :table OR REFERENCED_TABLE_NAME = :table)"
+        ),
+        {"table": table},
+    )
+    return [(str(t), str(c)) for t, c in res.all()]
+
+
+async def _first_data_year(
+    conn: AsyncConnection, table: str, column: str
+) -> Optional[int]:
+    value = await conn.scalar(text(f"SELECT MIN(`{column}`) FROM `{table}`"))
+    return value.year if value is not None else None
+
+
+async def ensure_partitioned(
+    conn: AsyncConnection,
+    table: str,
+    column: str,
+    years_ahead: int,
+    first_year: Optional[int] = None,
+) -> list[str]:
+    last_year = date.today().year + years_ahead
+    existing = await partition_years(conn, table)
+
+    statements: list[str] = []
+    if existing:
+        missing = list(range(existing[-1] + 1, last_year + 1))
+        if missing:
+            statements.append(add_partitions_ddl(table, missing))
+    else:
+        first = first_year or await _first_data_year(conn, table, column)
+        first = min(first or date.today().year, last_year)
+        for fk_table, name in await _foreign_keys(conn, table):
+            statements.append(f"ALTER TABLE `{fk_table}` DROP FOREIGN KEY `{name}`")
+        statements.append(
+            f"ALTER TABLE `{table}` DROP PRIMARY KEY, "
+            f"ADD PRIMARY KEY (`id`, `{column}`)"
+        )
+        statements.append(
+            partition_by_ddl(table, column, list(range(first, last_year + 1)))
+        )
+
+    for statement in statements:
+        logger.info("Partitioning: %s", statement)
+        await conn.execute(text(statement))
+    return statements
+
+
+async def ensure_all_partitioned(
+    conn: AsyncConnection, years_ahead: int, first_year: Optional[int] = None
+) -> list[str]:
+    statements: list[str] = []
+    for table, column in PARTITIONED_TABLES.items():
+        statements += await ensure_partitioned(
+            conn, table, column, years_ahead, first_year
+        )
+    return statements
+
+
+async def explain_partitions(
+    conn: AsyncConnection, stmt: Select
+) -> dict[str, list[str]]:
+    compiled = stmt.compile(
+        dialect=conn.dialect, compile_kwargs={"literal_binds": True}
+    )
+    res = await conn.execute(text(f"EXPLAIN {compiled}"))
+    return {
+        row["table"]: (row["partitions"] or "").split(",")
+        for row in res.mappings()
+        if row["table"] in PARTITIONED_TABLES
+    }
+
+
+# Runs at startup after seeding when DB_PARTITIONING is set; one worker
+# alters the tables while the others wait, then find nothing left to do.
+async def partition_on_startup() -> None:
+    if not settings.db_partitioning:
+        return
+    engine = get_engine()
+    if engine.dialect.name != "mysql":
+        logger.warning(
+            "DB_PARTITIONING ignored: not supported on %s", engine.dialect.name
+        )
+        return
+    async with startup_lock(engine, "partitioning"):
+        async with engine.begin() as conn:
+            tables = await conn.run_sync(
+                lambda c: [t for t in PARTITIONED_TABLES if inspect(c).has_table(t)]
+            )
+            if len(tables) < len(PARTITIONED_TABLES):
+                logger.warning("DB_PARTITIONING ignored: tables not created yet")
+                return
+            await ensure_all_partitioned(
+                conn,
+                settings.partition_years_ahead,
+                settings.partition_first_year or None,
+            )
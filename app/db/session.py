@@ -1,26 +1,245 @@
 from __future__ import annotations
 
-from typing import AsyncGenerator, Optional
+import asyncio
+import contextlib
+import functools
+from contextvars import ContextVar
+from typing import Any, AsyncGenerator, Iterator, Optional
 
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.pool import NullPool
 
 from ..core.config import settings
 
 _engine: Optional[AsyncEngine] = None
 _session_factory: Optional[async_sessionmaker[AsyncSession]] = None
+# Unpooled engine for KILL QUERY, created on first use.
+_kill_engine: Optional[AsyncEngine] = None
+
+# AsyncSession methods that may run a statement; the lazy session binds its
+# connection right before the first of them.
+_STATEMENT_METHODS: frozenset[str] = frozenset(
+    {
+        "connection",
+        "delete",
+        "execute",
+        "flush",
+        "get",
+        "get_one",
+        "merge",
+        "refresh",
+        "run_sync",
+        "scalar",
+        "scalars",
+        "stream",
+        "stream_scalars",
+    }
+)
+
+
+# MySQL errors raised by a statement stopped by MAX_EXECUTION_TIME (3024) or
+# by KILL QUERY (1317).
+QUERY_INTERRUPTED_ERRORS: frozenset[int] = frozenset({1317, 3024})
+
+# Per-request statement deadline in milliseconds; 0 means none.
+_statement_deadline_ms: ContextVar[int] = ContextVar("statement_deadline_ms", default=0)
+
+
+def set_statement_deadline(ms: int) -> None:
+    _statement_deadline_ms.set(ms)
+
+
+# Set while a request is watched for client disconnects; fires once its client
+# has gone.
+_client_gone: ContextVar[Optional[asyncio.Event]] = ContextVar(
+    "client_gone", default=None
+)
+
+
+def watch_client() -> asyncio.Event:
+    event = asyncio.Event()
+    _client_gone.set(event)
+    return event
+
+
+def client_gone_event() -> Optional[asyncio.Event]:
+    return _client_gone.get()
+
+
+def _apply_statement_deadline(
+    _conn: Any,
+    _cursor: Any,
+    statement: str,
+    parameters: Any,
+    _context: Any,
+    _executemany: bool,
+) -> tuple[str, Any]:
+    # MySQL enforces the optimizer hint on read-only SELECTs only, which is
+    # exactly the report aggregates; writes are never cut short.
+    ms = _statement_deadline_ms.get()
+    if ms > 0 and statement.startswith("SELECT "):
+        statement = f"SELECT /*+ MAX_EXECUTION_TIME({ms}) */ " + statement[7:]
+    return statement, parameters
+
+
+def is_query_interrupted(exc: BaseException) -> bool:
+    if not isinstance(exc, DBAPIError):
+        return False
+    args = getattr(exc.orig, "args", ())
+    return bool(args) and args[0] in QUERY_INTERRUPTED_ERRORS
+
+
+class PoolMetrics:
+    def __init__(self) -> None:
+        self.checkouts_total = 0
+        self.checked_out = 0
+        self.lazy_sessions_total = 0
+        self.lazy_sessions_bound_total = 0
+
+    def on_checkout(self, *_args: Any) -> None:
+        self.checkouts_total += 1
+        self.checked_out += 1
+
+    def on_checkin(self, *_args: Any) -> None:
+        self.checked_out -= 1
+
+    def metrics(self) -> list[str]:
+        return [
+            "# TYPE db_pool_checkouts_total counter",
+            f"db_pool_checkouts_total {self.checkouts_total}",
+            "# TYPE db_pool_checked_out gauge",
+            f"db_pool_checked_out {self.checked_out}",
+            "# TYPE db_request_sessions_total counter",
+            f"db_request_sessions_total {self.lazy_sessions_total}",
+            "# TYPE db_request_sessions_bound_total counter",
+            f"db_request_sessions_bound_total {self.lazy_sessions_bound_total}",
+        ]
+
+
+pool_metrics = PoolMetrics()
+
+
+class LazySession:
+    # Stands in for the request's AsyncSession. The session object is built on
+    # first use and a pooled connection is checked out only before the first
+    # statement; the session is then pinned to that connection, so commits in
+    # the repositories do not hand it back and a request costs at most one
+    # checkout.
+    def __init__(self, factory: async_sessionmaker[AsyncSession]) -> None:
+        self._factory = factory
+        self._session: Optional[AsyncSession] = None
+        self._connection: Optional[AsyncConnection] = None
+        self._thread_id: Optional[int] = None
+
+    @property
+    def is_bound(self) -> bool:
+        return self._connection is not None
+
+    def _materialize(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self._factory()
+        return self._session
+
+    async def _bind(self) -> None:
+        if self._connection is None:
+            self._connection = await get_engine().connect()
+            self._session.sync_session.bind = self._connection.sync_connection
+            pool_metrics.lazy_sessions_bound_total += 1
+            if self._connection.dialect.name == "mysql":
+                raw = await self._connection.get_raw_connection()
+                # Known from the handshake; no round trip.
+                self._thread_id = raw.driver_connection.thread_id()
+
+    async def kill_query(self) -> bool:
+        # Stops whatever the bound connection is running from a side
+        # connection; the connection itself stays open and goes back to the
+        # pool as usual when the session closes. The side connection is opened
+        # outside the pool, so a kill still gets through when every pooled
+        # connection is busy with the queries it is meant to stop.
+        if self._thread_id is None:
+            return False
+        async with _get_kill_engine().connect() as side:
+            await side.exec_driver_sql(f"KILL QUERY {int(self._thread_id)}")
+        return True
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._materialize(), name)
+        if name not in _STATEMENT_METHODS or self._connection is not None:
+            return attr
+
+        @functools.wraps(attr)
+        async def bound(*args: Any, **kwargs: Any) -> Any:
+            await self._bind()
+            return await attr(*args, **kwargs)
+
+        return bound
+
+    async def close(self) -> None:
+        try:
+            if self._session is not None:
+                await self._session.close()
+        finally:
+            if self._connection is not None:
+                await self._connection.close()
+            self._session = self._connection = self._thread_id = None
+
+
+# Statement counter for the current request; only set while profiling, so the
+# listener costs one ContextVar lookup otherwise.
+_query_counter: ContextVar[Optional[list[int]]] = ContextVar(
+    "query_counter", default=None
+)
+
+
+def _count_query(*_args: Any) -> None:
+    counter = _query_counter.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+@contextlib.contextmanager
+def count_queries() -> Iterator[list[int]]:
+    counter = [0]
+    token = _query_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _query_counter.reset(token)
 
 
 async def init_engine() -> None:
     global _engine
     if _engine is None:
+        # aiosqlite runs on SQLAlchemy's NullPool, which takes no sizing.
+        pool_options = (
+            {}
+            if settings.repository_backend == "sqlite"
+            else {
+                "pool_size": settings.db_pool_size,
+                "max_overflow": settings.db_max_overflow,
+            }
+        )
         _engine = create_async_engine(
-            settings.sqlalchemy_url, echo=False, pool_pre_ping=True
+            settings.sqlalchemy_url, echo=False, pool_pre_ping=True, **pool_options
         )
+        event.listen(_engine.sync_engine.pool, "checkout", pool_metrics.on_checkout)
+        event.listen(_engine.sync_engine.pool, "checkin", pool_metrics.on_checkin)
+        event.listen(_engine.sync_engine, "before_cursor_execute", _count_query)
+        if _engine.dialect.name == "mysql":
+            event.listen(
+                _engine.sync_engine,
+                "before_cursor_execute",
+                _apply_statement_deadline,
+                retval=True,
+            )
 
 
 def init_session_factory() -> None:
@@ -40,12 +259,46 @@ async def ensure_initialized() -> None:
         init_session_factory()
 
 
+async def prewarm_pool(connections: int) -> int:
+    # Holding every connection open at once forces the pool to establish
+    # `connections` distinct ones (TCP + auth handshake each) instead of
+    # reusing the first; they go back to the pool idle when the stack exits.
+    await ensure_initialized()
+    async with contextlib.AsyncExitStack() as stack:
+        opened = await asyncio.gather(
+            *(stack.enter_async_context(_engine.connect()) for _ in range(connections))
+        )
+        await asyncio.gather(*(conn.execute(text("SELECT 1")) for conn in opened))
+    return len(opened)
+
+
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     await ensure_initialized()
     async with _session_factory() as session:
         yield session
 
 
+async def get_lazy_session() -> AsyncGenerator[LazySession, None]:
+    await ensure_initialized()
+    session = LazySession(_session_factory)
+    pool_metrics.lazy_sessions_total += 1
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+def _get_kill_engine() -> AsyncEngine:
+    global _kill_engine
+    if _kill_engine is None:
+        _kill_engine = create_async_engine(
+            settings.sqlalchemy_url,
+            poolclass=NullPool,
+            connect_args={"connect_timeout": settings.kill_connect_timeout_seconds},
+        )
+    return _kill_engine
+
+
 def get_engine() -> AsyncEngine:
     if _engine is None:
         raise RuntimeError("Engine not initialized yet")
@@ -53,7 +306,11 @@ def get_engine() -> AsyncEngine:
 
 
 async def dispose_engine() -> None:
-    global _engine
+    global _engine, _kill_engine, _session_factory
     if _engine is not None:
         await _engine.dispose()
         _engine = None
+    if _kill_engine is not None:
+        await _kill_engine.dispose()
+        _kill_engine = None
+    _session_factory = None
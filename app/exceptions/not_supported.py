@@ -0,0 +1,8 @@
+from __future__ import annotations
+
+from .domain_exception import DomainException
+
+
+class NotSupportedException(DomainException):
+    def __init__(self, message: str, payload: dict | None = None):
+        super().__init__("not_supported", message, payload)
@@ -0,0 +1,8 @@
+from __future__ import annotations
+
+from .domain_exception import DomainException
+
+
+class QueryTimeoutException(DomainException):
+    def __init__(self, message: str, payload: dict | None = None):
+        super().__init__("query_timeout", message, payload)
@@ -2,23 +2,64 @@ from __future__ import annotations
 
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 
+from .analytics.backend import dispose_performance_backend, init_performance_backend
+from .api.profiling import ProfilingMiddleware
+from .api.readiness import start_readiness_warmup, stop_readiness_warmup
+from .cache.calls import dispose_result_cache, init_result_cache
+from .cache.warmup import start_warmup_scheduler, stop_warmup_scheduler
+from .db.partitioning import partition_on_startup
 from .db.session import dispose_engine, ensure_initialized
+from .exceptions import DomainException
+from .repositories.backend import dispose_repository_backend, init_repository_backend
 from .routers.api import api_router
+from .routers.health import health_router
+from .routers.metrics import metrics_router
 from .seed.loader import seed_if_needed
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await ensure_initialized()
+    await init_repository_backend()
     await seed_if_needed()
+    await partition_on_startup()
+    await init_performance_backend()
+    init_result_cache()
+    start_warmup_scheduler()
+    start_readiness_warmup()
     try:
         yield
     finally:
+        await stop_readiness_warmup()
+        await stop_warmup_scheduler()
+        dispose_result_cache()
+        dispose_performance_backend()
+        dispose_repository_backend()
         await dispose_engine()
 
 
 app = FastAPI(title="DataFactory API", version="1.0.0", lifespan=lifespan)
 
+app.add_middleware(ProfilingMiddleware)
 app.include_router(api_router)
+app.include_router(metrics_router)
+app.include_router(health_router)
+
+
+_DOMAIN_STATUS_CODES: dict[str, int] = {
+    "not_found": status.HTTP_404_NOT_FOUND,
+    "validation_error": status.HTTP_400_BAD_REQUEST,
+    "query_timeout": status.HTTP_504_GATEWAY_TIMEOUT,
+    "not_supported": status.HTTP_501_NOT_IMPLEMENTED,
+}
+
+
+@app.exception_handler(DomainException)
+async def domain_exception_handler(_: Request, exc: DomainException) -> JSONResponse:
+    return JSONResponse(
+        status_code=_DOMAIN_STATUS_CODES.get(exc.code, status.HTTP_400_BAD_REQUEST),
+        content={"code": exc.code, "detail": exc.message, "payload": exc.payload},
+    )
@@ -4,10 +4,10 @@ from datetime import date
 from decimal import Decimal
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DECIMAL, BigInteger, Date, ForeignKey
+from sqlalchemy import DECIMAL, Date, ForeignKey, Index, Integer, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from ..db.base import Base
+from ..db.base import Base, BigIntegerPK
 
 if TYPE_CHECKING:
     from .payment import Payment
@@ -16,8 +16,18 @@ if TYPE_CHECKING:
 
 class Credit(Base):
     __tablename__ = "credits"
+    __table_args__ = (
+        Index(
+            "ix_credits_open_due",
+            "actual_return_date",
+            "return_date",
+            "body",
+            "principal_paid",
+            "interest_paid",
+        ),
+    )
 
-    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    id: Mapped[int] = mapped_column(BigIntegerPK, primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"), index=True
     )
@@ -26,6 +36,19 @@ class Credit(Base):
     actual_return_date: Mapped[date | None] = mapped_column(Date, nullable=True)
     body: Mapped[Decimal] = mapped_column(DECIMAL(16, 4), nullable=False)
     percent: Mapped[Decimal] = mapped_column(DECIMAL(16, 4), nullable=False)
+    principal_paid: Mapped[Decimal] = mapped_column(
+        DECIMAL(16, 4), nullable=False, default=0, server_default=text("0")
+    )
+    interest_paid: Mapped[Decimal] = mapped_column(
+        DECIMAL(16, 4), nullable=False, default=0, server_default=text("0")
+    )
+    total_paid: Mapped[Decimal] = mapped_column(
+        DECIMAL(16, 4), nullable=False, default=0, server_default=text("0")
+    )
+    last_payment_date: Mapped[date | None] = mapped_column(Date, nullable=True)
+    payments_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default=text("0")
+    )
 
     user: Mapped["User"] = relationship(back_populates="credits")
     payments: Mapped[list["Payment"]] = relationship(back_populates="credit")
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import BigInteger, DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..db.base import Base
+
+
+# One counter per table, bumped in the same transaction as every write to it.
+# Max ids only move on inserts; the counters also move on updates and on
+# back-dated rows, which is what HTTP validators and snapshots need to see.
+# changed_at (naive UTC) is when the counter last moved: the Last-Modified of
+# everything read from the table.
+class DataChange(Base):
+    __tablename__ = "data_changes"
+
+    table_name: Mapped[str] = mapped_column(String(32), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    changed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
@@ -1,13 +1,13 @@
 from __future__ import annotations
 
-from sqlalchemy import BigInteger, String
+from sqlalchemy import String
 from sqlalchemy.orm import Mapped, mapped_column
 
-from ..db.base import Base
+from ..db.base import Base, BigIntegerPK
 
 
 class Dictionary(Base):
     __tablename__ = "dictionary"
 
-    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    id: Mapped[int] = mapped_column(BigIntegerPK, primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(256), nullable=False)
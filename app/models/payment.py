@@ -4,10 +4,10 @@ from datetime import date
 from decimal import Decimal
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DECIMAL, BigInteger, Date, ForeignKey
+from sqlalchemy import DECIMAL, Date, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from ..db.base import Base
+from ..db.base import Base, BigIntegerPK
 
 if TYPE_CHECKING:
     from .credit import Credit
@@ -15,13 +15,22 @@ if TYPE_CHECKING:
 
 class Payment(Base):
     __tablename__ = "payments"
+    __table_args__ = (
+        Index(
+            "ix_payments_credit_date_id",
+            "credit_id",
+            "payment_date",
+            "id",
+            "type_id",
+            "sum",
+        ),
+    )
 
-    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    id: Mapped[int] = mapped_column(BigIntegerPK, primary_key=True, autoincrement=True)
     sum: Mapped[Decimal] = mapped_column(DECIMAL(16, 4), nullable=False)
     payment_date: Mapped[date] = mapped_column(Date, nullable=False)
-    credit_id: Mapped[int] = mapped_column(
-        ForeignKey("credits.id", ondelete="CASCADE"), index=True
-    )
+    # Indexed through ix_payments_credit_date_id, which also backs the FK.
+    credit_id: Mapped[int] = mapped_column(ForeignKey("credits.id", ondelete="CASCADE"))
     type_id: Mapped[int] = mapped_column(ForeignKey("dictionary.id"), nullable=False)
 
     credit: Mapped["Credit"] = relationship(back_populates="payments")
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from sqlalchemy import Table
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..db.memory import dispose_memory_store, get_memory_store, init_memory_store
+from ..exceptions.not_supported import NotSupportedException
+from .change_feed_repository import ChangeFeedRepository, ChangeFeedRepositorySQLAlchemy
+from .credit_repository import (
+    CreditRepository,
+    CreditRepositoryMemory,
+    CreditRepositorySQLAlchemy,
+)
+from .data_version_repository import (
+    DataVersionRepository,
+    DataVersionRepositoryMemory,
+    DataVersionRepositorySQLAlchemy,
+)
+from .dictionary_repository import (
+    DictionaryRepository,
+    DictionaryRepositoryMemory,
+    DictionaryRepositorySQLAlchemy,
+)
+from .payment_repository import PaymentRepository, PaymentRepositorySQLAlchemy
+from .plans_repository import (
+    PlansRepository,
+    PlansRepositoryMemory,
+    PlansRepositorySQLAlchemy,
+)
+from .user_repository import (
+    UserRepository,
+    UserRepositoryMemory,
+    UserRepositorySQLAlchemy,
+)
+
+# "mysql" and "sqlite" share the SQLAlchemy repositories and differ only in
+# the engine URL; "memory" serves credits, plans, dictionary and performance
+# from TSV-seeded dicts without touching a database. Payments, ingestion and
+# the change feed need a database and are rejected on it.
+MEMORY_BACKEND: str = "memory"
+
+
+def uses_memory_backend() -> bool:
+    return settings.repository_backend == MEMORY_BACKEND
+
+
+async def init_repository_backend() -> None:
+    if uses_memory_backend():
+        await init_memory_store()
+
+
+def dispose_repository_backend() -> None:
+    if uses_memory_backend():
+        dispose_memory_store()
+
+
+def require_database(feature: str) -> None:
+    if uses_memory_backend():
+        raise NotSupportedException(
+            f"{feature} is not available on the {MEMORY_BACKEND} repository backend"
+        )
+
+
+def build_credit_repository(session: AsyncSession) -> CreditRepository:
+    if uses_memory_backend():
+        return CreditRepositoryMemory(get_memory_store())
+    return CreditRepositorySQLAlchemy(session)
+
+
+def build_dictionary_repository(session: AsyncSession) -> DictionaryRepository:
+    if uses_memory_backend():
+        return DictionaryRepositoryMemory(get_memory_store())
+    return DictionaryRepositorySQLAlchemy(session)
+
+
+def build_plans_repository(session: AsyncSession) -> PlansRepository:
+    if uses_memory_backend():
+        return PlansRepositoryMemory(get_memory_store())
+    return PlansRepositorySQLAlchemy(session)
+
+
+def build_data_version_repository(session: AsyncSession) -> DataVersionRepository:
+    if uses_memory_backend():
+        return DataVersionRepositoryMemory(get_memory_store())
+    return DataVersionRepositorySQLAlchemy(session)
+
+
+def build_user_repository(session: AsyncSession) -> UserRepository:
+    if uses_memory_backend():
+        return UserRepositoryMemory(get_memory_store())
+    return UserRepositorySQLAlchemy(session)
+
+
+def build_payment_repository(session: AsyncSession) -> PaymentRepository:
+    require_database("Payments")
+    return PaymentRepositorySQLAlchemy(session)
+
+
+def build_change_feed_repository(
+    session: AsyncSession, table: Table
+) -> ChangeFeedRepository:
+    require_database("The change feed")
+    return ChangeFeedRepositorySQLAlchemy(session, table)
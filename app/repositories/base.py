@@ -8,12 +8,19 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.exceptions.not_found import NotFoundException
+from app.exceptions.query_timeout import QueryTimeoutException
+
+from ..db.memory import MemoryStore, normalize_decimals
+from ..db.session import is_query_interrupted
 
 T = TypeVar("T")
 ID = TypeVar("ID")
 
 
-class Repository(ABC): ...
+class Repository(ABC):
+    @abstractmethod
+    def transaction(self) -> AsyncContextManager[AsyncSession]:
+        raise NotImplementedError()
 
 
 class CRUDRepository(Repository, Generic[T, ID], ABC):
@@ -82,8 +89,30 @@ class RepositorySQLAlchemy(Repository, ABC):
         except (Exception,) as e:
             if not in_transaction and session.in_transaction():
                 await session.rollback()
+            if is_query_interrupted(e):
+                raise QueryTimeoutException(
+                    "Query exceeded its deadline or was cancelled"
+                ) from e
             raise e
 
+    @asynccontextmanager
+    async def transaction(self) -> AsyncContextManager[AsyncSession]:
+        session = self.db
+
+        info: dict = session.info
+        if info.get("__explicit_transaction__") is not None:
+            yield session
+            return
+        if session.in_transaction():
+            await session.commit()
+
+        info["__explicit_transaction__"] = True
+        try:
+            async with session.begin():
+                yield session
+        finally:
+            info.pop("__explicit_transaction__", None)
+
     async def _scalars(self, *args, **kwargs):
         async with self._autocommit() as session:
             session = session
@@ -186,3 +215,76 @@ class CRUDRepositorySQLAlchemy(CRUDRepository[T, ID], RepositorySQLAlchemy, ABC)
         entity_class = self.get_entity_class()
 
         return NotFoundException(f"Entity {entity_class.__name__} not found")
+
+
+class RepositoryMemory(Repository, ABC):
+    def __init__(self, store: MemoryStore) -> None:
+        self.store = store
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncContextManager[None]:
+        # Writes land in the store immediately; there is nothing to roll back.
+        yield None
+
+
+class CRUDRepositoryMemory(CRUDRepository[T, ID], RepositoryMemory, ABC):
+    @property
+    def rows(self) -> dict[ID, T]:
+        return self.store.table(self.get_entity_class())
+
+    async def get_by_id(self, id: ID) -> T | None:
+        return self.rows.get(id)
+
+    async def find_by_id(self, id: ID) -> T:
+        entity = await self.get_by_id(id)
+        if entity is None:
+            raise self.not_found_exception()
+
+        return entity
+
+    async def get_by_ids(self, ids: list[ID]) -> list[T]:
+        rows = self.rows
+        return [rows[id] for id in dict.fromkeys(ids) if id in rows]
+
+    async def find_by_ids(self, ids: list[ID]) -> list[T]:
+        entities = await self.get_by_ids(ids)
+        if len(entities) != len(set(ids)):
+            raise self.not_found_exception()
+
+        return entities
+
+    async def get_all(self) -> list[T]:
+        return list(self.rows.values())
+
+    async def has(self, id: ID) -> bool:
+        return id in self.rows
+
+    async def create(self, entity: T) -> None:
+        await self.update_many([entity])
+
+    async def update(self, entity: T) -> None:
+        await self.update_many([entity])
+
+    async def update_many(self, entities: list[T]) -> None:
+        if not entities:
+            return
+
+        rows = self.rows
+        table = self.get_entity_class().__tablename__
+        for entity in entities:
+            entity.id = self.store.assign_id(table, entity.id)
+            rows[entity.id] = normalize_decimals(entity)
+        self.store.changed()
+
+    async def remove(self, entity: T) -> None:
+        self.rows.pop(entity.id, None)
+        self.store.changed()
+
+    @abstractmethod
+    def get_entity_class(self) -> Type[T]:
+        raise NotImplementedError()
+
+    def not_found_exception(self) -> NotFoundException:
+        entity_class = self.get_entity_class()
+
+        return NotFoundException(f"Entity {entity_class.__name__} not found")
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Sequence
+
+from sqlalchemy import Row, Table, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.credit import Credit
+from ..models.payment import Payment
+from .base import RepositorySQLAlchemy
+
+CHANGE_FEED_TABLES: dict[str, Table] = {
+    "credits": Credit.__table__,
+    "payments": Payment.__table__,
+}
+
+
+class ChangeFeedRepository(ABC):
+    @abstractmethod
+    async def max_id(self) -> int:
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def page_upper_bound(
+        self, after_id: int, limit: int, ceiling_id: int
+    ) -> int | None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def has_rows_after(self, after_id: int, ceiling_id: int) -> bool:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def stream_range(
+        self, after_id: int, upper_id: int, chunk_size: int
+    ) -> AsyncIterator[Sequence[Row]]:
+        raise NotImplementedError()
+
+
+class ChangeFeedRepositorySQLAlchemy(RepositorySQLAlchemy, ChangeFeedRepository):
+    def __init__(self, session: AsyncSession, table: Table) -> None:
+        super().__init__(session)
+        self.table = table
+
+    async def max_id(self) -> int:
+        return await self._scalar(select(func.max(self.table.c.id))) or 0
+
+    async def page_upper_bound(
+        self, after_id: int, limit: int, ceiling_id: int
+    ) -> int | None:
+        # Reads only the primary key, so the page boundary costs one short
+        # index range scan no matter how wide the rows are.
+        ids = (
+            select(self.table.c.id)
+            .where(self.table.c.id > after_id)
+            .where(self.table.c.id <= ceiling_id)
+            .order_by(self.table.c.id)
+            .limit(limit)
+            .subquery()
+        )
+        return await self._scalar(select(func.max(ids.c.id)))
+
+    async def has_rows_after(self, after_id: int, ceiling_id: int) -> bool:
+        stmt = (
+            select(self.table.c.id)
+            .where(self.table.c.id > after_id)
+            .where(self.table.c.id <= ceiling_id)
+            .limit(1)
+        )
+        return await self._scalar(stmt) is not None
+
+    async def stream_range(
+        self, after_id: int, upper_id: int, chunk_size: int
+    ) -> AsyncIterator[Sequence[Row]]:
+        stmt = (
+            select(self.table)
+            .where(self.table.c.id > after_id)
+            .where(self.table.c.id <= upper_id)
+            .order_by(self.table.c.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        result = await self.db.stream(stmt)
+        async for partition in result.partitions():
+            yield partition
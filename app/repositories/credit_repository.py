@@ -1,13 +1,16 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Sequence, Type
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, AsyncIterator, Iterable, Sequence, Type
 
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import Row, bindparam, case, func, insert, or_, select, update
 
 from ..models.credit import Credit
-from .base import CRUDRepository, CRUDRepositorySQLAlchemy, T
+from ..models.payment import Payment
+from ..schemas.credit import CreditPaymentTotals
+from .base import CRUDRepository, CRUDRepositoryMemory, CRUDRepositorySQLAlchemy, T
 
 
 class CreditRepository(CRUDRepository[Credit, int], ABC):
@@ -15,20 +18,350 @@ class CreditRepository(CRUDRepository[Credit, int], ABC):
     async def list_by_user(self, user_id: int) -> Sequence[Credit]:
         raise NotImplementedError()
 
+    @abstractmethod
+    async def list_by_users(self, user_ids: list[int]) -> dict[int, list[Credit]]:
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def aging_buckets(
+        self, as_of: date, upper_bounds: list[int]
+    ) -> dict[int, tuple[int, Decimal, Decimal, Decimal]]:
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def add_payment_totals(self, totals: dict[int, CreditPaymentTotals]) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def rebuild_payment_totals(
+        self, principal_type_id: int, interest_type_id: int
+    ) -> int:
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def find_inconsistent_payment_totals(
+        self, principal_type_id: int, interest_type_id: int, limit: int
+    ) -> list[int]:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def stream_all(self, chunk_size: int) -> AsyncIterator[Sequence[Row]]:
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def existing_ids(self, ids: Iterable[int]) -> set[int]:
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def insert_many(self, rows: list[dict[str, Any]]) -> None:
+        raise NotImplementedError()
+
 
 class CreditRepositorySQLAlchemy(
     CreditRepository, CRUDRepositorySQLAlchemy[Credit, int]
 ):
     async def list_by_user(self, user_id: int) -> Sequence[Credit]:
-        stmt = (
-            select(Credit)
-            .where(Credit.user_id == user_id)
-            .options(selectinload(Credit.payments))
-        )
+        stmt = select(Credit).where(Credit.user_id == user_id).order_by(Credit.id)
         result = await self._execute(stmt)
         credits = list(result.scalars().unique().all())
         return credits
 
-    @property
+    async def list_by_users(self, user_ids: list[int]) -> dict[int, list[Credit]]:
+        if not user_ids:
+            return {}
+        stmt = select(Credit).where(Credit.user_id.in_(user_ids)).order_by(Credit.id)
+        result = await self._execute(stmt)
+        credits: dict[int, list[Credit]] = {}
+        for credit in result.scalars().all():
+            credits.setdefault(credit.user_id, []).append(credit)
+        return credits
+
+    async def aging_buckets(
+        self, as_of: date, upper_bounds: list[int]
+    ) -> dict[int, tuple[int, Decimal, Decimal, Decimal]]:
+        open_credit = Credit.actual_return_date.is_(None)
+        # Bucket i holds credits at most upper_bounds[i] days overdue; comparing
+        # return_date against precomputed cut-off dates keeps the range sargable.
+        bucket = case(
+            *(
+                (Credit.return_date >= as_of - timedelta(days=bound), i)
+                for i, bound in enumerate(upper_bounds)
+            ),
+            else_=len(upper_bounds),
+        ).label("bucket")
+        stmt = (
+            select(
+                bucket,
+                func.count(Credit.id),
+                func.coalesce(func.sum(Credit.body), 0),
+                func.coalesce(func.sum(Credit.principal_paid), 0),
+                func.coalesce(func.sum(Credit.interest_paid), 0),
+            )
+            .where(open_credit)
+            .group_by(bucket)
+        )
+        res = await self._execute(stmt)
+        return {
+            int(b): (
+                int(cnt),
+                Decimal(str(body)),
+                Decimal(str(principal)),
+                Decimal(str(interest)),
+            )
+            for b, cnt, body, principal, interest in res.all()
+        }
+
+    async def add_payment_totals(self, totals: dict[int, CreditPaymentTotals]) -> None:
+        if not totals:
+            return
+        credits = Credit.__table__
+        last = bindparam("b_last_payment_date")
+        stmt = (
+            update(credits)
+            .where(credits.c.id == bindparam("b_id"))
+            .values(
+                principal_paid=credits.c.principal_paid + bindparam("b_principal"),
+                interest_paid=credits.c.interest_paid + bindparam("b_interest"),
+                total_paid=credits.c.total_paid + bindparam("b_total"),
+                payments_count=credits.c.payments_count + bindparam("b_count"),
+                last_payment_date=case(
+                    (
+                        or_(
+                            credits.c.last_payment_date.is_(None),
+                            credits.c.last_payment_date < last,
+                        ),
+                        last,
+                    ),
+                    else_=credits.c.last_payment_date,
+                ),
+            )
+        )
+        params = [
+            {
+                "b_id": credit_id,
+                "b_principal": t.principal_paid,
+                "b_interest": t.interest_paid,
+                "b_total": t.total_paid,
+                "b_count": t.payments_count,
+                "b_last_payment_date": t.last_payment_date,
+            }
+            for credit_id, t in totals.items()
+        ]
+        await self._execute(stmt, params)
+
+    async def rebuild_payment_totals(
+        self, principal_type_id: int, interest_type_id: int
+    ) -> int:
+        agg = self._payment_totals_subquery(principal_type_id, interest_type_id)
+        credits = Credit.__table__
+
+        def _from_payments(column):
+            return (
+                select(column).where(agg.c.credit_id == credits.c.id).scalar_subquery()
+            )
+
+        stmt = update(credits).values(
+            principal_paid=func.coalesce(_from_payments(agg.c.principal), 0),
+            interest_paid=func.coalesce(_from_payments(agg.c.interest), 0),
+            total_paid=func.coalesce(_from_payments(agg.c.total), 0),
+            payments_count=func.coalesce(_from_payments(agg.c.count), 0),
+            last_payment_date=_from_payments(agg.c.last_payment_date),
+        )
+        res = await self._execute(stmt)
+        return int(res.rowcount or 0)
+
+    async def find_inconsistent_payment_totals(
+        self, principal_type_id: int, interest_type_id: int, limit: int
+    ) -> list[int]:
+        agg = self._payment_totals_subquery(principal_type_id, interest_type_id)
+        epoch = date(1970, 1, 1)
+        stmt = (
+            select(Credit.id)
+            .outerjoin(agg, agg.c.credit_id == Credit.id)
+            .where(
+                or_(
+                    func.round(Credit.principal_paid, 4)
+                    != func.round(func.coalesce(agg.c.principal, 0), 4),
+                    func.round(Credit.interest_paid, 4)
+                    != func.round(func.coalesce(agg.c.interest, 0), 4),
+                    func.round(Credit.total_paid, 4)
+                    != func.round(func.coalesce(agg.c.total, 0), 4),
+                    Credit.payments_count != func.coalesce(agg.c.count, 0),
+                    func.coalesce(Credit.last_payment_date, epoch)
+                    != func.coalesce(agg.c.last_payment_date, epoch),
+                )
+            )
+            .order_by(Credit.id)
+            .limit(limit)
+        )
+        res = await self._execute(stmt)
+        return [int(i) for i in res.scalars().all()]
+
+    async def stream_all(self, chunk_size: int) -> AsyncIterator[Sequence[Row]]:
+        stmt = (
+            select(
+                Credit.id,
+                Credit.user_id,
+                Credit.issuance_date,
+                Credit.return_date,
+                Credit.actual_return_date,
+                Credit.body,
+                Credit.percent,
+                Credit.principal_paid,
+                Credit.interest_paid,
+                Credit.total_paid,
+            )
+            .order_by(Credit.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        result = await self.db.stream(stmt)
+        async for partition in result.partitions():
+            yield partition
+
+    async def existing_ids(self, ids: Iterable[int]) -> set[int]:
+        ids = list(set(ids))
+        if not ids:
+            return set()
+        res = await self._execute(select(Credit.id).where(Credit.id.in_(ids)))
+        return {int(i) for i in res.scalars().all()}
+
+    async def insert_many(self, rows: list[dict[str, Any]]) -> None:
+        if not rows:
+            return
+        await self._execute(insert(Credit.__table__), rows)
+
+    @staticmethod
+    def _payment_totals_subquery(principal_type_id: int, interest_type_id: int):
+        return (
+            select(
+                Payment.credit_id.label("credit_id"),
+                func.sum(
+                    case((Payment.type_id == principal_type_id, Payment.sum), else_=0)
+                ).label("principal"),
+                func.sum(
+                    case((Payment.type_id == interest_type_id, Payment.sum), else_=0)
+                ).label("interest"),
+                func.sum(Payment.sum).label("total"),
+                func.count(Payment.id).label("count"),
+                func.max(Payment.payment_date).label("last_payment_date"),
+            )
+            .group_by(Payment.credit_id)
+            .subquery()
+        )
+
+    def get_entity_class(self) -> Type[T]:
+        return Credit
+
+
+class CreditRepositoryMemory(CreditRepository, CRUDRepositoryMemory[Credit, int]):
+    async def list_by_user(self, user_id: int) -> Sequence[Credit]:
+        return list(self.store.indexes.credits_by_user.get(user_id, []))
+
+    async def list_by_users(self, user_ids: list[int]) -> dict[int, list[Credit]]:
+        by_user = self.store.indexes.credits_by_user
+        return {u: list(by_user[u]) for u in dict.fromkeys(user_ids) if u in by_user}
+
+    async def aging_buckets(
+        self, as_of: date, upper_bounds: list[int]
+    ) -> dict[int, tuple[int, Decimal, Decimal, Decimal]]:
+        cutoffs = [as_of - timedelta(days=bound) for bound in upper_bounds]
+        data: dict[int, tuple[int, Decimal, Decimal, Decimal]] = {}
+        for c in self.store.indexes.open_credits:
+            bucket = next(
+                (i for i, cutoff in enumerate(cutoffs) if c.return_date >= cutoff),
+                len(cutoffs),
+            )
+            cnt, body, principal, interest = data.get(
+                bucket, (0, Decimal(0), Decimal(0), Decimal(0))
+            )
+            data[bucket] = (
+                cnt + 1,
+                body + c.body,
+                principal + c.principal_paid,
+                interest + c.interest_paid,
+            )
+        return data
+
+    async def add_payment_totals(self, totals: dict[int, CreditPaymentTotals]) -> None:
+        for credit_id, t in totals.items():
+            credit = self.rows.get(credit_id)
+            if credit is None:
+                continue
+            credit.principal_paid += t.principal_paid
+            credit.interest_paid += t.interest_paid
+            credit.total_paid += t.total_paid
+            credit.payments_count += t.payments_count
+            if t.last_payment_date is not None and (
+                credit.last_payment_date is None
+                or credit.last_payment_date < t.last_payment_date
+            ):
+                credit.last_payment_date = t.last_payment_date
+
+    async def rebuild_payment_totals(
+        self, principal_type_id: int, interest_type_id: int
+    ) -> int:
+        totals = self._payment_totals(principal_type_id, interest_type_id)
+        for credit in self.rows.values():
+            t = totals.get(credit.id) or CreditPaymentTotals()
+            credit.principal_paid = t.principal_paid
+            credit.interest_paid = t.interest_paid
+            credit.total_paid = t.total_paid
+            credit.payments_count = t.payments_count
+            credit.last_payment_date = t.last_payment_date
+        return len(self.rows)
+
+    async def find_inconsistent_payment_totals(
+        self, principal_type_id: int, interest_type_id: int, limit: int
+    ) -> list[int]:
+        totals = self._payment_totals(principal_type_id, interest_type_id)
+        inconsistent: list[int] = []
+        for credit_id in sorted(self.rows):
+            if len(inconsistent) >= limit:
+                break
+            credit = self.rows[credit_id]
+            t = totals.get(credit_id) or CreditPaymentTotals()
+            if (
+                credit.principal_paid != t.principal_paid
+                or credit.interest_paid != t.interest_paid
+                or credit.total_paid != t.total_paid
+                or credit.payments_count != t.payments_count
+                or credit.last_payment_date != t.last_payment_date
+            ):
+                inconsistent.append(credit_id)
+        return inconsistent
+
+    async def stream_all(self, chunk_size: int) -> AsyncIterator[Sequence[Credit]]:
+        credits = [self.rows[i] for i in sorted(self.rows)]
+        for i in range(0, len(credits), chunk_size):
+            yield credits[i : i + chunk_size]
+
+    async def existing_ids(self, ids: Iterable[int]) -> set[int]:
+        return {i for i in ids if i in self.rows}
+
+    async def insert_many(self, rows: list[dict[str, Any]]) -> None:
+        defaults = CreditPaymentTotals().model_dump()
+        await self.update_many([Credit(**{**defaults, **row}) for row in rows])
+
+    def _payment_totals(
+        self, principal_type_id: int, interest_type_id: int
+    ) -> dict[int, CreditPaymentTotals]:
+        totals: dict[int, CreditPaymentTotals] = {}
+        for credit_id, payments in self.store.indexes.payments_by_credit.items():
+            principal = interest = total = Decimal(0)
+            for p in payments:
+                if p.type_id == principal_type_id:
+                    principal += p.sum
+                elif p.type_id == interest_type_id:
+                    interest += p.sum
+                total += p.sum
+            totals[credit_id] = CreditPaymentTotals(
+                principal_paid=principal,
+                interest_paid=interest,
+                total_paid=total,
+                payments_count=len(payments),
+                last_payment_date=max(p.payment_date for p in payments),
+            )
+        return totals
+
     def get_entity_class(self) -> Type[T]:
         return Credit
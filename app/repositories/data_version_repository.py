@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Iterable
+
+from sqlalchemy import func, insert, select, update
+
+from ..models.credit import Credit
+from ..models.data_change import DataChange
+from ..models.dictionary import Dictionary
+from ..models.payment import Payment
+from ..models.plan import Plan
+from ..models.user import User
+from ..schemas.data_version import TABLES, ContentFingerprint, DataVersion
+from .base import RepositoryMemory, RepositorySQLAlchemy
+
+# Tables that can be fingerprinted, with the amount column summed.
+FINGERPRINT_AMOUNTS: dict[str, str] = {"credits": "body", "payments": "sum"}
+
+
+class DataVersionRepository(ABC):
+    @abstractmethod
+    async def current(self) -> DataVersion:
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def fingerprint(self, table: str, upto_id: int) -> ContentFingerprint:
+        raise NotImplementedError()
+
+    # When each table's counter last moved, as aware UTC datetimes.
+    @abstractmethod
+    async def changed_at(self) -> dict[str, datetime]:
+        raise NotImplementedError()
+
+    # Call inside the writer's transaction, after its last write, so the
+    # counter row stays locked for as short a time as possible.
+    @abstractmethod
+    async def record_changes(self, tables: Iterable[str]) -> None:
+        raise NotImplementedError()
+
+
+class DataVersionRepositorySQLAlchemy(RepositorySQLAlchemy, DataVersionRepository):
+    async def current(self) -> DataVersion:
+        stmt = select(
+            select(func.max(User.id)).scalar_subquery(),
+            select(func.max(Credit.id)).scalar_subquery(),
+            select(func.max(Payment.id)).scalar_subquery(),
+            select(func.max(Plan.id)).scalar_subquery(),
+            select(func.max(Dictionary.id)).scalar_subquery(),
+        )
+        res = await self._execute(stmt)
+        users, credits, payments, plans, dictionary = res.one()
+        changes = await self._execute(select(DataChange.table_name, DataChange.version))
+        return DataVersion(
+            users=users or 0,
+            credits=credits or 0,
+            payments=payments or 0,
+            plans=plans or 0,
+            dictionary=dictionary or 0,
+            changes=dict(sorted(changes.tuples().all())),
+        )
+
+    async def changed_at(self) -> dict[str, datetime]:
+        res = await self._execute(
+            select(DataChange.table_name, DataChange.changed_at).where(
+                DataChange.changed_at.is_not(None)
+            )
+        )
+        return {
+            table: when.replace(tzinfo=timezone.utc) for table, when in res.tuples()
+        }
+
+    async def fingerprint(self, table: str, upto_id: int) -> ContentFingerprint:
+        model = {"credits": Credit, "payments": Payment}[table]
+        stmt = select(
+            func.count(),
+            func.sum(model.id),
+            func.sum(getattr(model, FINGERPRINT_AMOUNTS[table])),
+        ).where(model.id <= upto_id)
+        res = await self._execute(stmt)
+        rows, id_sum, amount = res.one()
+        return ContentFingerprint(
+            rows=rows, id_sum=id_sum or 0, amount=Decimal(amount or 0)
+        )
+
+    async def record_changes(self, tables: Iterable[str]) -> None:
+        tables = sorted(set(tables))
+        if not tables:
+            return
+        # Creates missing counters without racing a concurrent writer.
+        await self._execute(
+            insert(DataChange)
+            .prefix_with("IGNORE", dialect="mysql")
+            .prefix_with("OR IGNORE", dialect="sqlite"),
+            [{"table_name": table, "version": 0} for table in tables],
+        )
+        await self._execute(
+            update(DataChange)
+            .where(DataChange.table_name.in_(tables))
+            .values(
+                version=DataChange.version + 1,
+                changed_at=datetime.now(timezone.utc).replace(
+                    tzinfo=None, microsecond=0
+                ),
+            )
+        )
+
+
+class DataVersionRepositoryMemory(RepositoryMemory, DataVersionRepository):
+    async def current(self) -> DataVersion:
+        return DataVersion(
+            **{table: max(getattr(self.store, table), default=0) for table in TABLES},
+            changes=dict(sorted(self.store.changes.items())),
+        )
+
+    async def changed_at(self) -> dict[str, datetime]:
+        return dict(self.store.changed_at)
+
+    async def fingerprint(self, table: str, upto_id: int) -> ContentFingerprint:
+        rows = [r for r in getattr(self.store, table).values() if r.id <= upto_id]
+        return ContentFingerprint(
+            rows=len(rows),
+            id_sum=sum(r.id for r in rows),
+            amount=sum(
+                (Decimal(getattr(r, FINGERPRINT_AMOUNTS[table])) for r in rows),
+                Decimal(0),
+            ),
+        )
+
+    async def record_changes(self, tables: Iterable[str]) -> None:
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        for table in set(tables):
+            self.store.changes[table] = self.store.changes.get(table, 0) + 1
+            self.store.changed_at[table] = now
@@ -6,10 +6,10 @@ from typing import Type
 from sqlalchemy import select
 
 from ..models.dictionary import Dictionary
-from .base import CRUDRepositorySQLAlchemy, T
+from .base import CRUDRepository, CRUDRepositoryMemory, CRUDRepositorySQLAlchemy, T
 
 
-class DictionaryRepository(ABC):
+class DictionaryRepository(CRUDRepository[Dictionary, int], ABC):
     @abstractmethod
     async def category_names(self) -> dict[int, str]:
         raise NotImplementedError()
@@ -18,6 +18,10 @@ class DictionaryRepository(ABC):
     async def category_id_by_name(self, name: str) -> int | None:
         raise NotImplementedError()
 
+    @abstractmethod
+    async def ids_by_names(self, names: list[str]) -> dict[str, int]:
+        raise NotImplementedError()
+
 
 class DictionaryRepositorySQLAlchemy(
     DictionaryRepository, CRUDRepositorySQLAlchemy[Dictionary, int]
@@ -32,5 +36,30 @@ class DictionaryRepositorySQLAlchemy(
         value = res.scalar()
         return int(value) if value is not None else None
 
+    async def ids_by_names(self, names: list[str]) -> dict[str, int]:
+        if not names:
+            return {}
+        stmt = select(Dictionary.name, Dictionary.id).where(Dictionary.name.in_(names))
+        res = await self._execute(stmt)
+        return {str(n): int(i) for n, i in res.all()}
+
+    def get_entity_class(self) -> Type[T]:
+        return Dictionary
+
+
+class DictionaryRepositoryMemory(
+    DictionaryRepository, CRUDRepositoryMemory[Dictionary, int]
+):
+    async def category_names(self) -> dict[int, str]:
+        return {d.id: d.name for d in self.rows.values()}
+
+    async def category_id_by_name(self, name: str) -> int | None:
+        entry = self.store.indexes.dictionary_by_name.get(name)
+        return entry.id if entry is not None else None
+
+    async def ids_by_names(self, names: list[str]) -> dict[str, int]:
+        by_name = self.store.indexes.dictionary_by_name
+        return {n: by_name[n].id for n in names if n in by_name}
+
     def get_entity_class(self) -> Type[T]:
         return Dictionary
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, Iterable, TypeVar
+
+from ..models.credit import Credit
+from ..models.dictionary import Dictionary
+from ..models.user import User
+from .credit_repository import CreditRepository
+from .dictionary_repository import DictionaryRepository
+from .user_repository import UserRepository
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+BatchFn = Callable[[list[K]], Awaitable[dict[K, V]]]
+
+
+class DataLoader(Generic[K, V]):
+    # Keys requested during one event-loop tick are collected and resolved by
+    # a single batch call on the next tick; results stay memoized for the
+    # loader's lifetime, which is one request.
+    def __init__(
+        self,
+        batch_fn: BatchFn,
+        max_batch_size: int = 1000,
+        lock: asyncio.Lock | None = None,
+    ) -> None:
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self._lock = lock or asyncio.Lock()
+        self._results: dict[K, asyncio.Future] = {}
+        self._queue: list[K] = []
+
+    async def load(self, key: K) -> V | None:
+        future = self._results.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._results[key] = loop.create_future()
+            if not self._queue:
+                loop.call_soon(self._dispatch)
+            self._queue.append(key)
+        return await future
+
+    async def load_many(self, keys: Iterable[K]) -> list[V | None]:
+        return list(await asyncio.gather(*(self.load(k) for k in keys)))
+
+    def prime(self, key: K, value: V) -> None:
+        if key not in self._results:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self._results[key] = future
+
+    def clear(self, key: K | None = None) -> None:
+        if key is None:
+            self._results.clear()
+        else:
+            self._results.pop(key, None)
+
+    def _dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+        for i in range(0, len(keys), self.max_batch_size):
+            asyncio.ensure_future(self._resolve(keys[i : i + self.max_batch_size]))
+
+    async def _resolve(self, keys: list[K]) -> None:
+        try:
+            async with self._lock:
+                values = await self.batch_fn(keys)
+        except Exception as exc:
+            for key in keys:
+                future = self._results.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(exc)
+            return
+        for key in keys:
+            future = self._results.get(key)
+            if future is not None and not future.done():
+                future.set_result(values.get(key))
+
+
+class RequestLoaders:
+    def __init__(
+        self,
+        user_repo: UserRepository,
+        credit_repo: CreditRepository,
+        dict_repo: DictionaryRepository,
+    ) -> None:
+        # An AsyncSession runs one statement at a time, so batches from all
+        # loaders sharing it take turns.
+        lock = asyncio.Lock()
+
+        async def users(ids: list[int]) -> dict[int, User]:
+            return {u.id: u for u in await user_repo.get_by_ids(ids)}
+
+        async def credits(ids: list[int]) -> dict[int, Credit]:
+            return {c.id: c for c in await credit_repo.get_by_ids(ids)}
+
+        async def dictionary(ids: list[int]) -> dict[int, Dictionary]:
+            return {d.id: d for d in await dict_repo.get_by_ids(ids)}
+
+        self.users: DataLoader[int, User] = DataLoader(users, lock=lock)
+        self.credits: DataLoader[int, Credit] = DataLoader(credits, lock=lock)
+        self.credits_by_user: DataLoader[int, list[Credit]] = DataLoader(
+            credit_repo.list_by_users, lock=lock
+        )
+        self.dictionary: DataLoader[int, Dictionary] = DataLoader(dictionary, lock=lock)
+        self.category_ids_by_name: DataLoader[str, int] = DataLoader(
+            dict_repo.ids_by_names, lock=lock
+        )
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Any, Sequence, Type
+
+from sqlalchemy import Row, and_, insert, or_, select
+
+from ..models.payment import Payment
+from .base import CRUDRepository, CRUDRepositorySQLAlchemy, T
+
+
+class PaymentRepository(CRUDRepository[Payment, int], ABC):
+    @abstractmethod
+    async def insert_many(self, rows: list[dict[str, Any]]) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def list_by_credit(
+        self,
+        credit_id: int,
+        after: tuple[date, int] | None,
+        limit: int,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        type_id: int | None = None,
+    ) -> Sequence[Row]:
+        raise NotImplementedError()
+
+
+class PaymentRepositorySQLAlchemy(
+    PaymentRepository, CRUDRepositorySQLAlchemy[Payment, int]
+):
+    async def insert_many(self, rows: list[dict[str, Any]]) -> None:
+        if not rows:
+            return
+        await self._execute(insert(Payment.__table__), rows)
+
+    async def list_by_credit(
+        self,
+        credit_id: int,
+        after: tuple[date, int] | None,
+        limit: int,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        type_id: int | None = None,
+    ) -> Sequence[Row]:
+        # Served from ix_payments_credit_date_id: the equality on credit_id and
+        # the (payment_date, id) keyset seek make every page an index range
+        # read of `limit` entries, however deep the cursor is.
+        stmt = select(
+            Payment.id, Payment.payment_date, Payment.type_id, Payment.sum
+        ).where(Payment.credit_id == credit_id)
+        if after is not None:
+            after_date, after_id = after
+            stmt = stmt.where(
+                or_(
+                    Payment.payment_date > after_date,
+                    and_(Payment.payment_date == after_date, Payment.id > after_id),
+                )
+            )
+        if start_date is not None:
+            stmt = stmt.where(Payment.payment_date >= start_date)
+        if end_date is not None:
+            stmt = stmt.where(Payment.payment_date <= end_date)
+        if type_id is not None:
+            stmt = stmt.where(Payment.type_id == type_id)
+        stmt = stmt.order_by(Payment.payment_date, Payment.id).limit(limit)
+        res = await self._execute(stmt)
+        return res.all()
+
+    def get_entity_class(self) -> Type[T]:
+        return Payment
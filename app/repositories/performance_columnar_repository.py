@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..analytics.columnar import ColumnarStore
+from .performance_repository import PerformanceRepositorySQLAlchemy
+
+
+class PerformanceRepositoryColumnar(PerformanceRepositorySQLAlchemy):
+    def __init__(self, session: AsyncSession, store: ColumnarStore) -> None:
+        super().__init__(session)
+        self.store = store
+
+    async def issuances_aggregates(
+        self, year: int
+    ) -> dict[tuple[int, int], tuple[int, Decimal]]:
+        await self.store.refresh_if_stale()
+        return self.store.issuances_aggregates(year)
+
+    async def payments_aggregates(
+        self, year: int
+    ) -> dict[tuple[int, int], tuple[int, Decimal]]:
+        await self.store.refresh_if_stale()
+        return self.store.payments_aggregates(year)
+
+    async def sum_issuances_until(self, start_date: date, end_date: date) -> Decimal:
+        await self.store.refresh_if_stale()
+        return self.store.sum_issuances(start_date, end_date)
+
+    async def sum_payments_until(self, start_date: date, end_date: date) -> Decimal:
+        await self.store.refresh_if_stale()
+        return self.store.sum_payments(start_date, end_date)
+
+    async def daily_issuances(
+        self, start_date: date, end_date: date
+    ) -> dict[date, Decimal]:
+        await self.store.refresh_if_stale()
+        return self.store.daily_issuances(start_date, end_date)
+
+    async def daily_payments(
+        self, start_date: date, end_date: date
+    ) -> dict[date, Decimal]:
+        await self.store.refresh_if_stale()
+        return self.store.daily_payments(start_date, end_date)
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..analytics.daily_index import DailyTotalsIndex
+from .performance_repository import PerformanceRepositorySQLAlchemy
+
+
+class PerformanceRepositoryDailyIndex(PerformanceRepositorySQLAlchemy):
+    def __init__(self, session: AsyncSession, index: DailyTotalsIndex) -> None:
+        super().__init__(session)
+        self.index = index
+
+    async def sum_issuances_until(self, start_date: date, end_date: date) -> Decimal:
+        await self.index.refresh_if_stale()
+        return self.index.sum_issuances(start_date, end_date)
+
+    async def sum_payments_until(self, start_date: date, end_date: date) -> Decimal:
+        await self.index.refresh_if_stale()
+        return self.index.sum_payments(start_date, end_date)
+
+    async def daily_issuances(
+        self, start_date: date, end_date: date
+    ) -> dict[date, Decimal]:
+        await self.index.refresh_if_stale()
+        return self.index.daily_issuances(start_date, end_date)
+
+    async def daily_payments(
+        self, start_date: date, end_date: date
+    ) -> dict[date, Decimal]:
+        await self.index.refresh_if_stale()
+        return self.index.daily_payments(start_date, end_date)
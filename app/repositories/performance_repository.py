@@ -2,117 +2,244 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from datetime import date
+from decimal import Decimal
+from typing import Any, Callable, Iterable
 
-from sqlalchemy import extract, func, select
+from sqlalchemy import Select, and_, extract, func, select
 
 from ..models.credit import Credit
 from ..models.payment import Payment
 from ..models.plan import Plan
-from .base import RepositorySQLAlchemy
+from .base import RepositoryMemory, RepositorySQLAlchemy
+
+
+def _to_decimal(value) -> Decimal:
+    return Decimal(str(value or 0))
+
+
+def _in_year(column, year: int):
+    # A plain range on the column (rather than YEAR(column) = :year) lets MySQL
+    # use the date indexes and prune yearly partitions.
+    return and_(column >= date(year, 1, 1), column < date(year + 1, 1, 1))
+
+
+def issuances_aggregates_stmt(year: int) -> Select:
+    return (
+        select(
+            extract("year", Credit.issuance_date).label("y"),
+            extract("month", Credit.issuance_date).label("m"),
+            func.count(Credit.id),
+            func.coalesce(func.sum(Credit.body), 0),
+        )
+        .where(_in_year(Credit.issuance_date, year))
+        .group_by("y", "m")
+    )
+
+
+def payments_aggregates_stmt(year: int) -> Select:
+    return (
+        select(
+            extract("year", Payment.payment_date).label("y"),
+            extract("month", Payment.payment_date).label("m"),
+            func.count(Payment.id),
+            func.coalesce(func.sum(Payment.sum), 0),
+        )
+        .where(_in_year(Payment.payment_date, year))
+        .group_by("y", "m")
+    )
 
 
 class PerformanceRepository(ABC):
     @abstractmethod
     async def issuances_aggregates(
         self, year: int
-    ) -> dict[tuple[int, int], tuple[int, float]]:
+    ) -> dict[tuple[int, int], tuple[int, Decimal]]:
         raise NotImplementedError()
 
     @abstractmethod
     async def payments_aggregates(
         self, year: int
-    ) -> dict[tuple[int, int], tuple[int, float]]:
+    ) -> dict[tuple[int, int], tuple[int, Decimal]]:
         raise NotImplementedError()
 
     @abstractmethod
     async def plans_sum_by_category(
         self, year: int
-    ) -> dict[tuple[int, int], dict[int, float]]:
+    ) -> dict[tuple[int, int], dict[int, Decimal]]:
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def sum_issuances_until(self, start_date: date, end_date: date) -> Decimal:
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def sum_payments_until(self, start_date: date, end_date: date) -> Decimal:
         raise NotImplementedError()
 
     @abstractmethod
-    async def sum_issuances_until(self, start_date: date, end_date: date) -> float:
+    async def daily_issuances(
+        self, start_date: date, end_date: date
+    ) -> dict[date, Decimal]:
         raise NotImplementedError()
 
     @abstractmethod
-    async def sum_payments_until(self, start_date: date, end_date: date) -> float:
+    async def daily_payments(
+        self, start_date: date, end_date: date
+    ) -> dict[date, Decimal]:
         raise NotImplementedError()
 
 
 class PerformanceRepositorySQLAlchemy(RepositorySQLAlchemy, PerformanceRepository):
     async def issuances_aggregates(
         self, year: int
-    ) -> dict[tuple[int, int], tuple[int, float]]:
-        stmt = (
-            select(
-                extract("year", Credit.issuance_date).label("y"),
-                extract("month", Credit.issuance_date).label("m"),
-                func.count(Credit.id),
-                func.coalesce(func.sum(Credit.body), 0.0),
-            )
-            .where(extract("year", Credit.issuance_date) == year)
-            .group_by("y", "m")
-        )
-        res = await self._execute(stmt)
-        data: dict[tuple[int, int], tuple[int, float]] = {}
+    ) -> dict[tuple[int, int], tuple[int, Decimal]]:
+        res = await self._execute(issuances_aggregates_stmt(year))
+        data: dict[tuple[int, int], tuple[int, Decimal]] = {}
         for y, m, cnt, summ in res.all():
-            data[(int(y), int(m))] = (int(cnt), float(summ or 0.0))
+            data[(int(y), int(m))] = (int(cnt), _to_decimal(summ))
         return data
 
     async def payments_aggregates(
         self, year: int
-    ) -> dict[tuple[int, int], tuple[int, float]]:
-        stmt = (
-            select(
-                extract("year", Payment.payment_date).label("y"),
-                extract("month", Payment.payment_date).label("m"),
-                func.count(Payment.id),
-                func.coalesce(func.sum(Payment.sum), 0.0),
-            )
-            .where(extract("year", Payment.payment_date) == year)
-            .group_by("y", "m")
-        )
-        res = await self._execute(stmt)
-        data: dict[tuple[int, int], tuple[int, float]] = {}
+    ) -> dict[tuple[int, int], tuple[int, Decimal]]:
+        res = await self._execute(payments_aggregates_stmt(year))
+        data: dict[tuple[int, int], tuple[int, Decimal]] = {}
         for y, m, cnt, summ in res.all():
-            data[(int(y), int(m))] = (int(cnt), float(summ or 0.0))
+            data[(int(y), int(m))] = (int(cnt), _to_decimal(summ))
         return data
 
     async def plans_sum_by_category(
         self, year: int
-    ) -> dict[tuple[int, int], dict[int, float]]:
+    ) -> dict[tuple[int, int], dict[int, Decimal]]:
         stmt = (
             select(
                 extract("year", Plan.period).label("y"),
                 extract("month", Plan.period).label("m"),
                 Plan.category_id,
-                func.coalesce(func.sum(Plan.sum), 0.0),
+                func.coalesce(func.sum(Plan.sum), 0),
             )
-            .where(extract("year", Plan.period) == year)
+            .where(_in_year(Plan.period, year))
             .group_by("y", "m", Plan.category_id)
         )
         res = await self._execute(stmt)
-        data: dict[tuple[int, int], dict[int, float]] = {}
+        data: dict[tuple[int, int], dict[int, Decimal]] = {}
         for y, m, cat, summ in res.all():
             key = (int(y), int(m))
             bucket = data.setdefault(key, {})
-            bucket[int(cat)] = float(summ or 0.0)
+            bucket[int(cat)] = _to_decimal(summ)
         return data
 
-    async def sum_issuances_until(self, start_date: date, end_date: date) -> float:
+    async def sum_issuances_until(self, start_date: date, end_date: date) -> Decimal:
         stmt = (
-            select(func.coalesce(func.sum(Credit.body), 0.0))
+            select(func.coalesce(func.sum(Credit.body), 0))
             .where(Credit.issuance_date >= start_date)
             .where(Credit.issuance_date <= end_date)
         )
         res = await self._execute(stmt)
-        return float(res.scalar() or 0.0)
+        return _to_decimal(res.scalar())
 
-    async def sum_payments_until(self, start_date: date, end_date: date) -> float:
+    async def sum_payments_until(self, start_date: date, end_date: date) -> Decimal:
         stmt = (
-            select(func.coalesce(func.sum(Payment.sum), 0.0))
+            select(func.coalesce(func.sum(Payment.sum), 0))
             .where(Payment.payment_date >= start_date)
             .where(Payment.payment_date <= end_date)
         )
         res = await self._execute(stmt)
-        return float(res.scalar() or 0.0)
+        return _to_decimal(res.scalar())
+
+    async def daily_issuances(
+        self, start_date: date, end_date: date
+    ) -> dict[date, Decimal]:
+        stmt = (
+            select(Credit.issuance_date, func.coalesce(func.sum(Credit.body), 0))
+            .where(Credit.issuance_date >= start_date)
+            .where(Credit.issuance_date <= end_date)
+            .group_by(Credit.issuance_date)
+        )
+        res = await self._execute(stmt)
+        return {d: _to_decimal(summ) for d, summ in res.all()}
+
+    async def daily_payments(
+        self, start_date: date, end_date: date
+    ) -> dict[date, Decimal]:
+        stmt = (
+            select(Payment.payment_date, func.coalesce(func.sum(Payment.sum), 0))
+            .where(Payment.payment_date >= start_date)
+            .where(Payment.payment_date <= end_date)
+            .group_by(Payment.payment_date)
+        )
+        res = await self._execute(stmt)
+        return {d: _to_decimal(summ) for d, summ in res.all()}
+
+
+class PerformanceRepositoryMemory(RepositoryMemory, PerformanceRepository):
+    async def issuances_aggregates(
+        self, year: int
+    ) -> dict[tuple[int, int], tuple[int, Decimal]]:
+        return _monthly_aggregates(
+            self.store.indexes.credits_by_issuance.between(
+                date(year, 1, 1), date(year, 12, 31)
+            ),
+            lambda c: c.body,
+        )
+
+    async def payments_aggregates(
+        self, year: int
+    ) -> dict[tuple[int, int], tuple[int, Decimal]]:
+        return _monthly_aggregates(
+            self.store.indexes.payments_by_date.between(
+                date(year, 1, 1), date(year, 12, 31)
+            ),
+            lambda p: p.sum,
+        )
+
+    async def plans_sum_by_category(
+        self, year: int
+    ) -> dict[tuple[int, int], dict[int, Decimal]]:
+        data: dict[tuple[int, int], dict[int, Decimal]] = {}
+        for period, plans in self.store.indexes.plans_by_period.between(
+            date(year, 1, 1), date(year, 12, 31)
+        ):
+            bucket = data.setdefault((period.year, period.month), {})
+            for p in plans:
+                bucket[p.category_id] = bucket.get(p.category_id, Decimal(0)) + p.sum
+        return data
+
+    async def sum_issuances_until(self, start_date: date, end_date: date) -> Decimal:
+        daily = await self.daily_issuances(start_date, end_date)
+        return sum(daily.values(), Decimal(0))
+
+    async def sum_payments_until(self, start_date: date, end_date: date) -> Decimal:
+        daily = await self.daily_payments(start_date, end_date)
+        return sum(daily.values(), Decimal(0))
+
+    async def daily_issuances(
+        self, start_date: date, end_date: date
+    ) -> dict[date, Decimal]:
+        return {
+            d: sum((c.body for c in credits), Decimal(0))
+            for d, credits in self.store.indexes.credits_by_issuance.between(
+                start_date, end_date
+            )
+        }
+
+    async def daily_payments(
+        self, start_date: date, end_date: date
+    ) -> dict[date, Decimal]:
+        return {
+            d: sum((p.sum for p in payments), Decimal(0))
+            for d, payments in self.store.indexes.payments_by_date.between(
+                start_date, end_date
+            )
+        }
+
+
+def _monthly_aggregates(
+    days: Iterable[tuple[date, list[Any]]], amount: Callable[[Any], Decimal]
+) -> dict[tuple[int, int], tuple[int, Decimal]]:
+    data: dict[tuple[int, int], tuple[int, Decimal]] = {}
+    for day, rows in days:
+        key = (day.year, day.month)
+        cnt, summ = data.get(key, (0, Decimal(0)))
+        data[key] = (cnt + len(rows), summ + sum((amount(r) for r in rows), Decimal(0)))
+    return data
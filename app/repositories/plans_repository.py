@@ -1,13 +1,14 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from calendar import monthrange
 from datetime import date
 from typing import Type
 
 from sqlalchemy import and_, extract, select
 
 from ..models.plan import Plan
-from .base import CRUDRepository, CRUDRepositorySQLAlchemy, T
+from .base import CRUDRepository, CRUDRepositoryMemory, CRUDRepositorySQLAlchemy, T
 
 
 class PlansRepository(CRUDRepository[Plan, int], ABC):
@@ -43,6 +44,27 @@ class PlansRepositorySQLAlchemy(PlansRepository, CRUDRepositorySQLAlchemy[Plan,
         res = await self._execute(stmt)
         return res.scalar() is not None
 
-    @property
+    def get_entity_class(self) -> Type[T]:
+        return Plan
+
+
+class PlansRepositoryMemory(PlansRepository, CRUDRepositoryMemory[Plan, int]):
+    async def list_plans_for_month(
+        self, year: int, month: int
+    ) -> list[tuple[int, date, float]]:
+        start = date(year, month, 1)
+        end = date(year, month, monthrange(year, month)[1])
+        return [
+            (p.category_id, p.period, float(p.sum))
+            for _period, plans in self.store.indexes.plans_by_period.between(start, end)
+            for p in plans
+        ]
+
+    async def exists_plan(self, period: date, category_id: int) -> bool:
+        return any(
+            p.category_id == category_id
+            for p in self.store.indexes.plans_by_period.get(period)
+        )
+
     def get_entity_class(self) -> Type[T]:
         return Plan
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Iterable, Type
+
+from sqlalchemy import select
+
+from ..models.user import User
+from .base import CRUDRepository, CRUDRepositoryMemory, CRUDRepositorySQLAlchemy, T
+
+
+class UserRepository(CRUDRepository[User, int], ABC):
+    @abstractmethod
+    async def existing_ids(self, ids: Iterable[int]) -> set[int]:
+        raise NotImplementedError()
+
+
+class UserRepositorySQLAlchemy(UserRepository, CRUDRepositorySQLAlchemy[User, int]):
+    async def existing_ids(self, ids: Iterable[int]) -> set[int]:
+        ids = list(set(ids))
+        if not ids:
+            return set()
+        res = await self._execute(select(User.id).where(User.id.in_(ids)))
+        return {int(i) for i in res.scalars().all()}
+
+    def get_entity_class(self) -> Type[T]:
+        return User
+
+
+class UserRepositoryMemory(UserRepository, CRUDRepositoryMemory[User, int]):
+    async def existing_ids(self, ids: Iterable[int]) -> set[int]:
+        return {i for i in ids if i in self.rows}
+
+    def get_entity_class(self) -> Type[T]:
+        return User
@@ -1,51 +1,216 @@
 from __future__ import annotations
 
+import contextlib
 import tempfile
 from datetime import date
 
-from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+)
+from fastapi.responses import StreamingResponse
 
+from ..api.admission import (
+    IMPORTS,
+    INTERACTIVE,
+    REPORTS,
+    AdmissionSlot,
+    admission,
+    admission_slot,
+)
+from ..api.conditional import (
+    PLANS_PERFORMANCE_TABLES,
+    YEAR_PERFORMANCE_TABLES,
+    evaluate_conditional,
+)
+from ..api.deadline import cancel_on_disconnect, statement_deadline
 from ..api.deps import (
+    get_change_feed_service,
+    get_credit_export_service,
+    get_ingest_service,
+    get_payment_history_service,
     get_performance_service,
     get_plans_insert_service,
     get_plans_service,
+    get_portfolio_aging_service,
     get_user_credit_service,
     require_api_key,
 )
-from ..schemas.credit import CreditListResponse
-from ..schemas.performance import YearPerformanceResponse
-from ..schemas.plan import PlansInsertResponse, PlansPerformanceResponse
+from ..api.encoding import (
+    ARROW_STREAM,
+    JSON,
+    MSGPACK,
+    encoded_response,
+    negotiate_request,
+)
+from ..api.export import EXPORT_FORMAT_PATTERN, export_response
+from ..cache.warmup import notify_data_changed
+from ..core.config import settings
+from ..db.session import get_session
+from ..schemas.credit import CreditListResponse, PaymentHistoryResponse
+from ..schemas.ingest import IngestResponse
+from ..schemas.performance import YearPerformanceItem, YearPerformanceResponse
+from ..schemas.plan import (
+    PlansInsertResponse,
+    PlansPerformanceResponse,
+    PlansPerformanceSeriesResponse,
+)
+from ..schemas.portfolio import PortfolioAgingResponse
+from ..services.change_feed_service import ChangeFeedService
+from ..services.export_service import (
+    CREDIT_EXPORT_COLUMNS,
+    YEAR_PERFORMANCE_EXPORT_COLUMNS,
+    year_performance_export_rows,
+)
+from ..services.ingest_service import IngestService
+from ..services.payment_history_service import PaymentHistoryService
 from ..services.plan_import_service import PlansInsertService
 from ..services.plan_performance_service import PlansService
+from ..services.portfolio_aging_service import PortfolioAgingService
 from ..services.user_credits_service import UserCreditService
 from ..services.year_performance_service import PerformanceService
 
-api_router = APIRouter(prefix="/api", dependencies=[Depends(require_api_key)])
+api_router = APIRouter(
+    prefix="/api",
+    dependencies=[Depends(require_api_key), Depends(statement_deadline)],
+)
 
 
-@api_router.get("/user_credits/{user_id}", response_model=CreditListResponse)
+@api_router.get(
+    "/user_credits/{user_id}",
+    response_model=CreditListResponse,
+    dependencies=[Depends(admission(INTERACTIVE))],
+)
 async def user_credits(
-    user_id: int, service: UserCreditService = Depends(get_user_credit_service)
-) -> CreditListResponse:
-    return await service.get_user_credits(user_id)
+    user_id: int,
+    request: Request,
+    service: UserCreditService = Depends(get_user_credit_service),
+) -> CreditListResponse | Response:
+    media = negotiate_request(request, (JSON, MSGPACK))
+    result = await service.get_user_credits(user_id)
+    if media == JSON:
+        return result
+    return encoded_response(media, result)
 
 
-@api_router.get("/year_performance/{year}", response_model=YearPerformanceResponse)
+@api_router.get(
+    "/credits/{credit_id}/payments",
+    response_model=PaymentHistoryResponse,
+    dependencies=[Depends(admission(INTERACTIVE))],
+)
+async def credit_payments(
+    credit_id: int,
+    cursor: str | None = Query(None),
+    limit: int = Query(100),
+    start: date | None = Query(None),
+    end: date | None = Query(None),
+    type_id: int | None = Query(None),
+    service: PaymentHistoryService = Depends(get_payment_history_service),
+) -> PaymentHistoryResponse:
+    return await service.get_payment_history(
+        credit_id, cursor, limit, start, end, type_id
+    )
+
+
+@api_router.get(
+    "/year_performance/{year}",
+    response_model=YearPerformanceResponse,
+    dependencies=[Depends(admission(REPORTS)), Depends(cancel_on_disconnect)],
+)
 async def year_performance(
-    year: int, service: PerformanceService = Depends(get_performance_service)
-) -> YearPerformanceResponse:
-    return await service.get_year_performance(year)
+    year: int,
+    request: Request,
+    response: Response,
+    service: PerformanceService = Depends(get_performance_service),
+) -> YearPerformanceResponse | Response:
+    media = negotiate_request(request, (JSON, MSGPACK, ARROW_STREAM))
+    conditional = await evaluate_conditional(
+        request,
+        f"year_performance:{year}" + ("" if media == JSON else f":{media}"),
+        YEAR_PERFORMANCE_TABLES,
+        closed=year < date.today().year,
+    )
+    if conditional.not_modified:
+        return conditional.not_modified_response()
+    result = await service.get_year_performance(year)
+    if media == JSON:
+        conditional.apply(response)
+        return result
+    return encoded_response(
+        media, result, YearPerformanceItem, headers=conditional.headers
+    )
 
 
-@api_router.get("/plans_performance", response_model=PlansPerformanceResponse)
+@api_router.get(
+    "/plans_performance",
+    response_model=PlansPerformanceResponse,
+    dependencies=[Depends(admission(REPORTS)), Depends(cancel_on_disconnect)],
+)
 async def plans_performance(
+    request: Request,
+    response: Response,
     date_str: date = Query(..., alias="date"),
     service: PlansService = Depends(get_plans_service),
 ) -> PlansPerformanceResponse:
+    conditional = await evaluate_conditional(
+        request,
+        f"plans_performance:{date_str}",
+        PLANS_PERFORMANCE_TABLES,
+        closed=date_str < date.today().replace(day=1),
+    )
+    if conditional.not_modified:
+        return conditional.not_modified_response()
+    conditional.apply(response)
     return await service.get_plans_performance(date_str)
 
 
-@api_router.post("/plans_insert", response_model=PlansInsertResponse)
+@api_router.get(
+    "/plans_performance_series",
+    response_model=PlansPerformanceSeriesResponse,
+    dependencies=[Depends(admission(REPORTS)), Depends(cancel_on_disconnect)],
+)
+async def plans_performance_series(
+    request: Request,
+    response: Response,
+    start: date = Query(...),
+    end: date = Query(...),
+    service: PlansService = Depends(get_plans_service),
+) -> PlansPerformanceSeriesResponse:
+    conditional = await evaluate_conditional(
+        request,
+        f"plans_performance_series:{start}:{end}",
+        PLANS_PERFORMANCE_TABLES,
+        closed=end < date.today().replace(day=1),
+    )
+    if conditional.not_modified:
+        return conditional.not_modified_response()
+    conditional.apply(response)
+    return await service.get_plans_performance_series(start, end)
+
+
+@api_router.get(
+    "/portfolio_aging",
+    response_model=PortfolioAgingResponse,
+    dependencies=[Depends(admission(REPORTS)), Depends(cancel_on_disconnect)],
+)
+async def portfolio_aging(
+    date_str: date | None = Query(None, alias="date"),
+    service: PortfolioAgingService = Depends(get_portfolio_aging_service),
+) -> PortfolioAgingResponse:
+    return await service.get_portfolio_aging(date_str or date.today())
+
+
+@api_router.post(
+    "/plans_insert",
+    response_model=PlansInsertResponse,
+    dependencies=[Depends(admission(IMPORTS))],
+)
 async def plans_insert(
     file: UploadFile = File(
         ...,
@@ -62,4 +227,110 @@ async def plans_insert(
             message = await service.insert_from_excel(tmp.name)
         except Exception as e:
             raise HTTPException(status_code=400, detail=str(e))
+    await notify_data_changed()
     return PlansInsertResponse(message=message)
+
+
+@api_router.post(
+    "/ingest/credits",
+    response_model=IngestResponse,
+    dependencies=[Depends(admission(IMPORTS))],
+)
+async def ingest_credits(
+    request: Request, service: IngestService = Depends(get_ingest_service)
+) -> IngestResponse:
+    try:
+        return await service.ingest_credits(request.stream())
+    finally:
+        await notify_data_changed()
+
+
+@api_router.post(
+    "/ingest/payments",
+    response_model=IngestResponse,
+    dependencies=[Depends(admission(IMPORTS))],
+)
+async def ingest_payments(
+    request: Request, service: IngestService = Depends(get_ingest_service)
+) -> IngestResponse:
+    try:
+        return await service.ingest_payments(request.stream())
+    finally:
+        await notify_data_changed()
+
+
+@api_router.get("/export/credits")
+async def export_credits(
+    export_format: str = Query("csv", alias="format", pattern=EXPORT_FORMAT_PATTERN),
+    slot: AdmissionSlot = Depends(admission_slot(REPORTS)),
+) -> StreamingResponse:
+    # The body is produced after the endpoint returns, so it runs on its own
+    # session instead of the request-scoped one.
+    async def chunks():
+        async with contextlib.aclosing(get_session()) as sessions:
+            async for session in sessions:
+                service = await get_credit_export_service(session)
+                rows_chunks = service.iter_credit_rows(settings.export_chunk_size)
+                async with contextlib.aclosing(rows_chunks):
+                    async for rows in rows_chunks:
+                        yield rows
+
+    return slot.attach(
+        export_response("credits", export_format, CREDIT_EXPORT_COLUMNS, chunks())
+    )
+
+
+@api_router.get("/export/year_performance/{year}")
+async def export_year_performance(
+    year: int,
+    export_format: str = Query("csv", alias="format", pattern=EXPORT_FORMAT_PATTERN),
+    service: PerformanceService = Depends(get_performance_service),
+    slot: AdmissionSlot = Depends(admission_slot(REPORTS)),
+) -> StreamingResponse:
+    rows = year_performance_export_rows(await service.get_year_performance(year))
+
+    async def chunks():
+        yield rows
+
+    return slot.attach(
+        export_response(
+            f"year_performance_{year}",
+            export_format,
+            YEAR_PERFORMANCE_EXPORT_COLUMNS,
+            chunks(),
+        )
+    )
+
+
+@api_router.get("/changes/{table}")
+async def change_feed(
+    table: str,
+    after: int = Query(0, ge=0),
+    limit: int | None = Query(None, ge=1),
+    service: ChangeFeedService = Depends(get_change_feed_service),
+    slot: AdmissionSlot = Depends(admission_slot(REPORTS)),
+) -> StreamingResponse:
+    page_size = min(
+        limit or settings.change_feed_page_size, settings.change_feed_max_page_size
+    )
+    page = await service.page(after, page_size)
+
+    async def body():
+        async with contextlib.aclosing(get_session()) as sessions:
+            async for session in sessions:
+                feed = await get_change_feed_service(table, session)
+                lines = feed.iter_ndjson(page, settings.change_feed_chunk_size)
+                async with contextlib.aclosing(lines):
+                    async for chunk in lines:
+                        yield chunk
+
+    return slot.attach(
+        StreamingResponse(
+            body(),
+            media_type="application/x-ndjson",
+            headers={
+                "X-Next-Watermark": str(page.next_watermark),
+                "X-Has-More": "true" if page.has_more else "false",
+            },
+        )
+    )
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+
+from ..api.readiness import get_readiness
+
+health_router = APIRouter()
+
+
+@health_router.get("/health")
+async def health() -> dict[str, str]:
+    return {"status": "ok"}
+
+
+@health_router.get("/ready")
+async def ready() -> JSONResponse:
+    readiness = get_readiness()
+    if readiness is None:
+        return JSONResponse(
+            {"status": "starting", "steps": {}},
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+    return JSONResponse(
+        readiness.status(),
+        status_code=(
+            status.HTTP_200_OK
+            if readiness.ready
+            else status.HTTP_503_SERVICE_UNAVAILABLE
+        ),
+    )
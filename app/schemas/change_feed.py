@@ -0,0 +1,9 @@
+from __future__ import annotations
+
+from . import BaseSchema
+
+
+class ChangeFeedPage(BaseSchema):
+    after: int
+    next_watermark: int
+    has_more: bool
@@ -31,3 +31,23 @@ class CreditItem(BaseSchema):
 
 class CreditListResponse(BaseSchema):
     items: list[CreditItem]
+
+
+class CreditPaymentTotals(BaseSchema):
+    principal_paid: Decimal = Decimal("0")
+    interest_paid: Decimal = Decimal("0")
+    total_paid: Decimal = Decimal("0")
+    last_payment_date: date | None = None
+    payments_count: int = 0
+
+
+class PaymentItem(BaseSchema):
+    id: int
+    payment_date: date
+    type_id: int
+    sum: Decimal
+
+
+class PaymentHistoryResponse(BaseSchema):
+    items: list[PaymentItem]
+    next_cursor: str | None = None
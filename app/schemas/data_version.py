@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import hashlib
+from decimal import Decimal
+
+from . import BaseSchema
+
+TABLES: tuple[str, ...] = ("users", "credits", "payments", "plans", "dictionary")
+
+
+class DataVersion(BaseSchema):
+    users: int = 0
+    credits: int = 0
+    payments: int = 0
+    plans: int = 0
+    dictionary: int = 0
+    changes: dict[str, int] = {}
+
+    def table_version(self, table: str) -> tuple[int, int]:
+        return getattr(self, table), self.changes.get(table, 0)
+
+    @property
+    def stamp(self) -> str:
+        raw = ":".join("{}.{}".format(*self.table_version(table)) for table in TABLES)
+        return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+    def covers(self, other: DataVersion) -> bool:
+        return all(
+            a >= b
+            for table in TABLES
+            for a, b in zip(self.table_version(table), other.table_version(table))
+        )
+
+
+# Row count, id sum and amount sum of a table's rows up to some id: catches
+# rows deleted, rewritten or re-amounted below a max id that did not move.
+class ContentFingerprint(BaseSchema):
+    rows: int = 0
+    id_sum: int = 0
+    amount: Decimal = Decimal(0)
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+from pydantic import ConfigDict, Field
+
+from . import BaseSchema
+
+
+# Ids are always assigned by the database: a client-chosen id could land below
+# rows already read by the id watermarks and never be seen by them.
+class IngestRow(BaseSchema):
+    model_config = ConfigDict(from_attributes=True, extra="forbid")
+
+
+class CreditIngestRow(IngestRow):
+    user_id: int
+    issuance_date: date
+    return_date: date
+    actual_return_date: date | None = None
+    body: Decimal = Field(ge=0, max_digits=16, decimal_places=4)
+    percent: Decimal = Field(ge=0, max_digits=16, decimal_places=4)
+
+
+class PaymentIngestRow(IngestRow):
+    credit_id: int
+    payment_date: date
+    type_id: int
+    sum: Decimal = Field(gt=0, max_digits=16, decimal_places=4)
+
+
+class IngestRowError(BaseSchema):
+    line: int | None = None
+    detail: str
+
+
+class IngestBatchResult(BaseSchema):
+    batch: int
+    first_line: int
+    last_line: int
+    received: int
+    inserted: int
+    rejected: int
+    errors: list[IngestRowError] = []
+
+
+class IngestResponse(BaseSchema):
+    received: int = 0
+    inserted: int = 0
+    rejected: int = 0
+    batches: list[IngestBatchResult] = []
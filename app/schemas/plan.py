@@ -20,3 +20,12 @@ class PlansPerformanceResponse(BaseSchema):
 
 class PlansInsertResponse(BaseSchema):
     message: str
+
+
+class PlansPerformancePoint(BaseSchema):
+    as_of: date
+    items: list[PlanPerformanceItem]
+
+
+class PlansPerformanceSeriesResponse(BaseSchema):
+    items: list[PlansPerformancePoint]
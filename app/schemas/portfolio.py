@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+from . import BaseSchema
+
+
+class AgingBucket(BaseSchema):
+    bucket: str
+    min_overdue_days: int
+    max_overdue_days: int | None
+    credits_count: int
+    body_sum: Decimal
+    outstanding_body: Decimal
+    principal_payments_sum: Decimal
+    interest_payments_sum: Decimal
+
+
+class PortfolioAgingResponse(BaseSchema):
+    as_of: date
+    items: list[AgingBucket]
@@ -1,39 +1,152 @@
 from __future__ import annotations
 
 import asyncio
-from datetime import datetime
+import hashlib
+import logging
+import time
+from datetime import datetime, timezone
 from decimal import Decimal
 from pathlib import Path
+from typing import Iterable, NamedTuple, Optional
 
-import pandas as pd
-from sqlalchemy import text
+from sqlalchemy import bindparam, select, text
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
 from ..core.config import settings
 from ..db.base import Base
+from ..db.locks import startup_lock
 from ..db.session import get_engine, get_session
 from ..models.credit import Credit
 from ..models.dictionary import Dictionary
 from ..models.payment import Payment
 from ..models.plan import Plan
+from ..models.seed_state import SeedState
 from ..models.user import User
+from ..repositories.credit_repository import CreditRepositorySQLAlchemy
+from ..repositories.data_version_repository import DataVersionRepositorySQLAlchemy
+from ..schemas.credit import CreditPaymentTotals
+from ..services.credit_totals_service import accumulate_payment_totals
+
+logger = logging.getLogger(__name__)
+
+SEED_DIR: Path = Path(__file__).resolve().parents[2] / "test_data"
+# Table -> seed file, in foreign-key order.
+SEED_FILES: dict[str, str] = {
+    "users": "users.csv",
+    "dictionary": "dictionary.csv",
+    "credits": "credits.csv",
+    "plans": "plans.csv",
+    "payments": "payments.csv",
+}
+# Ids per IN (...) when checking that a changed file's older rows are loaded.
+SEED_CHECK_CHUNK: int = 1000
 
 
 async def seed_if_needed() -> None:
-    if not settings.seed_on_startup:
+    if not settings.seed_on_startup or settings.repository_backend == "memory":
         return
 
     engine = get_engine()
     await _ensure_db_ready(engine)
 
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # Every worker runs this; the lock lets one seed while the rest wait, and
+    # they then find nothing left to load.
+    async with startup_lock(engine, "seed"):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        async for session in get_session():
+            await _load_incremental(session)
+            break
+
+
+def file_checksum(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+async def _load_incremental(session: AsyncSession) -> None:
+    started = time.perf_counter()
+    checksums = await asyncio.to_thread(
+        lambda: {t: file_checksum(SEED_DIR / f) for t, f in SEED_FILES.items()}
+    )
+    recorded = {
+        s.file: s.checksum for s in (await session.scalars(select(SeedState))).all()
+    }
+    changed = [t for t in SEED_FILES if recorded.get(SEED_FILES[t]) != checksums[t]]
+    if not changed:
+        logger.info("Seed files unchanged, nothing to load")
+        return
+
+    # Seed files are append-only: a changed file contributes the rows whose id
+    # is above the table's current maximum.
+    after_ids = {
+        table: int(await session.scalar(text(f"SELECT MAX(id) FROM {table}")) or 0)
+        for table in changed
+    }
+    # A file whose older rows are not all in the table was edited rather than
+    # appended to. Its new rows still load, but the file is not marked as
+    # loaded, so the mismatch is reported again on every start.
+    older_ids = await asyncio.to_thread(read_seed_ids, SEED_DIR, after_ids)
+    rewritten: set[str] = set()
+    for table, ids in older_ids.items():
+        missing = await _count_missing(session, table, ids)
+        if missing:
+            logger.error(
+                "%s: %d row(s) with id <= %d are not in %s; the file was edited, "
+                "not appended to, so it stays marked as not loaded",
+                SEED_FILES[table],
+                missing,
+                after_ids[table],
+                table,
+            )
+            rewritten.add(table)
+    data = await asyncio.to_thread(read_seed_data, SEED_DIR, after_ids, changed)
+
+    # New credits carry the totals of their payments from read_seed_data;
+    # new payments of credits that already exist are added on top.
+    new_credit_ids = {c.id for c in data.credits}
+    totals = accumulate_payment_totals(
+        (p.credit_id, p.type_id, p.sum, p.payment_date)
+        for p in data.payments
+        if p.credit_id not in new_credit_ids
+    )
+
+    credit_repo = CreditRepositorySQLAlchemy(session)
+    now = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+    async with credit_repo.transaction():
+        for entities in data:
+            session.add_all(entities)
+        await session.flush()
+        await credit_repo.add_payment_totals(totals)
+        await DataVersionRepositorySQLAlchemy(session).record_changes(
+            changed + (["credits"] if totals else [])
+        )
+        for table in (t for t in changed if t not in rewritten):
+            await session.merge(
+                SeedState(
+                    file=SEED_FILES[table], checksum=checksums[table], loaded_at=now
+                )
+            )
+    logger.info(
+        "Seeded %s in %.3fs",
+        ", ".join(f"{t}: +{len(getattr(data, t))}" for t in changed),
+        time.perf_counter() - started,
+    )
 
-    async for session in get_session():
-        exists = await _has_any_users(session)
-        if not exists:
-            await _load_all(session)
-        break
+
+async def _count_missing(session: AsyncSession, table: str, ids: list[int]) -> int:
+    stmt = text(f"SELECT COUNT(*) FROM {table} WHERE id IN :ids").bindparams(
+        bindparam("ids", expanding=True)
+    )
+    found = 0
+    for i in range(0, len(ids), SEED_CHECK_CHUNK):
+        chunk = ids[i : i + SEED_CHECK_CHUNK]
+        found += int(await session.scalar(stmt, {"ids": chunk}))
+    return len(ids) - found
 
 
 async def _ensure_db_ready(engine: AsyncEngine) -> None:
@@ -50,12 +163,9 @@ async def _ensure_db_ready(engine: AsyncEngine) -> None:
             await asyncio.sleep(delay_seconds)
 
 
-async def _has_any_users(session: AsyncSession) -> bool:
-    result = await session.execute(text("SELECT 1 FROM users LIMIT 1"))
-    return result.scalar() is not None
-
-
 def _parse_date(value) -> datetime.date | None:
+    import pandas as pd
+
     if value is None:
         return None
 
@@ -83,14 +193,51 @@ def _parse_date(value) -> datetime.date | None:
     return ts.date()
 
 
-async def _load_all(session: AsyncSession) -> None:
-    base = Path(__file__).resolve().parents[2] / "test_data"
+def _totals_columns(totals: CreditPaymentTotals | None) -> dict:
+    return (totals or CreditPaymentTotals()).model_dump()
+
+
+class SeedData(NamedTuple):
+    users: list[User]
+    dictionary: list[Dictionary]
+    credits: list[Credit]
+    plans: list[Plan]
+    payments: list[Payment]
+
+
+def read_seed_ids(base: Path, after_ids: dict[str, int]) -> dict[str, list[int]]:
+    # Ids of the rows each file has at or below the table's current maximum.
+    import pandas as pd
+
+    ids: dict[str, list[int]] = {}
+    for table, after in after_ids.items():
+        if after:
+            column = pd.read_csv(base / SEED_FILES[table], sep="\t", usecols=["id"])
+            ids[table] = sorted(int(i) for i in column["id"] if i <= after)
+    return ids
+
+
+def read_seed_data(
+    base: Path = SEED_DIR,
+    after_ids: Optional[dict[str, int]] = None,
+    tables: Optional[Iterable[str]] = None,
+) -> SeedData:
+    import pandas as pd
 
-    users_df = pd.read_csv(base / "users.csv", sep="\t")
-    credits_df = pd.read_csv(base / "credits.csv", sep="\t")
-    dictionary_df = pd.read_csv(base / "dictionary.csv", sep="\t")
-    plans_df = pd.read_csv(base / "plans.csv", sep="\t")
-    payments_df = pd.read_csv(base / "payments.csv", sep="\t")
+    wanted = set(SEED_FILES if tables is None else tables)
+    frames: dict[str, pd.DataFrame] = {}
+    for table, file in SEED_FILES.items():
+        df = pd.read_csv(base / file, sep="\t") if table in wanted else None
+        if df is None:
+            df = pd.DataFrame(columns=["id"])
+        elif after_ids:
+            df = df[df["id"] > after_ids.get(table, 0)]
+        frames[table] = df
+    users_df = frames["users"]
+    credits_df = frames["credits"]
+    dictionary_df = frames["dictionary"]
+    plans_df = frames["plans"]
+    payments_df = frames["payments"]
 
     users = [
         User(
@@ -101,19 +248,6 @@ async def _load_all(session: AsyncSession) -> None:
         for _, r in users_df.iterrows()
     ]
 
-    credits = [
-        Credit(
-            id=int(r["id"]),
-            user_id=int(r["user_id"]),
-            issuance_date=_parse_date(r["issuance_date"]),
-            return_date=_parse_date(r.get("return_date")),
-            actual_return_date=_parse_date(r.get("actual_return_date")),
-            body=Decimal(r["body"]),
-            percent=Decimal(r["percent"]),
-        )
-        for _, r in credits_df.iterrows()
-    ]
-
     dictionary = [
         Dictionary(id=int(r["id"]), name=str(r["name"]))
         for _, r in dictionary_df.iterrows()
@@ -123,7 +257,7 @@ async def _load_all(session: AsyncSession) -> None:
         Plan(
             id=int(r["id"]),
             period=_parse_date(r["period"]),
-            sum=Decimal(r["sum"]),
+            sum=Decimal(str(r["sum"])),
             category_id=int(r["category_id"]),
         )
         for _, r in plans_df.iterrows()
@@ -132,7 +266,7 @@ async def _load_all(session: AsyncSession) -> None:
     payments = [
         Payment(
             id=int(r["id"]),
-            sum=Decimal(r["sum"]),
+            sum=Decimal(str(r["sum"])),
             payment_date=_parse_date(r["payment_date"]),
             credit_id=int(r["credit_id"]),
             type_id=int(r["type_id"]),
@@ -140,9 +274,22 @@ async def _load_all(session: AsyncSession) -> None:
         for _, r in payments_df.iterrows()
     ]
 
-    session.add_all(users)
-    session.add_all(dictionary)
-    session.add_all(credits)
-    session.add_all(plans)
-    session.add_all(payments)
-    await session.commit()
+    totals = accumulate_payment_totals(
+        (p.credit_id, p.type_id, p.sum, p.payment_date) for p in payments
+    )
+
+    credits = [
+        Credit(
+            id=int(r["id"]),
+            user_id=int(r["user_id"]),
+            issuance_date=_parse_date(r["issuance_date"]),
+            return_date=_parse_date(r.get("return_date")),
+            actual_return_date=_parse_date(r.get("actual_return_date")),
+            body=Decimal(str(r["body"])),
+            percent=Decimal(str(r["percent"])),
+            **_totals_columns(totals.get(int(r["id"]))),
+        )
+        for _, r in credits_df.iterrows()
+    ]
+
+    return SeedData(users, dictionary, credits, plans, payments)
@@ -1,2 +1,4 @@
+PRINCIPAL_TYPE_ID = 1  # dictionary: "тіло"
+INTEREST_TYPE_ID = 2  # dictionary: "відсотки"
 ISSUANCE_CATEGORY_ID = 3  # dictionary: "видача"
 COLLECTION_CATEGORY_ID = 4  # dictionary: "збір"
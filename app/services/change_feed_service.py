@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+import time
+from collections import deque
+from typing import AsyncIterator, Optional
+
+from ..core.config import settings
+from ..repositories.change_feed_repository import ChangeFeedRepository
+from ..schemas.change_feed import ChangeFeedPage
+
+
+# Auto-increment ids are allocated at insert but become visible at commit, so
+# a feed paging by id could move its watermark past a lower id that commits
+# later and never serve that row. The horizon holds the feed back instead:
+# it samples MAX(id) and only serves ids that were already the maximum at
+# least `lag` seconds ago. Any transaction that took a lower id is assumed
+# to have committed or rolled back by then. A writer that keeps its
+# transaction open longer than WATERMARK_SETTLE_SECONDS can still be
+# skipped. A freshly started worker serves nothing for the first `lag`
+# seconds after the first request.
+class FeedHorizon:
+    def __init__(self, lag: float) -> None:
+        self.lag = lag
+        self._samples: deque[tuple[float, int]] = deque()
+
+    def observe(self, max_id: int, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        if not self._samples or max_id > self._samples[-1][1]:
+            self._samples.append((now, max_id))
+
+    def safe_id(self, now: Optional[float] = None) -> int:
+        cutoff = (time.monotonic() if now is None else now) - self.lag
+        while len(self._samples) > 1 and self._samples[1][0] <= cutoff:
+            self._samples.popleft()
+        if self._samples and self._samples[0][0] <= cutoff:
+            return self._samples[0][1]
+        return 0
+
+
+_horizons: dict[str, FeedHorizon] = {}
+
+
+def get_feed_horizon(table: str) -> FeedHorizon:
+    horizon = _horizons.get(table)
+    if horizon is None:
+        horizon = _horizons[table] = FeedHorizon(settings.watermark_settle_seconds)
+    return horizon
+
+
+class ChangeFeedService:
+    def __init__(self, repo: ChangeFeedRepository, horizon: FeedHorizon) -> None:
+        self.repo = repo
+        self.horizon = horizon
+
+    async def page(self, after: int, limit: int) -> ChangeFeedPage:
+        self.horizon.observe(await self.repo.max_id())
+        ceiling = self.horizon.safe_id()
+        upper = await self.repo.page_upper_bound(after, limit, ceiling)
+        if upper is None:
+            return ChangeFeedPage(after=after, next_watermark=after, has_more=False)
+        return ChangeFeedPage(
+            after=after,
+            next_watermark=upper,
+            has_more=await self.repo.has_rows_after(upper, ceiling),
+        )
+
+    async def iter_ndjson(
+        self, page: ChangeFeedPage, chunk_size: int
+    ) -> AsyncIterator[bytes]:
+        if page.next_watermark <= page.after:
+            return
+        async for rows in self.repo.stream_range(
+            page.after, page.next_watermark, chunk_size
+        ):
+            yield "".join(
+                json.dumps(row._asdict(), default=str, separators=(",", ":")) + "\n"
+                for row in rows
+            ).encode()
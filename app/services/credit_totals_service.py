@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+from typing import Iterable
+
+from ..repositories.credit_repository import CreditRepository
+from ..schemas.credit import CreditPaymentTotals
+from . import INTEREST_TYPE_ID, PRINCIPAL_TYPE_ID
+
+
+def accumulate_payment_totals(
+    payments: Iterable[tuple[int, int, Decimal, date]],
+) -> dict[int, CreditPaymentTotals]:
+    totals: dict[int, CreditPaymentTotals] = {}
+    for credit_id, type_id, amount, payment_date in payments:
+        t = totals.get(credit_id)
+        if t is None:
+            t = totals[credit_id] = CreditPaymentTotals()
+        if type_id == PRINCIPAL_TYPE_ID:
+            t.principal_paid += amount
+        elif type_id == INTEREST_TYPE_ID:
+            t.interest_paid += amount
+        t.total_paid += amount
+        t.payments_count += 1
+        if t.last_payment_date is None or payment_date > t.last_payment_date:
+            t.last_payment_date = payment_date
+    return totals
+
+
+class CreditTotalsService:
+    def __init__(self, credit_repo: CreditRepository) -> None:
+        self.credit_repo = credit_repo
+
+    async def find_inconsistent(self, limit: int = 100) -> list[int]:
+        return await self.credit_repo.find_inconsistent_payment_totals(
+            PRINCIPAL_TYPE_ID, INTEREST_TYPE_ID, limit
+        )
+
+    async def rebuild(self) -> int:
+        return await self.credit_repo.rebuild_payment_totals(
+            PRINCIPAL_TYPE_ID, INTEREST_TYPE_ID
+        )
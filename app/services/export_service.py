@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, AsyncIterator
+
+from ..repositories.credit_repository import CreditRepository
+from ..schemas.credit import CreditItem
+from ..schemas.performance import YearPerformanceItem, YearPerformanceResponse
+from .user_credits_service import build_credit_item
+
+CREDIT_EXPORT_COLUMNS: list[str] = [
+    "credit_id",
+    "user_id",
+    "issuance_date",
+    "is_closed",
+    "return_date",
+    "due_date",
+    "overdue_days",
+    "body",
+    "percent",
+    "total_payments_sum",
+    "principal_payments_sum",
+    "interest_payments_sum",
+]
+
+YEAR_PERFORMANCE_EXPORT_COLUMNS: list[str] = list(YearPerformanceItem.model_fields)
+
+
+def credit_export_row(credit_id: int, user_id: int, item: CreditItem) -> list[Any]:
+    closed, open_ = item.closed, item.open
+    info = closed or open_
+    return [
+        credit_id,
+        user_id,
+        item.issuance_date,
+        item.is_closed,
+        closed.return_date if closed else None,
+        open_.due_date if open_ else None,
+        open_.overdue_days if open_ else None,
+        info.body,
+        info.percent,
+        closed.total_payments_sum if closed else None,
+        open_.principal_payments_sum if open_ else None,
+        open_.interest_payments_sum if open_ else None,
+    ]
+
+
+def year_performance_export_rows(response: YearPerformanceResponse) -> list[list[Any]]:
+    return [
+        [getattr(item, column) for column in YEAR_PERFORMANCE_EXPORT_COLUMNS]
+        for item in response.items
+    ]
+
+
+class CreditExportService:
+    def __init__(self, credit_repo: CreditRepository) -> None:
+        self.credit_repo = credit_repo
+
+    async def iter_credit_rows(self, chunk_size: int) -> AsyncIterator[list[list[Any]]]:
+        today = date.today()
+        async for chunk in self.credit_repo.stream_all(chunk_size):
+            yield [
+                credit_export_row(c.id, c.user_id, build_credit_item(c, today))
+                for c in chunk
+            ]
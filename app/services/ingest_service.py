@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+from typing import Any, AsyncIterator, Awaitable, Callable, Type, TypeVar
+
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..exceptions import ValidationException
+from ..repositories.credit_repository import CreditRepository
+from ..repositories.data_version_repository import DataVersionRepository
+from ..repositories.payment_repository import PaymentRepository
+from ..repositories.user_repository import UserRepository
+from ..schemas import BaseSchema
+from ..schemas.ingest import (
+    CreditIngestRow,
+    IngestBatchResult,
+    IngestResponse,
+    IngestRowError,
+    PaymentIngestRow,
+)
+from . import INTEREST_TYPE_ID, PRINCIPAL_TYPE_ID
+from .credit_totals_service import accumulate_payment_totals
+
+R = TypeVar("R", bound=BaseSchema)
+NumberedLine = tuple[int, bytes]
+NumberedRow = tuple[int, Any]
+
+PAYMENT_TYPE_IDS: set[int] = {PRINCIPAL_TYPE_ID, INTEREST_TYPE_ID}
+
+
+async def iter_ndjson_lines(
+    chunks: AsyncIterator[bytes], max_line_bytes: int
+) -> AsyncIterator[NumberedLine]:
+    buffer = b""
+    line_no = 0
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_no += 1
+            if line.strip():
+                yield line_no, line
+        if len(buffer) > max_line_bytes:
+            raise ValidationException(
+                f"Line {line_no + 1} is longer than {max_line_bytes} byte(s)"
+            )
+    if buffer.strip():
+        yield line_no + 1, buffer
+
+
+async def iter_batches(
+    lines: AsyncIterator[NumberedLine], size: int
+) -> AsyncIterator[list[NumberedLine]]:
+    batch: list[NumberedLine] = []
+    async for line in lines:
+        batch.append(line)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _describe(err: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in e['loc']) or 'row'}: {e['msg']}"
+        for e in err.errors()
+    )
+
+
+class IngestService:
+    def __init__(
+        self,
+        credit_repo: CreditRepository,
+        payment_repo: PaymentRepository,
+        user_repo: UserRepository,
+        version_repo: DataVersionRepository,
+        batch_size: int,
+        max_line_bytes: int,
+        max_reported_errors: int,
+    ) -> None:
+        self.credit_repo = credit_repo
+        self.payment_repo = payment_repo
+        self.user_repo = user_repo
+        self.version_repo = version_repo
+        self.batch_size = batch_size
+        self.max_line_bytes = max_line_bytes
+        self.max_reported_errors = max_reported_errors
+
+    async def ingest_credits(self, chunks: AsyncIterator[bytes]) -> IngestResponse:
+        return await self._ingest(chunks, CreditIngestRow, self._store_credits)
+
+    async def ingest_payments(self, chunks: AsyncIterator[bytes]) -> IngestResponse:
+        return await self._ingest(chunks, PaymentIngestRow, self._store_payments)
+
+    async def _ingest(
+        self,
+        chunks: AsyncIterator[bytes],
+        schema: Type[R],
+        store: Callable[[list[NumberedRow], list[IngestRowError]], Awaitable[int]],
+    ) -> IngestResponse:
+        response = IngestResponse()
+        lines = iter_ndjson_lines(chunks, self.max_line_bytes)
+        # The next batch is read only after the previous one is committed, so a
+        # slow database pushes back on the client through the socket buffers.
+        try:
+            async for batch in iter_batches(lines, self.batch_size):
+                await self._ingest_batch(response, batch, schema, store)
+        except ValidationException as err:
+            raise ValidationException(
+                err.message, {**response.model_dump(exclude={"batches"}), **err.payload}
+            )
+        return response
+
+    async def _ingest_batch(
+        self,
+        response: IngestResponse,
+        batch: list[NumberedLine],
+        schema: Type[R],
+        store: Callable[[list[NumberedRow], list[IngestRowError]], Awaitable[int]],
+    ) -> None:
+        errors: list[IngestRowError] = []
+        rows: list[NumberedRow] = []
+        for line_no, raw in batch:
+            try:
+                rows.append((line_no, schema.model_validate_json(raw)))
+            except ValidationError as err:
+                errors.append(IngestRowError(line=line_no, detail=_describe(err)))
+
+        inserted = await store(rows, errors) if rows else 0
+        errors.sort(key=lambda e: e.line or 0)
+        response.batches.append(
+            IngestBatchResult(
+                batch=len(response.batches) + 1,
+                first_line=batch[0][0],
+                last_line=batch[-1][0],
+                received=len(batch),
+                inserted=inserted,
+                rejected=len(batch) - inserted,
+                errors=self._reportable(response, errors),
+            )
+        )
+        response.received += len(batch)
+        response.inserted += inserted
+        response.rejected += len(batch) - inserted
+
+    def _reportable(
+        self, response: IngestResponse, errors: list[IngestRowError]
+    ) -> list[IngestRowError]:
+        reported = sum(len(b.errors) for b in response.batches)
+        return errors[: max(self.max_reported_errors - reported, 0)]
+
+    async def _store_credits(
+        self, rows: list[NumberedRow], errors: list[IngestRowError]
+    ) -> int:
+        users = await self.user_repo.existing_ids(r.user_id for _, r in rows)
+        accepted: list[dict[str, Any]] = []
+        for line_no, r in rows:
+            if r.user_id not in users:
+                detail = f"user_id: unknown user {r.user_id}"
+            elif r.return_date < r.issuance_date:
+                detail = "return_date: earlier than issuance_date"
+            elif r.actual_return_date and r.actual_return_date < r.issuance_date:
+                detail = "actual_return_date: earlier than issuance_date"
+            else:
+                # Every row carries every column: executemany takes its
+                # column list from the first row of the batch.
+                accepted.append(r.model_dump())
+                continue
+            errors.append(IngestRowError(line=line_no, detail=detail))
+
+        return await self._insert(
+            errors,
+            len(accepted),
+            lambda: self.credit_repo.insert_many(accepted),
+            ("credits",),
+        )
+
+    async def _store_payments(
+        self, rows: list[NumberedRow], errors: list[IngestRowError]
+    ) -> int:
+        credits = await self.credit_repo.existing_ids(r.credit_id for _, r in rows)
+        accepted: list[PaymentIngestRow] = []
+        for line_no, r in rows:
+            if r.type_id not in PAYMENT_TYPE_IDS:
+                detail = f"type_id: unknown payment type {r.type_id}"
+            elif r.credit_id not in credits:
+                detail = f"credit_id: unknown credit {r.credit_id}"
+            else:
+                accepted.append(r)
+                continue
+            errors.append(IngestRowError(line=line_no, detail=detail))
+
+        totals = accumulate_payment_totals(
+            (r.credit_id, r.type_id, r.sum, r.payment_date) for r in accepted
+        )
+
+        async def _write() -> None:
+            await self.payment_repo.insert_many([r.model_dump() for r in accepted])
+            await self.credit_repo.add_payment_totals(totals)
+
+        # Payments also move the per-credit totals.
+        return await self._insert(
+            errors, len(accepted), _write, ("payments", "credits")
+        )
+
+    async def _insert(
+        self,
+        errors: list[IngestRowError],
+        count: int,
+        write: Callable[[], Awaitable[None]],
+        tables: tuple[str, ...],
+    ) -> int:
+        if not count:
+            return 0
+        try:
+            async with self.payment_repo.transaction():
+                await write()
+                await self.version_repo.record_changes(tables)
+        except SQLAlchemyError as exc:
+            detail = str(getattr(exc, "orig", None) or exc).splitlines()[0]
+            errors.insert(0, IngestRowError(detail=f"batch rejected: {detail}"))
+            return 0
+        return count
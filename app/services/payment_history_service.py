@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import base64
+import binascii
+from datetime import date
+
+from ..exceptions import NotFoundException, ValidationException
+from ..repositories.credit_repository import CreditRepository
+from ..repositories.payment_repository import PaymentRepository
+from ..schemas.credit import PaymentHistoryResponse, PaymentItem
+
+MAX_PAGE_SIZE: int = 1000
+
+
+def encode_cursor(payment_date: date, payment_id: int) -> str:
+    raw = f"{payment_date.isoformat()}|{payment_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[date, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        payment_date, payment_id = raw.split("|")
+        return date.fromisoformat(payment_date), int(payment_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValidationException("Invalid cursor")
+
+
+class PaymentHistoryService:
+    def __init__(
+        self, payment_repo: PaymentRepository, credit_repo: CreditRepository
+    ) -> None:
+        self.payment_repo = payment_repo
+        self.credit_repo = credit_repo
+
+    async def get_payment_history(
+        self,
+        credit_id: int,
+        cursor: str | None,
+        limit: int,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        type_id: int | None = None,
+    ) -> PaymentHistoryResponse:
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValidationException(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+        after = decode_cursor(cursor) if cursor else None
+
+        rows = await self.payment_repo.list_by_credit(
+            credit_id, after, limit + 1, start_date, end_date, type_id
+        )
+        if not rows and not await self.credit_repo.has(credit_id):
+            raise NotFoundException(f"Credit {credit_id} not found")
+
+        items = [PaymentItem.model_validate(r) for r in rows[:limit]]
+        next_cursor = (
+            encode_cursor(items[-1].payment_date, items[-1].id)
+            if len(rows) > limit
+            else None
+        )
+        return PaymentHistoryResponse(items=items, next_cursor=next_cursor)
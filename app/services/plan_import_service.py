@@ -2,15 +2,17 @@ from __future__ import annotations
 
 from datetime import date, datetime
 from decimal import Decimal
-from typing import Dict, Iterable, List, Set, Tuple
-
-import pandas as pd
+from typing import TYPE_CHECKING, Dict, Iterable, List, Set, Tuple
 
 from ..exceptions import ValidationException
 from ..models.plan import Plan
-from ..repositories.dictionary_repository import DictionaryRepository
+from ..repositories.data_version_repository import DataVersionRepository
+from ..repositories.loader import RequestLoaders
 from ..repositories.plans_repository import PlansRepository
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 PLAN_MONTH_COL: str = "місяць плану"
 CATEGORY_NAME_COL: str = "назва категорії плану"
 SUM_COL: str = "сума"
@@ -24,9 +26,15 @@ PlanRow = Tuple[date, CategoryId, float, RowIndex]
 
 
 class PlansInsertService:
-    def __init__(self, repo: PlansRepository, dict_repo: DictionaryRepository) -> None:
+    def __init__(
+        self,
+        repo: PlansRepository,
+        loaders: RequestLoaders,
+        version_repo: DataVersionRepository,
+    ) -> None:
         self.repo = repo
-        self.dict_repo = dict_repo
+        self.loaders = loaders
+        self.version_repo = version_repo
 
     async def insert_from_excel(self, file_path: str) -> str:
         df = self._read_excel(file_path)
@@ -45,17 +53,17 @@ class PlansInsertService:
 
         entities = self._build_entities(rows)
         if entities:
-            await self.repo.update_many(entities)
+            async with self.repo.transaction():
+                await self.repo.update_many(entities)
+                await self.version_repo.record_changes(("plans",))
 
         return f"Inserted {len(rows)} plan row(s)"
 
     async def _build_category_map(self) -> Dict[NormalizedCategoryName, CategoryId]:
-        category_names = {
-            k: v for k, v in (await self.dict_repo.category_names()).items()
-        }
-        return {
-            str(name).strip().lower(): int(cid) for cid, name in category_names.items()
-        }
+        # Only the allowed categories are looked up, in one IN (...) query.
+        names = sorted(ALLOWED_CATEGORY_NAMES)
+        ids = await self.loaders.category_ids_by_name.load_many(names)
+        return {name: int(cid) for name, cid in zip(names, ids) if cid is not None}
 
     def _extract_rows(
         self,
@@ -101,6 +109,8 @@ class PlansInsertService:
 
     @staticmethod
     def _read_excel(file_path: str) -> pd.DataFrame:
+        import pandas as pd
+
         try:
             return pd.read_excel(file_path)
         except Exception as exc:
@@ -129,6 +139,8 @@ class PlansInsertService:
 
     @staticmethod
     def _parse_sum(value) -> float:
+        import pandas as pd
+
         if pd.isna(value):
             raise ValidationException("Column 'сума' contains empty value(s)")
         if isinstance(value, (int, float)):
@@ -144,6 +156,8 @@ class PlansInsertService:
 
     @staticmethod
     def _parse_period(value, row_num: int) -> date:
+        import pandas as pd
+
         try:
             if isinstance(value, (datetime, date)):
                 parsed = date(value.year, value.month, value.day)
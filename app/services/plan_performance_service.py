@@ -1,15 +1,24 @@
 from __future__ import annotations
 
 from calendar import monthrange
-from datetime import date
+from datetime import date, timedelta
 from decimal import Decimal
 
+from ..cache.calls import cached_method
+from ..exceptions import ValidationException
 from ..repositories.dictionary_repository import DictionaryRepository
 from ..repositories.performance_repository import PerformanceRepository
 from ..repositories.plans_repository import PlansRepository
-from ..schemas.plan import PlanPerformanceItem, PlansPerformanceResponse
+from ..schemas.plan import (
+    PlanPerformanceItem,
+    PlansPerformancePoint,
+    PlansPerformanceResponse,
+    PlansPerformanceSeriesResponse,
+)
 from . import COLLECTION_CATEGORY_ID, ISSUANCE_CATEGORY_ID
 
+MAX_SERIES_DAYS: int = 366
+
 
 class PlansService:
     def __init__(
@@ -22,6 +31,7 @@ class PlansService:
         self.dict_repo = dict_repo
         self.performance_repo = performance_repo
 
+    @cached_method
     async def get_plans_performance(self, as_of: date) -> PlansPerformanceResponse:
         year = as_of.year
         month = as_of.month
@@ -32,17 +42,75 @@ class PlansService:
         plans = await self.plans_repo.list_plans_for_month(year, month)
         names = await self.dict_repo.category_names()
 
-        items: list[PlanPerformanceItem] = []
-        issuances_actual_raw = await self.performance_repo.sum_issuances_until(
+        issuances_actual = await self.performance_repo.sum_issuances_until(
             start_date, end_date
         )
-        payments_actual_raw = await self.performance_repo.sum_payments_until(
+        payments_actual = await self.performance_repo.sum_payments_until(
             start_date, end_date
         )
 
-        issuances_actual = Decimal(str(issuances_actual_raw))
-        payments_actual = Decimal(str(payments_actual_raw))
+        items = self._build_items(plans, names, issuances_actual, payments_actual)
+        return PlansPerformanceResponse(items=items)
+
+    @cached_method
+    async def get_plans_performance_series(
+        self, start: date, end: date
+    ) -> PlansPerformanceSeriesResponse:
+        if end < start:
+            raise ValidationException("'end' must not be earlier than 'start'")
+        if (end - start).days >= MAX_SERIES_DAYS:
+            raise ValidationException(
+                f"Series range must not exceed {MAX_SERIES_DAYS} days"
+            )
+
+        range_start = date(start.year, start.month, 1)
+        issuances_daily = await self.performance_repo.daily_issuances(range_start, end)
+        payments_daily = await self.performance_repo.daily_payments(range_start, end)
+        issuances_prefix = self._prefix_sums(issuances_daily, range_start, end)
+        payments_prefix = self._prefix_sums(payments_daily, range_start, end)
+
+        names = await self.dict_repo.category_names()
+        plans_by_month: dict[tuple[int, int], list[tuple[int, date, float]]] = {}
+
+        points: list[PlansPerformancePoint] = []
+        day = start
+        while day <= end:
+            key = (day.year, day.month)
+            if key not in plans_by_month:
+                plans_by_month[key] = await self.plans_repo.list_plans_for_month(*key)
 
+            month_idx = (date(day.year, day.month, 1) - range_start).days
+            day_idx = (day - range_start).days + 1
+            issuances_actual = issuances_prefix[day_idx] - issuances_prefix[month_idx]
+            payments_actual = payments_prefix[day_idx] - payments_prefix[month_idx]
+
+            items = self._build_items(
+                plans_by_month[key], names, issuances_actual, payments_actual
+            )
+            points.append(PlansPerformancePoint(as_of=day, items=items))
+            day += timedelta(days=1)
+
+        return PlansPerformanceSeriesResponse(items=points)
+
+    @staticmethod
+    def _prefix_sums(
+        daily: dict[date, Decimal], start: date, end: date
+    ) -> list[Decimal]:
+        prefix = [Decimal("0")]
+        day = start
+        while day <= end:
+            prefix.append(prefix[-1] + daily.get(day, Decimal("0")))
+            day += timedelta(days=1)
+        return prefix
+
+    @staticmethod
+    def _build_items(
+        plans: list[tuple[int, date, float]],
+        names: dict[int, str],
+        issuances_actual: Decimal,
+        payments_actual: Decimal,
+    ) -> list[PlanPerformanceItem]:
+        items: list[PlanPerformanceItem] = []
         for category_id, period, plan_sum in plans:
             plan_sum_dec = Decimal(str(plan_sum))
             if category_id == ISSUANCE_CATEGORY_ID:
@@ -69,5 +137,4 @@ class PlansService:
                     plan_percent=pct,
                 )
             )
-
-        return PlansPerformanceResponse(items=items)
+        return items
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+from ..cache.calls import cached_method
+from ..repositories.credit_repository import CreditRepository
+from ..schemas.portfolio import AgingBucket, PortfolioAgingResponse
+
+AGING_BUCKETS: list[tuple[str, int, int | None]] = [
+    ("0", 0, 0),
+    ("1-30", 1, 30),
+    ("31-60", 31, 60),
+    ("61-90", 61, 90),
+    ("90+", 91, None),
+]
+
+
+class PortfolioAgingService:
+    def __init__(self, credit_repo: CreditRepository) -> None:
+        self.credit_repo = credit_repo
+
+    @cached_method
+    async def get_portfolio_aging(self, as_of: date) -> PortfolioAgingResponse:
+        upper_bounds = [hi for _label, _lo, hi in AGING_BUCKETS if hi is not None]
+        rows = await self.credit_repo.aging_buckets(as_of, upper_bounds)
+
+        items: list[AgingBucket] = []
+        for i, (label, lo, hi) in enumerate(AGING_BUCKETS):
+            count, body, principal, interest = rows.get(
+                i, (0, Decimal("0"), Decimal("0"), Decimal("0"))
+            )
+            items.append(
+                AgingBucket(
+                    bucket=label,
+                    min_overdue_days=lo,
+                    max_overdue_days=hi,
+                    credits_count=count,
+                    body_sum=body,
+                    outstanding_body=body - principal,
+                    principal_payments_sum=principal,
+                    interest_payments_sum=interest,
+                )
+            )
+        return PortfolioAgingResponse(as_of=as_of, items=items)
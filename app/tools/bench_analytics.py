@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from calendar import monthrange
+from datetime import date
+from typing import Awaitable, Callable
+
+from ..analytics.columnar import ColumnarStore
+from ..db.session import dispose_engine, ensure_initialized, get_session
+from ..models import credit, dictionary, payment, plan, user  # noqa: F401
+from ..repositories.performance_columnar_repository import PerformanceRepositoryColumnar
+from ..repositories.performance_repository import (
+    PerformanceRepository,
+    PerformanceRepositorySQLAlchemy,
+)
+
+
+async def _timed(fn: Callable[[], Awaitable[object]], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def _queries(
+    repo: PerformanceRepository, year: int
+) -> dict[str, Callable[[], Awaitable[object]]]:
+    start = date(year, 6, 1)
+    end = date(year, 6, monthrange(year, 6)[1])
+    return {
+        "issuances_aggregates": lambda: repo.issuances_aggregates(year),
+        "payments_aggregates": lambda: repo.payments_aggregates(year),
+        "sum_issuances_until": lambda: repo.sum_issuances_until(start, end),
+        "sum_payments_until": lambda: repo.sum_payments_until(start, end),
+        "daily_payments": lambda: repo.daily_payments(start, end),
+    }
+
+
+async def run(year: int, repeat: int) -> None:
+    await ensure_initialized()
+    store = ColumnarStore()
+    started = time.perf_counter()
+    await store.refresh()
+    load_ms = (time.perf_counter() - started) * 1000
+    print(f"columnar load: {load_ms:.1f} ms, {store.nbytes} byte(s)")
+    for name, table in (("credits", store.credits), ("payments", store.payments)):
+        print(f"  {name}: {len(table)} row(s), {table.bytes_per_row} byte(s)/row")
+
+    async for session in get_session():
+        sql_queries = _queries(PerformanceRepositorySQLAlchemy(session), year)
+        columnar_queries = _queries(PerformanceRepositoryColumnar(session, store), year)
+        print(f"{'query':<24}{'sql ms':>10}{'columnar ms':>14}")
+        for name in sql_queries:
+            sql_ms = await _timed(sql_queries[name], repeat)
+            columnar_ms = await _timed(columnar_queries[name], repeat)
+            print(f"{name:<24}{sql_ms:>10.3f}{columnar_ms:>14.3f}")
+        break
+    await dispose_engine()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare SQL and columnar PerformanceRepository latency"
+    )
+    parser.add_argument("--year", type=int, default=date.today().year)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.year, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import date
+from typing import Callable
+
+import msgpack
+import pandas as pd
+import pyarrow as pa
+from pydantic import BaseModel
+
+from ..api.deps import get_performance_service, get_user_credit_service
+from ..api.encoding import ARROW_STREAM, JSON, MSGPACK, encode_arrow, encode_msgpack
+from ..db.session import dispose_engine, ensure_initialized, get_session
+from ..models import credit, dictionary, payment, plan, user  # noqa: F401
+from ..schemas.performance import YearPerformanceItem
+
+
+def _timed(fn: Callable[[], object], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def _codecs(
+    payload: BaseModel, row_type: type[BaseModel] | None
+) -> dict[str, tuple[Callable[[], bytes], Callable[[bytes], pd.DataFrame]]]:
+    codecs = {
+        JSON: (
+            lambda: payload.model_dump_json().encode(),
+            lambda body: pd.DataFrame(json.loads(body)["items"]),
+        ),
+        MSGPACK: (
+            lambda: encode_msgpack(payload),
+            lambda body: pd.DataFrame(msgpack.unpackb(body)["items"]),
+        ),
+    }
+    if row_type is not None:
+        codecs[ARROW_STREAM] = (
+            lambda: encode_arrow(getattr(payload, "items"), row_type),
+            lambda body: pa.ipc.open_stream(body).read_all().to_pandas(),
+        )
+    return codecs
+
+
+def report(
+    name: str, payload: BaseModel, row_type: type[BaseModel] | None, repeat: int
+) -> None:
+    print(name)
+    print(f"  {'format':<38}{'bytes':>10}{'encode ms':>12}{'decode ms':>12}")
+    for media, (encode, decode) in _codecs(payload, row_type).items():
+        body = encode()
+        encode_ms = _timed(encode, repeat)
+        decode_ms = _timed(lambda: decode(body), repeat)
+        print(f"  {media:<38}{len(body):>10}{encode_ms:>12.3f}{decode_ms:>12.3f}")
+
+
+async def run(year: int, user_ids: list[int], repeat: int) -> None:
+    await ensure_initialized()
+    async for session in get_session():
+        performance = await get_performance_service(session)
+        report(
+            f"year_performance/{year}",
+            await performance.get_year_performance(year),
+            YearPerformanceItem,
+            repeat,
+        )
+        credits = await get_user_credit_service(session)
+        for user_id in user_ids:
+            report(
+                f"user_credits/{user_id}",
+                await credits.get_user_credits(user_id),
+                None,
+                repeat,
+            )
+        break
+    await dispose_engine()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare JSON, MessagePack and Arrow payload size and speed"
+    )
+    parser.add_argument("--year", type=int, default=date.today().year)
+    parser.add_argument("--user", type=int, action="append", default=[])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.year, args.user or [1], args.repeat))
+
+
+if __name__ == "__main__":
+    main()
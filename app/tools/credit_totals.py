@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+
+from ..db.session import dispose_engine, ensure_initialized, get_session
+from ..models import credit, dictionary, payment, plan, user  # noqa: F401
+from ..repositories.credit_repository import CreditRepositorySQLAlchemy
+from ..repositories.data_version_repository import DataVersionRepositorySQLAlchemy
+from ..services.credit_totals_service import CreditTotalsService
+
+
+async def run(command: str, limit: int) -> int:
+    await ensure_initialized()
+    try:
+        async for session in get_session():
+            service = CreditTotalsService(CreditRepositorySQLAlchemy(session))
+            if command == "rebuild":
+                updated = await service.rebuild()
+                version_repo = DataVersionRepositorySQLAlchemy(session)
+                async with version_repo.transaction():
+                    await version_repo.record_changes(("credits",))
+                print(f"rebuilt payment totals for {updated} credit(s)")
+            inconsistent = await service.find_inconsistent(limit)
+            break
+    finally:
+        await dispose_engine()
+
+    if inconsistent:
+        print(
+            f"{len(inconsistent)} credit(s) with stale payment totals"
+            f"{' (truncated)' if len(inconsistent) == limit else ''}: "
+            + ", ".join(str(i) for i in inconsistent)
+        )
+        return 1
+    print("payment totals are consistent")
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Check or rebuild the per-credit payment totals"
+    )
+    parser.add_argument("command", choices=("check", "rebuild"))
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(run(args.command, args.limit)))
+
+
+if __name__ == "__main__":
+    main()
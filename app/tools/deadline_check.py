@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from ..db.session import (
+    dispose_engine,
+    ensure_initialized,
+    get_engine,
+    get_lazy_session,
+    is_query_interrupted,
+    pool_metrics,
+    set_statement_deadline,
+)
+
+# Burns CPU without touching any table, so it runs long on any database.
+SLOW_QUERY: str = "SELECT BENCHMARK(1000000000, SHA2('datafactory', 256))"
+
+
+def _report(name: str, ok: bool, detail: str) -> bool:
+    print(f"{name}: {'ok' if ok else 'FAILED'} ({detail})")
+    return ok
+
+
+async def check_deadline(deadline_ms: int) -> bool:
+    # The statement must stop on its own at about the deadline.
+    set_statement_deadline(deadline_ms)
+    started = time.perf_counter()
+    try:
+        async with get_engine().connect() as conn:
+            await conn.exec_driver_sql(SLOW_QUERY)
+    except (Exception,) as exc:
+        elapsed = time.perf_counter() - started
+        return _report(
+            "deadline",
+            is_query_interrupted(exc) and elapsed < deadline_ms / 1000 + 2,
+            f"{exc.__class__.__name__} after {elapsed:.2f}s",
+        )
+    finally:
+        set_statement_deadline(0)
+    return _report("deadline", False, "query finished despite the deadline")
+
+
+async def check_kill(kill_after: float) -> bool:
+    # A query killed from a side connection fails fast, and its connection
+    # stays usable and is returned to the pool.
+    ok = True
+    async for session in get_lazy_session():
+        query = asyncio.create_task(session.execute(text(SLOW_QUERY)))
+        await asyncio.sleep(kill_after)
+        started = time.perf_counter()
+        killed = await session.kill_query()
+        try:
+            await query
+            ok = _report("kill", False, "query finished despite KILL QUERY")
+        except (Exception,) as exc:
+            elapsed = time.perf_counter() - started
+            ok = _report(
+                "kill",
+                killed and is_query_interrupted(exc) and elapsed < 2,
+                f"{exc.__class__.__name__} {elapsed:.2f}s after the kill",
+            )
+        await session.rollback()
+        value = await session.scalar(text("SELECT 1"))
+        ok = _report("reuse", value == 1, f"SELECT 1 returned {value}") and ok
+    ok = (
+        _report(
+            "pool",
+            pool_metrics.checked_out == 0,
+            f"{pool_metrics.checked_out} connections checked out",
+        )
+        and ok
+    )
+    return ok
+
+
+async def run(deadline_ms: int, kill_after: float) -> int:
+    await ensure_initialized()
+    try:
+        engine = get_engine()
+        if engine.dialect.name != "mysql":
+            print(f"query deadlines need MySQL, not {engine.dialect.name}")
+            return 2
+        results = [await check_deadline(deadline_ms), await check_kill(kill_after)]
+        return 0 if all(results) else 1
+    finally:
+        await dispose_engine()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Check statement deadlines and KILL QUERY against a live MySQL"
+    )
+    parser.add_argument("--deadline-ms", type=int, default=300)
+    parser.add_argument("--kill-after", type=float, default=0.5)
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(run(args.deadline_ms, args.kill_after)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+
+FORBIDDEN_MODULES: tuple[str, ...] = (
+    "pandas",
+    "openpyxl",
+    "numpy",
+    "msgpack",
+    "pyarrow",
+)
+BUDGET_MS: float = float(os.getenv("IMPORT_BUDGET_MS", "1500"))
+
+
+def measure(module: str) -> tuple[int, set[str]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative_us = 0
+    imported: set[str] = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _self, cumulative, name = line.split(":", 1)[1].split("|")
+        name = name.strip()
+        imported.add(name)
+        if name == module:
+            cumulative_us = int(cumulative)
+    return cumulative_us, imported
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Fail when the cold import of the app exceeds its time budget"
+    )
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    samples = [measure(args.module) for _ in range(args.runs)]
+    best_ms = min(us for us, _ in samples) / 1000
+    imported = set().union(*(names for _, names in samples))
+    leaked = sorted(
+        name
+        for name in imported
+        if name.split(".")[0] in FORBIDDEN_MODULES and "." not in name
+    )
+
+    print(f"{args.module}: {best_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    failures: list[str] = []
+    if best_ms > args.budget_ms:
+        failures.append(f"cold import took {best_ms:.1f} ms")
+    if leaked:
+        failures.append(f"eagerly imported: {', '.join(leaked)}")
+    if failures:
+        print("FAILED: " + "; ".join(failures))
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
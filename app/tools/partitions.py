@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+from datetime import date
+
+from ..core.config import settings
+from ..db.partitioning import (
+    PARTITIONED_TABLES,
+    ensure_all_partitioned,
+    explain_partitions,
+    partition_name,
+    partition_years,
+)
+from ..db.session import dispose_engine, ensure_initialized, get_engine
+from ..models import credit, dictionary, payment, plan, user  # noqa: F401
+from ..repositories.performance_repository import (
+    issuances_aggregates_stmt,
+    payments_aggregates_stmt,
+)
+
+
+async def run(command: str, year: int, years_ahead: int, first_year: int) -> int:
+    await ensure_initialized()
+    try:
+        engine = get_engine()
+        if engine.dialect.name != "mysql":
+            print(f"partitioning is only supported on MySQL, not {engine.dialect.name}")
+            return 2
+
+        async with engine.begin() as conn:
+            if command == "apply":
+                for statement in await ensure_all_partitioned(
+                    conn, years_ahead, first_year or None
+                ):
+                    print(statement)
+
+            if command in ("apply", "status"):
+                for table in PARTITIONED_TABLES:
+                    years = await partition_years(conn, table)
+                    span = f"{years[0]}..{years[-1]}" if years else "not partitioned"
+                    print(f"{table}: {span}")
+                return 0
+
+            # explain: every yearly aggregate must touch exactly one partition.
+            failed = False
+            for stmt in (
+                issuances_aggregates_stmt(year),
+                payments_aggregates_stmt(year),
+            ):
+                for table, partitions in (await explain_partitions(conn, stmt)).items():
+                    ok = partitions == [partition_name(year)]
+                    failed = failed or not ok
+                    print(
+                        f"{table} {year}: {','.join(partitions) or '-'} "
+                        f"{'ok' if ok else 'NOT PRUNED'}"
+                    )
+            return 1 if failed else 0
+    finally:
+        await dispose_engine()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Manage yearly RANGE partitions of credits and payments"
+    )
+    parser.add_argument("command", choices=("status", "apply", "explain"))
+    parser.add_argument("--year", type=int, default=date.today().year)
+    parser.add_argument(
+        "--years-ahead", type=int, default=settings.partition_years_ahead
+    )
+    parser.add_argument("--first-year", type=int, default=settings.partition_first_year)
+    args = parser.parse_args()
+    raise SystemExit(
+        asyncio.run(run(args.command, args.year, args.years_ahead, args.first_year))
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import argparse
+import json
+import pstats
+from pathlib import Path
+
+from ..api.profiling import META_SUFFIX, PROFILE_SUFFIX
+from ..core.config import settings
+
+
+def list_profiles(directory: Path) -> None:
+    print(f"{'id':<28}{'status':>7}{'ms':>10}{'queries':>9}  route")
+    for meta_path in sorted(
+        directory.glob("*" + META_SUFFIX), key=lambda p: p.stat().st_mtime
+    ):
+        meta = json.loads(meta_path.read_text())
+        print(
+            f"{meta['id']:<28}{meta['status']:>7}{meta['duration_ms']:>10.1f}"
+            f"{meta['query_count']:>9}  {meta['method']} {meta['path']}"
+            + (f"?{meta['query_string']}" if meta["query_string"] else "")
+        )
+
+
+def show_profile(directory: Path, profile_id: str, sort: str, limit: int) -> None:
+    print((directory / (profile_id + META_SUFFIX)).read_text())
+    stats = pstats.Stats(str(directory / (profile_id + PROFILE_SUFFIX)))
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect stored request profiles")
+    parser.add_argument("profile_id", nargs="?")
+    parser.add_argument("--dir", default=settings.profile_dir)
+    parser.add_argument("--sort", default="cumulative")
+    parser.add_argument("--limit", type=int, default=40)
+    args = parser.parse_args()
+    directory = Path(args.dir)
+    if args.profile_id:
+        show_profile(directory, args.profile_id, args.sort, args.limit)
+    else:
+        list_profiles(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from ..analytics.columnar import ColumnarStore
+from ..analytics.daily_index import DailyTotalsIndex
+from ..analytics.snapshot import (
+    current_data_version,
+    export_snapshot,
+    load_snapshot,
+    load_snapshot_if_current,
+)
+from ..core.config import settings
+from ..db.session import dispose_engine, ensure_initialized
+from ..models import credit, dictionary, payment, plan, user  # noqa: F401
+
+
+async def _load_from_db() -> tuple[ColumnarStore, DailyTotalsIndex]:
+    store = ColumnarStore()
+    index = DailyTotalsIndex()
+    await store.refresh()
+    await index.refresh()
+    return store, index
+
+
+async def export(path: Path) -> None:
+    version = await current_data_version()
+    store, index = await _load_from_db()
+    manifest = export_snapshot(path, store, index, version)
+    print(f"snapshot {manifest['stamp']} written to {path}")
+    for name, table in manifest["tables"].items():
+        print(f"  {name}: {table['rows']} row(s)")
+
+
+async def import_(path: Path) -> None:
+    snapshot = await load_snapshot_if_current(path)
+    if snapshot is None:
+        raise SystemExit(f"snapshot at {path} is missing or ahead of the database")
+    credits_before = len(snapshot.store.credits)
+    payments_before = len(snapshot.store.payments)
+    await snapshot.store.refresh()
+    await snapshot.index.refresh()
+    print(json.dumps(snapshot.manifest["data_version"]))
+    print(
+        f"mapped {credits_before} credit(s), {payments_before} payment(s); "
+        f"caught up {len(snapshot.store.credits) - credits_before} credit(s), "
+        f"{len(snapshot.store.payments) - payments_before} payment(s) from the database"
+    )
+
+
+async def bench(path: Path) -> None:
+    started = time.perf_counter()
+    await _load_from_db()
+    db_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    snapshot = load_snapshot(path)
+    map_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    await snapshot.store.refresh()
+    await snapshot.index.refresh()
+    catch_up_ms = (time.perf_counter() - started) * 1000
+
+    print(f"cold load from database: {db_ms:.1f} ms")
+    print(f"snapshot map:            {map_ms:.1f} ms")
+    print(f"snapshot catch-up:       {catch_up_ms:.1f} ms")
+
+
+async def run(command: str, path: Path) -> None:
+    await ensure_initialized()
+    try:
+        if command == "export":
+            await export(path)
+        elif command == "import":
+            await import_(path)
+        else:
+            await bench(path)
+    finally:
+        await dispose_engine()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Export, verify and benchmark memory-mapped analytics snapshots"
+    )
+    parser.add_argument("command", choices=("export", "import", "bench"))
+    parser.add_argument("--dir", default=settings.snapshot_dir or "snapshot")
+    args = parser.parse_args()
+    asyncio.run(run(args.command, Path(args.dir)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+import shutil
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.cache import version
+from app.core.config import settings
+from app.db.base import Base
+from app.db.session import dispose_engine, get_engine, get_session
+from app.models import (  # noqa: F401
+    credit,
+    data_change,
+    dictionary,
+    payment,
+    plan,
+    seed_state,
+    user,
+)
+from app.seed.loader import _load_incremental
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+def _use_sqlite(monkeypatch: pytest.MonkeyPatch, path: Path) -> None:
+    monkeypatch.setattr(settings, "repository_backend", "sqlite")
+    monkeypatch.setattr(settings, "sqlite_path", str(path))
+
+
+async def _create_schema(seed: bool) -> None:
+    async for session in get_session():
+        async with get_engine().begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        if seed:
+            await _load_incremental(session)
+    await dispose_engine()
+
+
+@pytest.fixture(scope="session")
+def seeded_db(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    # Seeding takes a while, so it runs once; tests get a copy of the file.
+    path = tmp_path_factory.mktemp("seed") / "datafactory.sqlite3"
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        _use_sqlite(monkeypatch, path)
+        asyncio.run(_create_schema(seed=True))
+    return path
+
+
+@pytest.fixture
+def database(
+    seeded_db: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Iterator[Path]:
+    path = tmp_path / "datafactory.sqlite3"
+    shutil.copy(seeded_db, path)
+    _use_sqlite(monkeypatch, path)
+    yield path
+    asyncio.run(dispose_engine())
+
+
+@pytest.fixture
+def empty_database(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    path = tmp_path / "datafactory.sqlite3"
+    _use_sqlite(monkeypatch, path)
+    asyncio.run(_create_schema(seed=False))
+    yield path
+    asyncio.run(dispose_engine())
+
+
+@pytest.fixture
+def client(database: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[TestClient]:
+    from app.main import app
+
+    monkeypatch.setattr(settings, "prewarm_statements", False)
+    monkeypatch.setattr(version, "_tracker", version.DataVersionTracker())
+    with TestClient(app, headers={"X-API-Key": settings.api_key}) as client:
+        yield client
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.api import admission
+from app.api.admission import REPORTS
+from app.core.config import settings
+from app.main import app
+
+
+async def _stream(path: str, query: bytes, on_body) -> int:
+    disconnected = asyncio.Event()
+    status = 0
+
+    async def receive():
+        if not getattr(receive, "sent", False):
+            receive.sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            on_body(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query,
+        "headers": [(b"x-api-key", settings.api_key.encode())],
+        "client": ("test", 1),
+        "server": ("test", 80),
+    }
+    await app(scope, receive, send)
+    return status
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "path, query",
+    [
+        ("/api/export/credits", b"format=csv"),
+        ("/api/export/year_performance/2021", b"format=csv"),
+        ("/api/changes/payments", b"after=0&limit=50"),
+    ],
+)
+async def test_reports_slot_is_held_until_the_stream_ends(
+    database, monkeypatch, path, query
+):
+    monkeypatch.setattr(settings, "watermark_settle_seconds", 0)
+    monkeypatch.setattr(admission, "_controller", None)
+    controller = admission.get_admission_controller()
+    running_while_streaming = []
+
+    def on_body(message):
+        if message.get("more_body"):
+            running_while_streaming.append(controller.classes[REPORTS].running)
+
+    assert await _stream(path, query, on_body) == 200
+    assert running_while_streaming and set(running_while_streaming) == {1}
+    assert controller.classes[REPORTS].running == 0
+    assert controller.in_use == 0
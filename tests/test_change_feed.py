@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import func, insert, select
+
+from app.core.config import settings
+from app.db.session import get_session
+from app.models.payment import Payment
+from app.services import change_feed_service
+from app.services.change_feed_service import FeedHorizon
+
+
+def test_horizon_serves_ids_only_once_they_are_old_enough():
+    horizon = FeedHorizon(lag=10)
+    horizon.observe(100, now=0)
+    assert horizon.safe_id(now=5) == 0
+    horizon.observe(120, now=5)
+    assert horizon.safe_id(now=10) == 100
+    assert horizon.safe_id(now=15) == 120
+    horizon.observe(120, now=20)
+    assert horizon.safe_id(now=21) == 120
+
+
+async def _max_payment_id() -> int:
+    async for session in get_session():
+        top = await session.scalar(select(func.max(Payment.id)))
+    return top
+
+
+async def _insert_payment(payment_id: int) -> None:
+    async for session in get_session():
+        await session.execute(
+            insert(Payment.__table__).values(
+                id=payment_id,
+                credit_id=1,
+                type_id=1,
+                sum=Decimal("1"),
+                payment_date=date(2021, 3, 1),
+            )
+        )
+        await session.commit()
+
+
+def test_feed_does_not_skip_a_lower_id_committed_late(client, monkeypatch):
+    monkeypatch.setattr(settings, "watermark_settle_seconds", 0.5)
+    monkeypatch.setattr(change_feed_service, "_horizons", {})
+    top = asyncio.run(_max_payment_id())
+
+    asyncio.run(_insert_payment(top + 2))
+    first = client.get(f"/api/changes/payments?after={top}")
+    assert first.headers["X-Next-Watermark"] == str(top)
+    assert first.content == b""
+
+    asyncio.run(_insert_payment(top + 1))
+    time.sleep(0.6)
+    second = client.get(f"/api/changes/payments?after={top}")
+    assert second.headers["X-Next-Watermark"] == str(top + 2)
+    ids = [json.loads(line)["id"] for line in second.text.splitlines()]
+    assert ids == [top + 1, top + 2]
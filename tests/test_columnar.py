@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+import pytest
+from sqlalchemy import insert
+
+from app.analytics.columnar import PAYMENT_SCHEMA, ColumnarStore, ColumnTable
+from app.analytics.units import from_minor, to_minor
+from app.core.config import settings
+from app.db.session import get_session
+from app.models.credit import Credit
+from app.repositories.performance_repository import PerformanceRepositorySQLAlchemy
+
+
+def test_from_minor_keeps_the_column_scale():
+    assert str(from_minor(to_minor("1234.5"))) == "1234.5000"
+    assert str(from_minor(0)) == "0.0000"
+    assert str(from_minor(-15)) == "-0.0015"
+
+
+def test_appended_chunks_are_joined_once_on_flush(monkeypatch):
+    table = ColumnTable(PAYMENT_SCHEMA)
+    chunks = [
+        [(i, 1, 100, 1, i * 10) for i in range(start, start + 3)] for start in (1, 4, 7)
+    ]
+    for chunk in chunks:
+        table.append(chunk)
+    # Staged rows show up only once the load flushes them.
+    assert len(table) == 0
+
+    concatenations = []
+    concatenate = np.concatenate
+
+    def counting_concatenate(arrays, *args, **kwargs):
+        concatenations.append(len(arrays))
+        return concatenate(arrays, *args, **kwargs)
+
+    monkeypatch.setattr(np, "concatenate", counting_concatenate)
+    table.flush()
+    table.flush()
+    assert concatenations == [4] * len(PAYMENT_SCHEMA)
+    assert table.delta["id"].tolist() == list(range(1, 10))
+    assert table.delta["sum"].tolist() == [i * 10 for i in range(1, 10)]
+    assert table.delta["type_id"].dtype == np.int8
+
+
+async def _insert_credit(credit_id: int, day: date, body: Decimal) -> None:
+    async for session in get_session():
+        await session.execute(
+            insert(Credit.__table__),
+            [
+                {
+                    "id": credit_id,
+                    "user_id": 1,
+                    "issuance_date": day,
+                    "return_date": day,
+                    "body": body,
+                    "percent": Decimal("0"),
+                }
+            ],
+        )
+        await session.commit()
+
+
+@pytest.mark.anyio
+async def test_store_matches_sql_after_out_of_order_commits(database):
+    store = ColumnarStore()
+    await store.refresh()
+    top = store.credits_watermark.top
+    day = date(2021, 3, 1)
+
+    await _insert_credit(top + 2, day, Decimal("100"))
+    await store.refresh()
+    await _insert_credit(top + 1, day, Decimal("50.5"))
+    await store.refresh()
+    assert store.credits_watermark.value == top + 2
+
+    async for session in get_session():
+        sql = PerformanceRepositorySQLAlchemy(session)
+        assert store.issuances_aggregates(2021) == await sql.issuances_aggregates(2021)
+        assert store.payments_aggregates(2021) == await sql.payments_aggregates(2021)
+
+
+@pytest.mark.anyio
+async def test_concurrent_stale_readers_share_one_refresh(database, monkeypatch):
+    monkeypatch.setattr(settings, "columnar_refresh_seconds", 60)
+    loads = []
+    load_credits = ColumnarStore._load_credits
+
+    async def counting_load(self, session):
+        loads.append(session)
+        await load_credits(self, session)
+
+    monkeypatch.setattr(ColumnarStore, "_load_credits", counting_load)
+    store = ColumnarStore()
+    await asyncio.gather(*(store.refresh_if_stale() for _ in range(5)))
+    assert len(loads) == 1
+    assert not store.is_stale()
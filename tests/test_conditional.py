@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+from sqlalchemy import update
+
+from app.cache import version
+from app.core.config import settings
+from app.db.session import get_session
+from app.models.data_change import DataChange
+from app.repositories.data_version_repository import DataVersionRepositorySQLAlchemy
+
+
+async def _record_changes(*tables: str) -> None:
+    async for session in get_session():
+        repo = DataVersionRepositorySQLAlchemy(session)
+        async with repo.transaction():
+            await repo.record_changes(tables)
+
+
+def test_etag_moves_with_the_change_counter(client, monkeypatch):
+    monkeypatch.setattr(settings, "data_version_max_age_seconds", 0)
+    first = client.get("/api/year_performance/2021")
+    assert first.status_code == 200
+    assert "max-age=600" in first.headers["Cache-Control"]
+    etag = first.headers["ETag"]
+
+    assert (
+        client.get("/api/year_performance/2021", headers={"If-None-Match": etag})
+    ).status_code == 304
+
+    # An update moves no max id, only the counter.
+    asyncio.run(_record_changes("payments"))
+    second = client.get("/api/year_performance/2021", headers={"If-None-Match": etag})
+    assert second.status_code == 200
+    assert second.headers["ETag"] != etag
+
+
+async def _backdate_change(table: str, when: datetime) -> None:
+    async for session in get_session():
+        await session.execute(
+            update(DataChange)
+            .where(DataChange.table_name == table)
+            .values(changed_at=when)
+        )
+        await session.commit()
+
+
+def _last_modified(response) -> datetime:
+    return parsedate_to_datetime(response.headers["Last-Modified"]).replace(tzinfo=None)
+
+
+def test_last_modified_is_the_recorded_write_time(client, monkeypatch):
+    monkeypatch.setattr(settings, "data_version_max_age_seconds", 0)
+    url = "/api/year_performance/2021"
+    asyncio.run(_record_changes("payments"))
+    asyncio.run(_backdate_change("payments", datetime(2024, 5, 6, 7, 8, 9)))
+    asyncio.run(_record_changes("credits"))
+    asyncio.run(_backdate_change("credits", datetime(2024, 3, 1, 0, 0, 0)))
+    asyncio.run(_backdate_change("plans", datetime(2024, 1, 1, 0, 0, 0)))
+
+    # Seen for the first time, as after a restart: still the write time.
+    monkeypatch.setattr(version, "_tracker", version.DataVersionTracker())
+    first = client.get(url)
+    assert _last_modified(first) == datetime(2024, 5, 6, 7, 8, 9)
+    assert (
+        client.get(url, headers={"If-Modified-Since": first.headers["Last-Modified"]})
+    ).status_code == 304
+
+    asyncio.run(_record_changes("credits"))
+    asyncio.run(_backdate_change("credits", datetime(2024, 6, 1, 12, 0, 0)))
+    assert _last_modified(client.get(url)) == datetime(2024, 6, 1, 12, 0, 0)
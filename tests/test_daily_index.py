@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, insert, select
+
+from app.analytics.daily_index import DailyTotalsIndex
+from app.analytics.watermark import IdWatermark
+from app.core.config import settings
+from app.db.session import get_session
+from app.models.payment import Payment
+
+
+def test_watermark_keeps_gaps_until_filled_or_settled():
+    mark = IdWatermark(settle_seconds=10)
+    mark.advance([1, 2, 3], now=0)
+    assert (mark.value, mark.gap_ranges()) == (3, [])
+
+    mark.advance([5, 8], now=1)
+    assert (mark.value, mark.gap_ranges()) == (3, [(4, 4), (6, 7)])
+    assert mark.is_unseen(6) and mark.is_unseen(9) and not mark.is_unseen(5)
+
+    mark.advance([4, 6], now=2)
+    assert (mark.value, mark.gap_ranges()) == (6, [(7, 7)])
+
+    mark.advance([], now=11)
+    assert (mark.value, mark.gap_ranges()) == (8, [])
+
+
+async def _insert_payment(payment_id: int, day: date, amount: Decimal) -> None:
+    async for session in get_session():
+        await session.execute(
+            insert(Payment.__table__),
+            [
+                {
+                    "id": payment_id,
+                    "credit_id": 1,
+                    "type_id": 1,
+                    "sum": amount,
+                    "payment_date": day,
+                }
+            ],
+        )
+        await session.commit()
+
+
+async def _sql_payments(start: date, end: date) -> Decimal:
+    stmt = select(func.sum(Payment.sum)).where(Payment.payment_date.between(start, end))
+    async for session in get_session():
+        total = await session.scalar(stmt)
+    return Decimal(str(total))
+
+
+@pytest.mark.anyio
+async def test_refresh_counts_rows_committed_below_the_watermark(database):
+    index = DailyTotalsIndex()
+    await index.refresh()
+    top = index.payments_watermark.top
+    day = date(2021, 3, 1)
+    before = index.sum_payments(day, day)
+
+    # top + 2 commits first; top + 1 was allocated earlier but commits later.
+    await _insert_payment(top + 2, day, Decimal("10"))
+    await index.refresh()
+    assert index.payments_watermark.gap_ranges() == [(top + 1, top + 1)]
+
+    await _insert_payment(top + 1, day, Decimal("5"))
+    await index.refresh()
+    assert index.payments_watermark.value == top + 2
+    assert index.sum_payments(day, day) == before + Decimal("15")
+
+    everything = (date(2000, 1, 1), date(2100, 1, 1))
+    assert index.sum_payments(*everything) == await _sql_payments(*everything)
+
+
+@pytest.mark.anyio
+async def test_concurrent_stale_readers_share_one_refresh(database, monkeypatch):
+    monkeypatch.setattr(settings, "daily_index_refresh_seconds", 60)
+    loads = []
+    load = DailyTotalsIndex._load
+
+    async def counting_load(session, series, *args):
+        loads.append(series)
+        await load(session, series, *args)
+
+    monkeypatch.setattr(DailyTotalsIndex, "_load", staticmethod(counting_load))
+    index = DailyTotalsIndex()
+    await asyncio.gather(*(index.refresh_if_stale() for _ in range(5)))
+    assert loads == [index.issuances, index.payments]
+    assert not index.is_stale()
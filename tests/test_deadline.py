@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import NullPool
+
+from app.api import deadline
+from app.api.deadline import parse_statement_deadlines
+from app.core.config import settings
+from app.db import session as db_session
+from app.db.base import Base
+from app.db.session import (
+    LazySession,
+    _apply_statement_deadline,
+    get_engine,
+    get_lazy_session,
+    is_query_interrupted,
+    set_statement_deadline,
+)
+from app.exceptions.query_timeout import QueryTimeoutException
+from app.main import app
+from app.models import (  # noqa: F401
+    credit,
+    data_change,
+    dictionary,
+    payment,
+    plan,
+    seed_state,
+    user,
+)
+from app.repositories.credit_repository import CreditRepositorySQLAlchemy
+from app.repositories.performance_repository import PerformanceRepositorySQLAlchemy
+from app.tools.deadline_check import SLOW_QUERY
+
+
+def test_parse_statement_deadlines():
+    assert parse_statement_deadlines("") == {}
+    assert parse_statement_deadlines(" user_credits:2000, portfolio_aging:15000,") == {
+        "user_credits": 2000,
+        "portfolio_aging": 15000,
+    }
+    with pytest.raises(ValueError):
+        parse_statement_deadlines("user_credits")
+
+
+@pytest.mark.parametrize(
+    "ms, statement, expected",
+    [
+        (
+            500,
+            "SELECT id FROM credits",
+            "SELECT /*+ MAX_EXECUTION_TIME(500) */ id FROM credits",
+        ),
+        (0, "SELECT id FROM credits", "SELECT id FROM credits"),
+        (500, "UPDATE credits SET body = 1", "UPDATE credits SET body = 1"),
+    ],
+)
+def test_deadline_becomes_a_select_hint(ms, statement, expected):
+    set_statement_deadline(ms)
+    try:
+        assert _apply_statement_deadline(None, None, statement, (), None, False) == (
+            expected,
+            (),
+        )
+    finally:
+        set_statement_deadline(0)
+
+
+@pytest.mark.anyio
+async def test_deadline_hint_is_installed_for_mysql_only(monkeypatch):
+    monkeypatch.setattr(settings, "repository_backend", "mysql")
+    await db_session.dispose_engine()
+    try:
+        await db_session.init_engine()
+        assert event.contains(
+            get_engine().sync_engine,
+            "before_cursor_execute",
+            _apply_statement_deadline,
+        )
+    finally:
+        await db_session.dispose_engine()
+
+
+def test_is_query_interrupted():
+    def error(code: int) -> OperationalError:
+        return OperationalError("SELECT 1", (), Exception(code, "stopped"))
+
+    assert is_query_interrupted(error(3024))
+    assert is_query_interrupted(error(1317))
+    assert not is_query_interrupted(error(1064))
+    assert not is_query_interrupted(RuntimeError(3024))
+
+
+def test_interrupted_query_maps_to_504(client):
+    # Raised from the driver call itself, so SQLAlchemy wraps it the way it
+    # wraps MySQL's error 3024.
+    engine = get_engine().sync_engine
+    driver_error = engine.dialect.loaded_dbapi.OperationalError
+
+    def interrupt(_cursor, statement, _parameters, _context):
+        if "FROM credits" in statement:
+            raise driver_error(3024, "maximum execution time exceeded")
+
+    event.listen(engine, "do_execute", interrupt)
+    try:
+        response = client.get("/api/user_credits/1")
+    finally:
+        event.remove(engine, "do_execute", interrupt)
+    assert response.status_code == 504
+    assert response.json()["code"] == "query_timeout"
+
+
+@pytest.mark.anyio
+async def test_kill_query_connects_outside_the_pool(monkeypatch):
+    monkeypatch.setattr(settings, "repository_backend", "mysql")
+    await db_session.dispose_engine()
+    try:
+        await db_session.init_engine()
+        side = db_session._get_kill_engine()
+        assert isinstance(side.pool, NullPool)
+        assert side is not get_engine()
+        assert db_session._get_kill_engine() is side
+    finally:
+        await db_session.dispose_engine()
+    assert db_session._kill_engine is None
+
+
+# Only runs when asked to: it needs the DB_* MySQL database and creates the
+# schema in it.
+mysql_only = pytest.mark.skipif(
+    os.getenv("MYSQL_TESTS") != "1",
+    reason="set MYSQL_TESTS=1 to run against the DB_* MySQL database",
+)
+
+
+async def _get(path: str, disconnected: asyncio.Event) -> list[dict]:
+    # A bodiless GET whose client goes away once `disconnected` is set.
+    messages: list[dict] = []
+
+    async def receive():
+        if not getattr(receive, "sent", False):
+            receive.sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"x-api-key", settings.api_key.encode())],
+        "client": ("test", 1),
+        "server": ("test", 80),
+    }
+    await app(scope, receive, send)
+    return messages
+
+
+@pytest.mark.anyio
+async def test_disconnect_during_a_cached_report_kills_its_query(database, monkeypatch):
+    running, disconnected = asyncio.Event(), asyncio.Event()
+    shared, killed = [], []
+
+    async def slow_aggregates(self, year):
+        await self.db.scalar(text("SELECT 1"))
+        shared.append(self.db)
+        running.set()
+        await asyncio.Event().wait()
+
+    async def kill_query(self):
+        killed.append(self)
+        return True
+
+    monkeypatch.setattr(
+        PerformanceRepositorySQLAlchemy, "issuances_aggregates", slow_aggregates
+    )
+    monkeypatch.setattr(LazySession, "kill_query", kill_query)
+
+    request = asyncio.create_task(_get("/api/year_performance/2021", disconnected))
+    await asyncio.wait_for(running.wait(), 10)
+    disconnected.set()
+    messages = await asyncio.wait_for(request, 10)
+
+    # The report ran on a session of its own, which was killed once the only
+    # waiter left.
+    assert shared and shared[0] in killed
+    assert messages[0]["status"] == 504
+
+
+@pytest.fixture
+async def mysql_database(monkeypatch):
+    monkeypatch.setattr(settings, "repository_backend", "mysql")
+    await db_session.dispose_engine()
+    await db_session.ensure_initialized()
+    async with get_engine().begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield get_engine()
+    set_statement_deadline(0)
+    await db_session.dispose_engine()
+
+
+async def _running_slow_queries(engine) -> int:
+    async with engine.connect() as conn:
+        return await conn.scalar(
+            text(
+                "SELECT COUNT(*) FROM information_schema.PROCESSLIST "
+                "WHERE INFO LIKE 'SELECT%BENCHMARK(%'"
+            )
+        )
+
+
+@mysql_only
+@pytest.mark.anyio
+async def test_deadline_stops_a_slow_query_on_mysql(mysql_database):
+    set_statement_deadline(300)
+    started = time.perf_counter()
+    async for session in get_lazy_session():
+        with pytest.raises(QueryTimeoutException):
+            await CreditRepositorySQLAlchemy(session)._execute(text(SLOW_QUERY))
+    assert time.perf_counter() - started < 3
+    assert await _running_slow_queries(mysql_database) == 0
+
+
+@mysql_only
+@pytest.mark.anyio
+async def test_disconnect_kills_a_slow_report_on_mysql(mysql_database, monkeypatch):
+    running, disconnected = asyncio.Event(), asyncio.Event()
+
+    async def slow_aggregates(self, year):
+        running.set()
+        await self._execute(text(SLOW_QUERY))
+
+    monkeypatch.setattr(
+        PerformanceRepositorySQLAlchemy, "issuances_aggregates", slow_aggregates
+    )
+    # No deadline: only the disconnect may stop it.
+    monkeypatch.setattr(deadline, "_deadlines", {})
+    monkeypatch.setattr(settings, "statement_deadline_default_ms", 0)
+
+    request = asyncio.create_task(_get("/api/year_performance/2021", disconnected))
+    await asyncio.wait_for(running.wait(), 10)
+    await asyncio.sleep(0.5)
+    assert await _running_slow_queries(mysql_database) == 1
+    started = time.perf_counter()
+    disconnected.set()
+    messages = await asyncio.wait_for(request, 10)
+    assert time.perf_counter() - started < 3
+    assert messages[0]["status"] == 504
+    assert await _running_slow_queries(mysql_database) == 0
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+import msgpack
+import pyarrow as pa
+import pytest
+
+from app.api.encoding import ARROW_STREAM, JSON, MSGPACK, negotiate
+
+OFFERED = (JSON, MSGPACK, ARROW_STREAM)
+
+
+@pytest.mark.parametrize(
+    "accept, expected",
+    [
+        (None, JSON),
+        ("", JSON),
+        ("application/msgpack", MSGPACK),
+        ("application/x-msgpack", MSGPACK),
+        ("application/json;q=0.5, application/vnd.apache.arrow.stream", ARROW_STREAM),
+        ("application/msgpack, application/json", MSGPACK),
+        ("application/msgpack;q=0, */*", JSON),
+        ("*/*", JSON),
+        # Nothing offered matches: the default, not a 406.
+        ("text/html,application/xhtml+xml;q=0.9", JSON),
+        ("application/xml", JSON),
+        ("application/msgpack;q=0", JSON),
+    ],
+)
+def test_negotiate(accept, expected):
+    assert negotiate(accept, OFFERED) == expected
+
+
+def test_browser_accept_header_gets_json(client):
+    response = client.get(
+        "/api/year_performance/2021",
+        headers={"Accept": "text/html,application/xhtml+xml,*/*;q=0.8"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == JSON
+
+    response = client.get("/api/user_credits/1", headers={"Accept": "text/html"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == JSON
+
+
+@pytest.mark.parametrize("path", ["/api/user_credits/1", "/api/year_performance/2021"])
+def test_msgpack_round_trips_the_json_body(client, path):
+    expected = client.get(path).json()
+    response = client.get(path, headers={"Accept": MSGPACK})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == MSGPACK
+    assert "Accept" in response.headers["vary"]
+    assert msgpack.unpackb(response.content, raw=False) == expected
+
+
+def test_arrow_round_trips_the_json_rows(client):
+    expected = client.get("/api/year_performance/2021").json()["items"]
+    response = client.get(
+        "/api/year_performance/2021", headers={"Accept": ARROW_STREAM}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == ARROW_STREAM
+
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.schema.field("issuances_sum").type == pa.decimal128(38, 4)
+    rows = table.to_pylist()
+    assert len(rows) == len(expected) == 12
+    for row, item in zip(rows, expected):
+        assert row.keys() == item.keys()
+        for name, value in row.items():
+            if isinstance(value, Decimal):
+                assert value == Decimal(str(item[name])), name
+            else:
+                assert value == item[name], name
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import csv
+import io
+
+import pytest
+from openpyxl import load_workbook
+from sqlalchemy import func, select
+
+from app.api import admission
+from app.api.admission import REPORTS
+from app.core.config import settings
+from app.db.session import get_session, pool_metrics
+from app.main import app
+from app.models.credit import Credit
+from app.services.export_service import (
+    CREDIT_EXPORT_COLUMNS,
+    YEAR_PERFORMANCE_EXPORT_COLUMNS,
+)
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    monkeypatch.setattr(admission, "_controller", None)
+    return admission.get_admission_controller()
+
+
+async def _credit_count() -> int:
+    async for session in get_session():
+        count = await session.scalar(select(func.count()).select_from(Credit))
+    return count
+
+
+def test_credits_csv(client, controller, monkeypatch):
+    monkeypatch.setattr(settings, "export_chunk_size", 100)
+    response = client.get("/api/export/credits", params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    assert (
+        response.headers["content-disposition"] == 'attachment; filename="credits.csv"'
+    )
+    assert response.content.startswith("\ufeff".encode())
+
+    rows = list(csv.reader(io.StringIO(response.content.decode("utf-8-sig"))))
+    assert rows[0] == CREDIT_EXPORT_COLUMNS
+    assert len(rows) - 1 == asyncio.run(_credit_count())
+    ids = [int(r[0]) for r in rows[1:]]
+    assert ids == sorted(ids) and ids[0] == 1
+    assert controller.classes[REPORTS].running == 0
+
+
+def test_year_performance_xlsx(client, controller):
+    response = client.get(
+        "/api/export/year_performance/2021", params={"format": "xlsx"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+    assert (
+        response.headers["content-disposition"]
+        == 'attachment; filename="year_performance_2021.xlsx"'
+    )
+
+    sheet = load_workbook(io.BytesIO(response.content)).active
+    assert sheet.title == "year_performance_2021"
+    rows = list(sheet.iter_rows(values_only=True))
+    assert list(rows[0]) == YEAR_PERFORMANCE_EXPORT_COLUMNS
+    month = YEAR_PERFORMANCE_EXPORT_COLUMNS.index("month")
+    assert [r[month] for r in rows[1:]] == list(range(1, 13))
+
+    json_items = client.get("/api/year_performance/2021").json()["items"]
+    issued = YEAR_PERFORMANCE_EXPORT_COLUMNS.index("issuances_count")
+    assert [r[issued] for r in rows[1:]] == [i["issuances_count"] for i in json_items]
+    assert controller.classes[REPORTS].running == 0
+
+
+def test_unknown_format_is_rejected(client):
+    response = client.get("/api/export/credits", params={"format": "pdf"})
+    assert response.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_slot_and_connection_are_freed_when_the_client_aborts(
+    database, controller, monkeypatch
+):
+    monkeypatch.setattr(settings, "export_chunk_size", 10)
+    checked_out = pool_metrics.checked_out
+    chunks = 0
+    aborted = asyncio.Event()
+
+    async def receive():
+        if not getattr(receive, "sent", False):
+            receive.sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await aborted.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal chunks
+        if message["type"] == "http.response.body" and message.get("more_body"):
+            chunks += 1
+            if chunks == 3:
+                aborted.set()
+            # Let the disconnect land while the body is still streaming.
+            await asyncio.sleep(0.01)
+
+    path = "/api/export/credits"
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"format=csv",
+        "headers": [(b"x-api-key", settings.api_key.encode())],
+        "client": ("test", 1),
+        "server": ("test", 80),
+    }
+    await asyncio.wait_for(app(scope, receive, send), 10)
+
+    # Stopped well before the whole portfolio was sent.
+    assert 3 <= chunks < await _credit_count() // 10
+    assert controller.classes[REPORTS].running == 0
+    assert controller.in_use == 0
+    assert pool_metrics.checked_out == checked_out
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from app.tools.import_budget import BUDGET_MS, FORBIDDEN_MODULES, measure
+
+# Shared CI runners are noisy; the tool enforces the exact budget.
+CI_MARGIN: float = float(os.getenv("IMPORT_BUDGET_CI_MARGIN", "1.5"))
+
+
+@pytest.fixture(scope="module")
+def samples() -> list[tuple[int, set[str]]]:
+    return [measure("app.main") for _ in range(3)]
+
+
+def test_app_main_does_not_import_heavy_modules(samples):
+    for _cumulative_us, imported in samples:
+        assert "app.main" in imported
+        assert not {name for name in imported if name in FORBIDDEN_MODULES}
+
+
+def test_app_main_imports_within_budget(samples):
+    best_ms = min(us for us, _ in samples) / 1000
+    assert best_ms <= BUDGET_MS * CI_MARGIN, (
+        f"cold import of app.main took {best_ms:.1f} ms, "
+        f"budget {BUDGET_MS:.0f} ms x {CI_MARGIN}"
+    )
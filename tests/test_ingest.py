@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import select
+
+from app.db.session import get_session
+from app.models.credit import Credit
+
+
+def _ndjson(*rows: dict) -> bytes:
+    return b"".join(json.dumps(row).encode() + b"\n" for row in rows)
+
+
+def _credit(actual_return_date: str | None = None, **extra) -> dict:
+    row = {
+        "user_id": 1,
+        "issuance_date": "2021-01-10",
+        "return_date": "2021-06-10",
+        "body": "1000",
+        "percent": "100",
+    }
+    if actual_return_date:
+        row["actual_return_date"] = actual_return_date
+    return {**row, **extra}
+
+
+async def _returned_dates(count: int) -> list:
+    async for session in get_session():
+        stmt = select(Credit.actual_return_date).order_by(Credit.id.desc())
+        dates = (await session.scalars(stmt.limit(count))).all()
+    return list(reversed(dates))
+
+
+@pytest.mark.parametrize("closed_first", [False, True])
+def test_mixed_open_and_closed_credits_keep_every_column(client, closed_first):
+    rows = [_credit(), _credit("2021-05-01")]
+    if closed_first:
+        rows.reverse()
+    response = client.post("/api/ingest/credits", content=_ndjson(*rows))
+    assert response.status_code == 200, response.text
+    assert response.json()["inserted"] == 2
+
+    returned = [str(d) if d else None for d in asyncio.run(_returned_dates(2))]
+    expected = [None, "2021-05-01"]
+    assert returned == (expected[::-1] if closed_first else expected)
+
+
+def test_client_supplied_ids_are_rejected(client):
+    response = client.post(
+        "/api/ingest/credits", content=_ndjson(_credit(id=5), _credit())
+    )
+    body = response.json()
+    assert (body["inserted"], body["rejected"]) == (1, 1)
+    assert body["batches"][0]["errors"][0]["detail"].startswith("id:")
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import text
+
+from app.db.session import get_lazy_session, pool_metrics
+
+
+def _counters() -> tuple[int, int, int]:
+    return (
+        pool_metrics.checkouts_total,
+        pool_metrics.lazy_sessions_total,
+        pool_metrics.lazy_sessions_bound_total,
+    )
+
+
+def test_request_without_statements_checks_out_nothing(client):
+    url = "/api/year_performance/2021"
+    etag = client.get(url).headers["etag"]
+    checkouts, sessions, bound = _counters()
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert _counters() == (checkouts, sessions + 1, bound)
+
+
+@pytest.mark.anyio
+async def test_first_statement_binds_one_connection(database):
+    checkouts, _sessions, bound = _counters()
+    async for session in get_lazy_session():
+        session.expunge_all()
+        assert not session.is_bound
+        assert pool_metrics.checkouts_total == checkouts
+        assert await session.scalar(text("SELECT 1")) == 1
+        assert session.is_bound
+        await session.commit()
+        await session.execute(text("SELECT COUNT(*) FROM users"))
+        await session.rollback()
+        await session.scalar(text("SELECT 2"))
+        assert pool_metrics.checked_out == 1
+    assert pool_metrics.checkouts_total == checkouts + 1
+    assert pool_metrics.lazy_sessions_bound_total == bound + 1
+    assert pool_metrics.checked_out == 0
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from app.core.config import settings
+from app.db.base import Base
+from app.db.partitioning import (
+    add_partitions_ddl,
+    explain_partitions,
+    partition_by_ddl,
+    partition_name,
+    partition_on_startup,
+    partition_years,
+)
+from app.db.session import dispose_engine, ensure_initialized, get_engine
+from app.repositories.performance_repository import (
+    issuances_aggregates_stmt,
+    payments_aggregates_stmt,
+)
+
+# Partitions (and drops the foreign keys of) the database configured by the
+# DB_* settings, so it only runs when asked to.
+mysql_only = pytest.mark.skipif(
+    os.getenv("MYSQL_TESTS") != "1",
+    reason="set MYSQL_TESTS=1 to run against the DB_* MySQL database",
+)
+
+
+def test_partition_ddl_uses_half_open_yearly_ranges():
+    assert partition_by_ddl("payments", "payment_date", [2021, 2022]) == (
+        "ALTER TABLE `payments` PARTITION BY RANGE COLUMNS(`payment_date`) "
+        "(PARTITION p2021 VALUES LESS THAN ('2022-01-01'), "
+        "PARTITION p2022 VALUES LESS THAN ('2023-01-01'), "
+        "PARTITION pmax VALUES LESS THAN (MAXVALUE))"
+    )
+    assert add_partitions_ddl("credits", [2023]).startswith(
+        "ALTER TABLE `credits` REORGANIZE PARTITION pmax INTO "
+        "(PARTITION p2023 VALUES LESS THAN ('2024-01-01')"
+    )
+
+
+@pytest.mark.anyio
+async def test_startup_step_leaves_sqlite_alone(empty_database, monkeypatch):
+    monkeypatch.setattr(settings, "db_partitioning", True)
+    await ensure_initialized()
+    await partition_on_startup()
+    assert not os.path.exists(f"{settings.sqlite_path}.partitioning.lock")
+
+
+@mysql_only
+@pytest.mark.anyio
+async def test_yearly_aggregates_read_a_single_partition(monkeypatch):
+    monkeypatch.setattr(settings, "repository_backend", "mysql")
+    monkeypatch.setattr(settings, "db_partitioning", True)
+    monkeypatch.setattr(settings, "partition_first_year", 2020)
+    await ensure_initialized()
+    try:
+        engine = get_engine()
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        await partition_on_startup()
+
+        async with engine.connect() as conn:
+            assert 2021 in await partition_years(conn, "payments")
+            for year in (2021, 2022):
+                for stmt in (
+                    issuances_aggregates_stmt(year),
+                    payments_aggregates_stmt(year),
+                ):
+                    pruned = await explain_partitions(conn, stmt)
+                    assert pruned
+                    assert all(p == [partition_name(year)] for p in pruned.values())
+    finally:
+        await dispose_engine()
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+from datetime import date
+
+import pytest
+from sqlalchemy import func, insert, select
+
+from app.db.session import get_session
+from app.models.payment import Payment
+
+
+async def _busiest_credit() -> int:
+    async for session in get_session():
+        credit_id = await session.scalar(
+            select(Payment.credit_id)
+            .group_by(Payment.credit_id)
+            .order_by(func.count().desc(), Payment.credit_id)
+            .limit(1)
+        )
+    return credit_id
+
+
+async def _payments(credit_id: int, *where) -> list[tuple[int, date, int]]:
+    async for session in get_session():
+        rows = (
+            await session.execute(
+                select(Payment.id, Payment.payment_date, Payment.type_id)
+                .where(Payment.credit_id == credit_id, *where)
+                .order_by(Payment.payment_date, Payment.id)
+            )
+        ).all()
+    return [tuple(r) for r in rows]
+
+
+async def _add_same_day_payments(credit_id: int, day: date, count: int) -> None:
+    async for session in get_session():
+        await session.execute(
+            insert(Payment),
+            [
+                {"credit_id": credit_id, "payment_date": day, "type_id": 1, "sum": 1}
+                for _ in range(count)
+            ],
+        )
+        await session.commit()
+
+
+def _walk(client, credit_id: int, limit: int, **params) -> list[dict]:
+    items, cursor, pages = [], None, 0
+    while True:
+        query = {"limit": limit, **params, **({"cursor": cursor} if cursor else {})}
+        response = client.get(f"/api/credits/{credit_id}/payments", params=query)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        assert len(body["items"]) <= limit
+        items += body["items"]
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return items
+        assert pages < 1000
+
+
+def test_pages_cover_every_payment_once_in_order(client):
+    credit_id = asyncio.run(_busiest_credit())
+    # Payments sharing a date are ordered, and paged, by id.
+    first = asyncio.run(_payments(credit_id))[0]
+    asyncio.run(_add_same_day_payments(credit_id, first[1], 3))
+    expected = asyncio.run(_payments(credit_id))
+
+    items = _walk(client, credit_id, limit=2)
+    assert [(i["id"], date.fromisoformat(i["payment_date"])) for i in items] == [
+        (pid, day) for pid, day, _type in expected
+    ]
+
+
+def test_last_full_page_has_no_cursor(client):
+    credit_id = asyncio.run(_busiest_credit())
+    total = len(asyncio.run(_payments(credit_id)))
+    response = client.get(f"/api/credits/{credit_id}/payments", params={"limit": total})
+    assert len(response.json()["items"]) == total
+    assert response.json()["next_cursor"] is None
+
+
+def test_filters_by_type_and_date_range(client):
+    credit_id = asyncio.run(_busiest_credit())
+    payments = asyncio.run(_payments(credit_id))
+    start, end = payments[1][1], payments[-2][1]
+    expected = asyncio.run(
+        _payments(
+            credit_id,
+            Payment.type_id == 1,
+            Payment.payment_date >= start,
+            Payment.payment_date <= end,
+        )
+    )
+    assert expected
+
+    items = _walk(
+        client,
+        credit_id,
+        limit=1,
+        type_id=1,
+        start=start.isoformat(),
+        end=end.isoformat(),
+    )
+    assert [i["id"] for i in items] == [pid for pid, _day, _type in expected]
+
+
+def test_unknown_credit_is_404(client):
+    response = client.get("/api/credits/999999999/payments")
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        base64.urlsafe_b64encode(b"garbage").decode(),
+        base64.urlsafe_b64encode(b"2021-13-01|5").decode(),
+        base64.urlsafe_b64encode(b"2021-01-01|x").decode(),
+    ],
+)
+def test_malformed_cursor_is_400(client, cursor):
+    credit_id = asyncio.run(_busiest_credit())
+    response = client.get(
+        f"/api/credits/{credit_id}/payments", params={"cursor": cursor}
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+@pytest.mark.parametrize("limit", [0, 1001])
+def test_limit_out_of_range_is_400(client, limit):
+    response = client.get("/api/credits/1/payments", params={"limit": limit})
+    assert response.status_code == 400
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import asyncio
+import io
+from contextlib import contextmanager
+from typing import Iterator
+
+import pandas as pd
+import pytest
+from sqlalchemy import event
+
+from app.api.deps import get_request_loaders
+from app.db.session import get_engine, get_session
+
+
+@contextmanager
+def _dictionary_queries() -> Iterator[list[str]]:
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if "FROM dictionary" in statement:
+            statements.append(statement)
+
+    engine = get_engine().sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def _workbook(rows: list[tuple[str, str, int]]) -> bytes:
+    frame = pd.DataFrame(
+        rows, columns=["місяць плану", "назва категорії плану", "сума"]
+    )
+    buffer = io.BytesIO()
+    frame.to_excel(buffer, index=False)
+    return buffer.getvalue()
+
+
+def test_plans_insert_resolves_categories_in_one_query(client):
+    body = _workbook([("2030-01-01", "видача", 1000), ("2030-01-01", "збір", 500)])
+    with _dictionary_queries() as statements:
+        response = client.post(
+            "/api/plans_insert", files={"file": ("plans.xlsx", body)}
+        )
+    assert response.status_code == 200, response.text
+    assert len(statements) == 1
+    assert " IN (" in statements[0]
+
+
+@pytest.mark.anyio
+async def test_loads_in_one_tick_share_one_query(database):
+    async for session in get_session():
+        loaders = await get_request_loaders(session)
+        with _dictionary_queries() as statements:
+            first, second = await asyncio.gather(
+                loaders.category_ids_by_name.load_many(["видача", "збір"]),
+                loaders.category_ids_by_name.load_many(["збір", "тіло", "немає"]),
+            )
+            again = await loaders.category_ids_by_name.load("видача")
+    assert first == [3, 4]
+    assert second == [4, 1, None]
+    assert again == 3
+    assert len(statements) == 1
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select, text
+
+from app.core.config import settings
+from app.db.session import get_session
+from app.models.credit import Credit
+from app.models.payment import Payment
+
+
+async def _direct_sums(day: date) -> dict[str, Decimal]:
+    # What the series must report for `day`: every row from the 1st of the
+    # month through `day`, added up exactly (SQLite's SUM goes through floats).
+    first = day.replace(day=1)
+    async for session in get_session():
+        issued = await session.scalars(
+            select(Credit.body).where(Credit.issuance_date.between(first, day))
+        )
+        paid = await session.scalars(
+            select(Payment.sum).where(Payment.payment_date.between(first, day))
+        )
+        sums = {
+            "видача": sum(issued.all(), Decimal(0)),
+            "збір": sum(paid.all(), Decimal(0)),
+        }
+    return sums
+
+
+def _series(client, start: date, end: date) -> list[dict]:
+    response = client.get(
+        "/api/plans_performance_series",
+        params={"start": start.isoformat(), "end": end.isoformat()},
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["items"]
+
+
+@pytest.fixture(params=["sql", "daily_index", "columnar"])
+def series_client(request, database, monkeypatch):
+    monkeypatch.setattr(settings, "performance_backend", request.param)
+    return request.getfixturevalue("client")
+
+
+@pytest.mark.parametrize(
+    "start, end",
+    [
+        # Across a month end, so the running sums restart on the 1st.
+        (date(2021, 1, 29), date(2021, 2, 2)),
+        # A leap day and the last day of a year.
+        (date(2020, 2, 28), date(2020, 3, 1)),
+        (date(2020, 12, 31), date(2021, 1, 1)),
+        # A single day in the middle of a month.
+        (date(2021, 6, 15), date(2021, 6, 15)),
+    ],
+)
+def test_series_matches_direct_sums(series_client, start, end):
+    points = _series(series_client, start, end)
+    assert [p["as_of"] for p in points] == [
+        (start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)
+    ]
+    for point in points:
+        expected = asyncio.run(_direct_sums(date.fromisoformat(point["as_of"])))
+        actual = {i["category"]: Decimal(str(i["actual_sum"])) for i in point["items"]}
+        assert actual == expected, point["as_of"]
+
+
+def test_series_without_data_or_plans_has_empty_points(client):
+    points = _series(client, date(2035, 1, 1), date(2035, 1, 3))
+    assert len(points) == 3
+    assert all(p["items"] == [] for p in points)
+
+
+def test_series_rejects_a_reversed_range(client):
+    response = client.get(
+        "/api/plans_performance_series",
+        params={"start": "2021-02-01", "end": "2021-01-31"},
+    )
+    assert response.status_code == 400
+
+
+def test_series_with_a_category_missing(client):
+    async def drop_collection_plan_and_issuance_name() -> None:
+        async for session in get_session():
+            await session.execute(
+                text(
+                    "DELETE FROM plans WHERE category_id = 4 "
+                    "AND period = '2021-03-01'"
+                )
+            )
+            await session.execute(text("DELETE FROM dictionary WHERE id = 3"))
+            await session.commit()
+
+    asyncio.run(drop_collection_plan_and_issuance_name())
+    points = _series(client, date(2021, 2, 28), date(2021, 3, 2))
+    february, march = points[0], points[1:]
+    # February keeps both plans; the issuance name falls back to its default.
+    assert sorted(i["category"] for i in february["items"]) == ["видача", "збір"]
+    for point in march:
+        expected = asyncio.run(_direct_sums(date.fromisoformat(point["as_of"])))
+        assert [i["category"] for i in point["items"]] == ["видача"]
+        assert Decimal(str(point["items"][0]["actual_sum"])) == expected["видача"]
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from app.core.config import settings
+
+TOKEN = "profile-secret"
+
+
+@pytest.fixture
+def profile_dir(tmp_path: Path, monkeypatch) -> Path:
+    directory = tmp_path / "profiles"
+    monkeypatch.setattr(settings, "profile_dir", str(directory))
+    monkeypatch.setattr(settings, "profile_sample_rate", 0.0)
+    monkeypatch.setattr(settings, "profile_token", "")
+    return directory
+
+
+def _stored(directory: Path, suffix: str) -> set[str]:
+    return {p.stem for p in directory.glob("*" + suffix)}
+
+
+def test_nothing_is_profiled_by_default(client, profile_dir):
+    response = client.get("/api/user_credits/1", headers={"X-Profile": TOKEN})
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+    assert not profile_dir.exists()
+
+
+def test_token_header_requests_a_profile(client, profile_dir, monkeypatch):
+    monkeypatch.setattr(settings, "profile_token", TOKEN)
+
+    response = client.get("/api/user_credits/1", headers={"X-Profile": "wrong"})
+    assert "x-profile-id" not in response.headers
+    response = client.get("/api/user_credits/1")
+    assert "x-profile-id" not in response.headers
+
+    response = client.get("/api/user_credits/1", headers={"X-Profile": TOKEN})
+    assert response.status_code == 200
+    profile_id = response.headers["x-profile-id"]
+    assert _stored(profile_dir, ".prof") == {profile_id}
+    meta = json.loads((profile_dir / (profile_id + ".json")).read_text())
+    assert meta["route"] == "/api/user_credits/{user_id}"
+    assert meta["path_params"] == {"user_id": "1"}
+    assert meta["status"] == 200
+    assert meta["query_count"] > 0
+
+
+def test_sampling_profiles_api_requests_only(client, profile_dir, monkeypatch):
+    monkeypatch.setattr(settings, "profile_sample_rate", 1.0)
+
+    assert "x-profile-id" not in client.get("/health").headers
+    response = client.get("/api/user_credits/1")
+    assert _stored(profile_dir, ".prof") == {response.headers["x-profile-id"]}
+
+
+def test_only_the_newest_profiles_are_kept(client, profile_dir, monkeypatch):
+    monkeypatch.setattr(settings, "profile_sample_rate", 1.0)
+    monkeypatch.setattr(settings, "profile_max_files", 2)
+
+    ids = [client.get("/api/user_credits/1").headers["x-profile-id"] for _ in range(4)]
+    assert len(set(ids)) == 4
+    assert _stored(profile_dir, ".prof") == set(ids[-2:])
+    assert _stored(profile_dir, ".json") == set(ids[-2:])
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
+
+from app.api import readiness
+from app.api.readiness import Readiness
+from app.cache import version
+from app.core.config import settings
+from app.main import app
+
+
+def _wait_ready(client: TestClient, timeout: float = 10) -> dict:
+    deadline = time.monotonic() + timeout
+    while True:
+        response = client.get("/ready")
+        if response.status_code == 200 or time.monotonic() > deadline:
+            return response.json()
+        time.sleep(0.02)
+
+
+def test_not_ready_before_startup(monkeypatch):
+    monkeypatch.setattr(readiness, "_readiness", None)
+    # No lifespan: startup (seeding included) has not run.
+    response = TestClient(app).get("/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "starting"
+
+
+def test_ready_once_warmup_finishes_and_draining_after(database, monkeypatch):
+    release = threading.Event()
+    primed = []
+
+    async def gated_prime(concurrency: int) -> None:
+        while not release.is_set():
+            await asyncio.sleep(0.01)
+        primed.append(concurrency)
+
+    monkeypatch.setattr(readiness, "prime_hot_statements", gated_prime)
+    monkeypatch.setattr(settings, "prewarm_statements", True)
+    monkeypatch.setattr(version, "_tracker", version.DataVersionTracker())
+    monkeypatch.setattr(readiness, "_readiness", None)
+
+    with TestClient(app) as client:
+        assert client.get("/health").status_code == 200
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json() == {
+            "status": "warming_up",
+            "steps": {"statements": {"state": "pending", "error": None}},
+        }
+
+        release.set()
+        assert _wait_ready(client)["status"] == "ready"
+        assert primed == [settings.warmup_concurrency]
+
+    # Shutdown has started; the instance stays out of rotation.
+    response = TestClient(app).get("/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "draining"
+
+
+@pytest.mark.anyio
+async def test_database_errors_are_retried():
+    calls = []
+
+    async def flaky() -> None:
+        calls.append(None)
+        if len(calls) < 3:
+            raise OperationalError("SELECT 1", (), ConnectionRefusedError())
+
+    state = Readiness({"pool": flaky}, retry_delay=0)
+    state.start()
+    await asyncio.wait_for(state._task, 5)
+    assert state.ready and len(calls) == 3
+    assert state.errors == {}
+    await state.stop()
+    assert not state.ready
+    assert state.status()["status"] == "draining"
+
+
+@pytest.mark.anyio
+async def test_unexpected_errors_are_not_retried(caplog):
+    calls = []
+
+    async def broken() -> None:
+        calls.append(None)
+        raise KeyError("statements")
+
+    state = Readiness({"statements": broken}, retry_delay=0)
+    state.start()
+    await asyncio.wait_for(state._task, 5)
+    assert len(calls) == 1
+    assert not state.ready
+    assert state.errors == {"statements": "KeyError('statements')"}
+    assert any(r.exc_info for r in caplog.records)
+    await state.stop()
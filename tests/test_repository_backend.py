@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import asyncio
+import shutil
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.cache import version
+from app.core.config import settings
+from app.db import memory
+from app.db.session import dispose_engine, get_session
+from app.exceptions import NotFoundException
+from app.models.plan import Plan
+from app.repositories.backend import (
+    build_credit_repository,
+    build_dictionary_repository,
+    build_plans_repository,
+    build_user_repository,
+)
+from app.seed.loader import read_seed_data
+
+
+@pytest.fixture(scope="module")
+def memory_client() -> Iterator[TestClient]:
+    # Loading the memory store takes a while, so the app starts once.
+    from app.main import app
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(settings, "repository_backend", "memory")
+        monkeypatch.setattr(settings, "prewarm_statements", False)
+        monkeypatch.setattr(version, "_tracker", version.DataVersionTracker())
+        with TestClient(app, headers={"X-API-Key": settings.api_key}) as client:
+            yield client
+
+
+@pytest.mark.parametrize(
+    "method, path",
+    [
+        ("GET", "/api/credits/1/payments"),
+        ("GET", "/api/changes/credits"),
+        ("POST", "/api/ingest/credits"),
+    ],
+)
+def test_database_only_endpoints_are_rejected_on_memory(memory_client, method, path):
+    response = memory_client.request(method, path, content=b"")
+    assert response.status_code == 501
+    assert response.json()["code"] == "not_supported"
+
+
+def test_memory_backend_serves_user_credits(memory_client):
+    response = memory_client.get("/api/user_credits/1")
+    assert response.status_code == 200
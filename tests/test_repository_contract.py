@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+import shutil
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from app.core.config import settings
+from app.db import memory
+from app.db.session import dispose_engine, get_session
+from app.exceptions import NotFoundException
+from app.models.plan import Plan
+from app.repositories.backend import (
+    build_credit_repository,
+    build_dictionary_repository,
+    build_plans_repository,
+    build_user_repository,
+)
+from app.seed.loader import SEED_DIR, read_seed_data
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(
+    request, seeded_db: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Iterator[str]:
+    # The same seed data behind both backends.
+    if request.param == "memory":
+        monkeypatch.setattr(settings, "repository_backend", "memory")
+        store = memory.MemoryStore.from_seed(read_seed_data())
+        monkeypatch.setattr(memory, "_store", store)
+    else:
+        path = tmp_path / "datafactory.sqlite3"
+        shutil.copy(seeded_db, path)
+        monkeypatch.setattr(settings, "repository_backend", "sqlite")
+        monkeypatch.setattr(settings, "sqlite_path", str(path))
+    yield request.param
+    # get_session builds an engine on either backend.
+    asyncio.run(dispose_engine())
+
+
+def _seed_credit_ids(user_id: int) -> list[int]:
+    import pandas as pd
+
+    frame = pd.read_csv(SEED_DIR / "credits.csv", sep="\t", usecols=["id", "user_id"])
+    return sorted(int(i) for i in frame[frame["user_id"] == user_id]["id"])
+
+
+def _plan(period: date, id_: int | None = None) -> Plan:
+    return Plan(id=id_, period=period, sum=Decimal("1000.00"), category_id=3)
+
+
+@pytest.mark.anyio
+async def test_plans_repository_contract(backend):
+    async for session in get_session():
+        repo = build_plans_repository(session)
+        first, second = _plan(date(2030, 1, 1)), _plan(date(2030, 2, 1))
+        await repo.update_many([first, second])
+        assert (first.id, second.id) == (63, 64)
+        assert (await repo.get_by_id(63)).period == date(2030, 1, 1)
+        assert await repo.list_plans_for_month(2030, 2) == [
+            (3, date(2030, 2, 1), 1000.0)
+        ]
+        assert await repo.exists_plan(date(2030, 1, 1), 3)
+        assert not await repo.exists_plan(date(2030, 1, 1), 4)
+
+        explicit, after = _plan(date(2030, 3, 1), 100), _plan(date(2030, 4, 1))
+        await repo.update_many([explicit, after])
+        assert after.id == 101
+
+        await repo.remove(await repo.find_by_id(63))
+        assert not await repo.has(63)
+        with pytest.raises(NotFoundException):
+            await repo.find_by_id(63)
+        with pytest.raises(NotFoundException):
+            await repo.find_by_ids([64, 63])
+
+
+@pytest.mark.anyio
+async def test_lookup_repositories_contract(backend):
+    async for session in get_session():
+        users = build_user_repository(session)
+        credits = build_credit_repository(session)
+        dictionary = build_dictionary_repository(session)
+        assert await users.existing_ids([1, 2, 10**9]) == {1, 2}
+        assert await dictionary.ids_by_names(["видача", "збір", "немає"]) == {
+            "видача": 3,
+            "збір": 4,
+        }
+        assert await dictionary.category_id_by_name("тіло") == 1
+        found = await credits.get_by_ids([2, 1, 10**9])
+        assert sorted(c.id for c in found) == [1, 2]
+        by_user = await credits.list_by_user(1)
+        assert by_user and {c.user_id for c in by_user} == {1}
+        assert sorted(c.id for c in by_user) == _seed_credit_ids(user_id=1)
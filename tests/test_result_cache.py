@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import os
+
+import pytest
+from sqlalchemy import text
+
+from app.cache import calls
+from app.cache.calls import cached_method, call_key
+from app.cache.memory import InMemoryResultCache
+from app.cache.shared import SharedFileResultCache
+
+
+@pytest.fixture(params=["memory", "shared"])
+def cache(request, tmp_path):
+    if request.param == "memory":
+        yield InMemoryResultCache(max_entries=10, default_ttl=60)
+    else:
+        cache = SharedFileResultCache(str(tmp_path), max_bytes=1 << 20, default_ttl=60)
+        yield cache
+        cache.close()
+
+
+@pytest.mark.anyio
+async def test_set_drops_values_computed_before_an_invalidate(cache):
+    generation = await cache.generation()
+    await cache.invalidate()
+    await cache.set("k", "stale", generation=generation)
+    assert await cache.get("k") is None
+
+    await cache.set("k", "fresh", generation=await cache.generation())
+    assert await cache.get("k") == "fresh"
+
+
+def test_call_key_includes_keyword_arguments():
+    assert call_key("S", "m", 1, year=2021) != call_key("S", "m", 1, year=2022)
+    assert call_key("S", "m", a=1, b=2) == call_key("S", "m", b=2, a=1)
+
+
+class _Service:
+    def __init__(self, started: asyncio.Event, release: asyncio.Event) -> None:
+        self.started = started
+        self.release = release
+
+    @cached_method
+    async def compute(self, year: int, *, month: int = 1) -> str:
+        self.started.set()
+        await self.release.wait()
+        return f"{year}-{month}"
+
+
+@pytest.mark.anyio
+async def test_cached_method_does_not_keep_a_result_overlapping_an_invalidate(
+    cache, monkeypatch
+):
+    monkeypatch.setattr(calls, "_cache", cache)
+    started, release = asyncio.Event(), asyncio.Event()
+    service = _Service(started, release)
+
+    task = asyncio.create_task(service.compute(2021, month=3))
+    await started.wait()
+    await cache.invalidate()
+    release.set()
+    assert await task == "2021-3"
+    assert await cache.get(call_key("_Service", "compute", 2021, month=3)) is None
+
+    assert await service.compute(2021, month=4) == "2021-4"
+    assert await cache.get(call_key("_Service", "compute", 2021, month=4)) == "2021-4"
+
+
+class _SessionUser:
+    def __init__(self, session) -> None:
+        self.session = session
+
+    @cached_method
+    async def select(self, value: int) -> int:
+        return await self.session.scalar(text(f"SELECT {value}"))
+
+
+@pytest.mark.anyio
+async def test_shared_computation_runs_on_its_own_session(database, monkeypatch):
+    built = []
+
+    async def factory(session):
+        built.append(session)
+        return _SessionUser(session)
+
+    monkeypatch.setitem(calls._service_factories, _SessionUser, factory)
+    # The callers' sessions are unusable; the computation must not touch them.
+    callers = [_SessionUser(None), _SessionUser(None)]
+    assert await asyncio.gather(*(c.select(7) for c in callers)) == [7, 7]
+    assert len(built) == 1 and built[0] is not None
+
+
+@pytest.mark.anyio
+async def test_shared_cache_waits_for_the_lock_off_the_event_loop(tmp_path):
+    cache = SharedFileResultCache(str(tmp_path), max_bytes=1 << 20, default_ttl=60)
+    # Another worker holding the lock.
+    other = os.open(tmp_path / "lock", os.O_RDWR)
+    fcntl.flock(other, fcntl.LOCK_EX)
+    try:
+        pending = asyncio.gather(cache.set("k", "v"), cache.invalidate())
+        await asyncio.sleep(0.05)  # the loop keeps running meanwhile
+        assert not pending.done()
+    finally:
+        fcntl.flock(other, fcntl.LOCK_UN)
+        os.close(other)
+    await pending
+    cache.close()
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import logging
+import shutil
+from pathlib import Path
+
+import pytest
+from sqlalchemy import delete, func, select
+
+from app.db.session import get_session
+from app.models.plan import Plan
+from app.models.seed_state import SeedState
+from app.seed import loader
+
+
+@pytest.fixture
+def seed_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    path = tmp_path / "test_data"
+    shutil.copytree(loader.SEED_DIR, path)
+    monkeypatch.setattr(loader, "SEED_DIR", path)
+    return path
+
+
+def _append_plan(seed_dir: Path) -> None:
+    with open(seed_dir / "plans.csv", "a") as f:
+        f.write("63\t01.08.2022\t1000\t3\n")
+
+
+async def _reload(removed_plan_id: int | None = None) -> tuple[int, str]:
+    async for session in get_session():
+        if removed_plan_id is not None:
+            await session.execute(delete(Plan).where(Plan.id == removed_plan_id))
+            await session.commit()
+        await loader._load_incremental(session)
+        plans = await session.scalar(select(func.count()).select_from(Plan))
+        checksum = await session.scalar(
+            select(SeedState.checksum).where(SeedState.file == "plans.csv")
+        )
+    return plans, checksum
+
+
+@pytest.mark.anyio
+async def test_appended_rows_load_and_mark_the_file(database, seed_dir, caplog):
+    _append_plan(seed_dir)
+    plans, checksum = await _reload()
+    assert plans == 63
+    assert checksum == loader.file_checksum(seed_dir / "plans.csv")
+    assert not [r for r in caplog.records if r.levelno >= logging.ERROR]
+
+
+@pytest.mark.anyio
+async def test_edited_file_is_reported_and_not_marked(database, seed_dir, caplog):
+    _append_plan(seed_dir)
+    plans, checksum = await _reload(removed_plan_id=10)
+    assert plans == 62
+    assert checksum != loader.file_checksum(seed_dir / "plans.csv")
+    errors = [r.getMessage() for r in caplog.records if r.levelno >= logging.ERROR]
+    assert errors and errors[0].startswith("plans.csv: 1 row(s) with id <= 62")
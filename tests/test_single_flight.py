@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.cache.single_flight import SingleFlight
+
+
+@pytest.mark.anyio
+async def test_identical_calls_share_one_computation():
+    flights, calls, release = SingleFlight(), [], asyncio.Event()
+
+    async def compute() -> int:
+        calls.append(1)
+        await release.wait()
+        return 7
+
+    waiters = [asyncio.create_task(flights.do("k", compute)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    assert await asyncio.gather(*waiters) == [7, 7, 7]
+    assert len(calls) == 1 and flights.in_flight() == 0
+
+
+@pytest.mark.anyio
+async def test_caller_after_the_last_waiter_left_starts_afresh():
+    flights, unwinding = SingleFlight(), asyncio.Event()
+
+    async def slow_to_stop() -> str:
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            # Cleanup (e.g. killing the query) keeps the task alive a while.
+            await unwinding.wait()
+            raise
+        return "never"
+
+    async def fresh() -> str:
+        return "fresh"
+
+    first = asyncio.create_task(flights.do("k", slow_to_stop))
+    await asyncio.sleep(0)
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert flights.in_flight() == 0
+
+    asyncio.get_running_loop().call_later(0.05, unwinding.set)
+    assert await flights.do("k", fresh) == "fresh"
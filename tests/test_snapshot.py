@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import logging
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+import numpy as np
+import pytest
+from sqlalchemy import insert, update
+from sqlalchemy.exc import OperationalError
+
+from app.analytics import snapshot as snapshot_module
+from app.analytics.columnar import ColumnarStore
+from app.analytics.daily_index import DailyTotalsIndex
+from app.analytics.snapshot import (
+    current_data_version,
+    export_snapshot,
+    load_snapshot_if_current,
+)
+from app.db.session import get_session
+from app.models.payment import Payment
+
+
+async def _export(path: Path) -> ColumnarStore:
+    store, index = ColumnarStore(), DailyTotalsIndex()
+    await store.refresh()
+    await index.refresh()
+    export_snapshot(path, store, index, await current_data_version())
+    return store
+
+
+async def _execute(stmt) -> None:
+    async for session in get_session():
+        await session.execute(stmt)
+        await session.commit()
+
+
+@pytest.mark.anyio
+async def test_snapshot_round_trip_keeps_watermarks(database, tmp_path):
+    store = await _export(tmp_path / "snap")
+
+    snapshot = await load_snapshot_if_current(tmp_path / "snap")
+    assert snapshot is not None
+    assert snapshot.store.credits_watermark.value == store.credits_watermark.value
+    assert snapshot.store.payments_aggregates(2021) == store.payments_aggregates(2021)
+
+
+@pytest.mark.anyio
+async def test_catch_up_leaves_the_mapped_base_alone(database, tmp_path):
+    store = await _export(tmp_path / "snap")
+    top = store.payments_watermark.top
+    await _execute(
+        insert(Payment.__table__).values(
+            id=top + 1,
+            credit_id=1,
+            type_id=1,
+            sum=Decimal("7"),
+            payment_date=date(2021, 3, 1),
+        )
+    )
+
+    snapshot = await load_snapshot_if_current(tmp_path / "snap")
+    base = snapshot.store.payments.base["sum"]
+    await snapshot.store.refresh()
+
+    assert snapshot.store.payments.base["sum"] is base
+    assert isinstance(base, np.memmap) and not base.flags.writeable
+    assert snapshot.store.payments.delta["id"].tolist() == [top + 1]
+    day = date(2021, 3, 1)
+    assert snapshot.store.sum_payments(day, day) == store.sum_payments(
+        day, day
+    ) + Decimal("7")
+
+
+@pytest.mark.anyio
+async def test_snapshot_is_ignored_when_rows_below_the_watermark_changed(
+    database, tmp_path
+):
+    await _export(tmp_path / "snap")
+    await _execute(update(Payment).where(Payment.id == 1).values(sum=Payment.sum + 1))
+
+    assert await load_snapshot_if_current(tmp_path / "snap") is None
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "damage",
+    [
+        lambda path: (path / "manifest.json").write_text("{"),
+        lambda path: (path / "payments.sum.npy").unlink(),
+        lambda path: (path / "manifest.json").write_text('{"format_version": 4}'),
+    ],
+    ids=["bad_json", "missing_column", "missing_keys"],
+)
+async def test_damaged_snapshot_is_ignored_without_a_traceback(
+    database, tmp_path, caplog, damage
+):
+    await _export(tmp_path / "snap")
+    damage(tmp_path / "snap")
+
+    with caplog.at_level(logging.WARNING):
+        assert await load_snapshot_if_current(tmp_path / "snap") is None
+    assert "Ignoring snapshot" in caplog.text
+    assert not any(r.exc_info for r in caplog.records)
+
+
+@pytest.mark.anyio
+async def test_snapshot_is_ignored_when_the_database_check_fails(
+    database, tmp_path, monkeypatch
+):
+    await _export(tmp_path / "snap")
+
+    async def unreachable(manifest):
+        raise OperationalError("SELECT 1", (), ConnectionRefusedError())
+
+    monkeypatch.setattr(snapshot_module, "changed_tables", unreachable)
+    assert await load_snapshot_if_current(tmp_path / "snap") is None
+
+
+@pytest.mark.anyio
+async def test_unexpected_snapshot_errors_are_logged_with_a_traceback(
+    database, tmp_path, monkeypatch, caplog
+):
+    await _export(tmp_path / "snap")
+
+    def broken(path, mmap=True):
+        raise TypeError("unexpected")
+
+    monkeypatch.setattr(snapshot_module, "load_snapshot", broken)
+    assert await load_snapshot_if_current(tmp_path / "snap") is None
+    assert any(r.exc_info for r in caplog.records)
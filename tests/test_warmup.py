@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.cache.warmup import WarmupScheduler
+
+
+async def _run_ticks(scheduler: WarmupScheduler, ticks: list, count: int) -> None:
+    scheduler.start()
+    while len(ticks) < count:
+        await asyncio.sleep(0.001)
+    await scheduler.stop()
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "error, traceback",
+    [
+        (OperationalError("SELECT 1", (), ConnectionRefusedError()), False),
+        (ConnectionResetError(), False),
+        (KeyError("year"), True),
+    ],
+)
+async def test_failed_ticks_are_logged_and_retried(
+    monkeypatch, caplog, error, traceback
+):
+    ticks = []
+
+    async def failing_tick(self) -> None:
+        ticks.append(None)
+        raise error
+
+    monkeypatch.setattr(WarmupScheduler, "tick", failing_tick)
+    scheduler = WarmupScheduler(interval=0, jitter=0, concurrency=1)
+    with caplog.at_level(logging.WARNING):
+        await asyncio.wait_for(_run_ticks(scheduler, ticks, 3), 5)
+
+    failures = [r for r in caplog.records if "Cache warm-up failed" in r.getMessage()]
+    assert len(failures) >= 3
+    assert all(bool(r.exc_info) == traceback for r in failures)